@@ -1,30 +1,408 @@
 # Файл: src/eda_cli/api.py
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import tempfile
 import time
-import uuid
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Header, HTTPException, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 
 # === ИМПОРТЫ ИЗ НАШЕГО ПРОЕКТА HW03 ===
+from .cache import TTLCache
 from .core import (
-    summarize_dataset,
-    missing_table,
+    PERCENTILES,
+    UNIQUE_ERROR,
     compute_quality_flags,
     DatasetSummary,
 )
+from .jobs import JobManager, JobQueueFull, ReportJob
+from .readers import is_supported
+from .streaming import DatasetAccumulator, profile_csv
 # === КОНЕЦ ИМПОРТОВ ===
 
+# === ПУЛ ДЛЯ CPU-BOUND ПРОФИЛИРОВАНИЯ ===
+# pandas/NumPy не должны выполняться в event loop: пока разбирается большой
+# CSV, воркер не отвечает даже на /health. Профилирование уходит в пул
+# процессов (или потоков) ограниченного размера.
+API_WORKERS = int(os.environ.get("EDA_API_WORKERS", os.cpu_count() or 1))
+API_EXECUTOR = os.environ.get("EDA_API_EXECUTOR", "process")  # "process" | "thread"
+# Сколько задач может ждать пула одновременно (остальные запросы ждут в event loop)
+API_MAX_PENDING = int(os.environ.get("EDA_API_MAX_PENDING", 4 * API_WORKERS))
+# Загрузка пишется на диск блоками и профилируется чанками по API_CHUNKSIZE строк:
+# память на запрос ограничена чанком, а не размером файла
+API_CHUNKSIZE = int(os.environ.get("EDA_API_CHUNKSIZE", 100_000))
+# Колонки-идентификаторы: для проверки дубликатов их уникальные считаются точно
+ID_COLUMNS = ("user_id", "id")
+UPLOAD_BLOCK_BYTES = 1024 * 1024
+
+# === КЭШ РЕЗУЛЬТАТОВ /quality-* ===
+# Ключ (он же ETag) – хэш содержимого загрузки + эндпоинт + параметры запроса.
+# Клиент с ETag может прислать If-None-Match без файла: пока результат в кэше,
+# ответ – 304 без загрузки и без тела.
+API_RESULT_CACHE_SIZE = int(os.environ.get("EDA_API_RESULT_CACHE_SIZE", 1024))
+API_RESULT_CACHE_TTL = float(os.environ.get("EDA_API_RESULT_CACHE_TTL", 3600))
+
+_results = TTLCache(API_RESULT_CACHE_SIZE, API_RESULT_CACHE_TTL)
+
+# === ФОНОВЫЕ ЗАДАЧИ ОТЧЁТОВ ===
+# Отчёт с графиками – долгая операция: запрос сразу получает 202 и id задачи,
+# отчёт строится в отдельном пуле процессов, статус – GET /reports/{id}
+API_REPORTS_DIR = os.environ.get("EDA_API_REPORTS_DIR", "api_reports")
+API_REPORT_WORKERS = int(os.environ.get("EDA_API_REPORT_WORKERS", 2))
+API_MAX_REPORT_JOBS = int(os.environ.get("EDA_API_MAX_REPORT_JOBS", 16))
+
+_jobs = JobManager(API_REPORTS_DIR, API_REPORT_WORKERS, API_MAX_REPORT_JOBS)
+
+_executor: Optional[Executor] = None
+_pending: Optional[asyncio.Semaphore] = None
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if API_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(max_workers=API_WORKERS)
+        else:
+            _executor = ProcessPoolExecutor(max_workers=API_WORKERS)
+    return _executor
+
+
+async def _run_in_pool(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Выполнить ``func`` в пуле, не блокируя event loop."""
+    global _pending
+    if _pending is None:
+        _pending = asyncio.Semaphore(API_MAX_PENDING)
+    async with _pending:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), partial(func, *args, **kwargs))
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    global _executor, _pending
+    yield
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor, _pending = None, None
+    _jobs.shutdown()
+
+
 app = FastAPI(
     title="EDA Quality Service",
     description="HTTP-сервис для оценки качества датасетов поверх eda-cli",
     version="0.1.0",
+    lifespan=_lifespan,
 )
 
+def _numeric_percentiles(summary: DatasetSummary) -> Dict[str, Dict[str, Optional[float]]]:
+    """Перцентили p1..p99 по числовым колонкам для JSON-ответов."""
+    return {
+        col.name: {name: getattr(col, name) for name in PERCENTILES}
+        for col in summary.columns
+        if col.is_numeric and col.p50 is not None
+    }
+
+
+async def _save_upload(
+    file: UploadFile,
+    target: Optional[Path] = None,
+    digest: Optional[Any] = None,
+) -> Path:
+    """
+    Копирует загрузку в ``target`` (по умолчанию – во временный файл с тем же
+    расширением, по нему выбирается формат) блоками по UPLOAD_BLOCK_BYTES,
+    не держа тело запроса в памяти целиком. Если передан ``digest`` (объект
+    hashlib), он обновляется теми же блоками. Файл удаляет вызывающий.
+    """
+    if target is None:
+        suffix = Path(file.filename or "").suffix.lower() or ".csv"
+        fd, name = tempfile.mkstemp(prefix="eda_upload_", suffix=suffix)
+    else:
+        fd, name = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644), str(target)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                block = await file.read(UPLOAD_BLOCK_BYTES)
+                if not block:
+                    break
+                if digest is not None:
+                    digest.update(block)
+                out.write(block)
+    except BaseException:
+        os.unlink(name)
+        raise
+    return Path(name)
+
+
+def _parse_etags(header: Optional[str]) -> List[str]:
+    """Значения из If-None-Match (без кавычек и префикса W/)."""
+    if not header:
+        return []
+    tags = []
+    for part in header.split(","):
+        part = part.strip()
+        if part.startswith("W/"):
+            part = part[2:]
+        tags.append(part.strip('"'))
+    return tags
+
+
+def _result_key(content_hash: str, endpoint: str, params: Dict[str, Any]) -> str:
+    payload = json.dumps([content_hash, endpoint, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def _cached_upload_job(
+    file: Optional[UploadFile],
+    if_none_match: Optional[str],
+    endpoint: str,
+    params: Dict[str, Any],
+    func: Callable[..., Dict[str, Any]],
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Результат ``func(path, **params)`` по загрузке с кэшем по содержимому.
+
+    Возвращает ``(результат, etag)``; результат None означает, что у клиента
+    уже есть актуальный ответ (его ETag в If-None-Match) – нужно ответить 304.
+    """
+    etags = _parse_etags(if_none_match)
+    if file is None:
+        # Клиент не прислал файл: ответить можно только по ETag из кэша
+        for tag in etags:
+            cached = _results.get(tag)
+            if cached is not None and cached[0] == (endpoint, params):
+                return None, tag
+        raise HTTPException(
+            status_code=412,
+            detail="Файл не передан, а ETag из If-None-Match не найден в кэше",
+        )
+
+    digest = hashlib.sha256()
+    path = await _save_upload(file, digest=digest)
+    try:
+        key = _result_key(digest.hexdigest(), endpoint, params)
+        if key in etags:
+            return None, key
+        return await _cached_result(digest.hexdigest(), path, endpoint, params, func)
+    finally:
+        path.unlink(missing_ok=True)
+
+
+async def _cached_result(
+    content_hash: str,
+    path: Path,
+    endpoint: str,
+    params: Dict[str, Any],
+    func: Callable[..., Dict[str, Any]],
+) -> Tuple[Dict[str, Any], str]:
+    """Результат ``func(path, **params)`` из кэша или посчитанный в пуле; второе значение – ETag."""
+    key = _result_key(content_hash, endpoint, params)
+    cached = _results.get(key)
+    if cached is not None:
+        return cached[1], key
+    # Чтение и профилирование по чанкам – в пуле, event loop остаётся свободным
+    result = await _run_in_pool(func, str(path), **params)
+    _results.put(key, ((endpoint, params), result))
+    return result, key
+
+
+UNSUPPORTED_FORMAT = "Файл должен быть в формате CSV, Parquet, Feather или Arrow IPC"
+
+# Расширения архивов, которые принимает /quality-batch
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+API_BATCH_MAX_FILES = int(os.environ.get("EDA_API_BATCH_MAX_FILES", 1000))
+
+
+def _extract_archive(archive: str, dest: str) -> List[Tuple[str, str, str]]:
+    """
+    Распаковать файлы данных (CSV, Parquet, ...) из zip/tar-архива в ``dest``
+    (выполняется в пуле).
+
+    Файлы получают собственные имена в ``dest`` (пути из архива на диск не
+    попадают). Возвращает ``(имя в архиве, путь на диске, sha256 содержимого)``.
+    """
+    members: List[Tuple[str, str, str]] = []
+
+    def copy(name: str, src: Any) -> None:
+        target = Path(dest) / f"member_{len(members):05d}{Path(name).suffix.lower()}"
+        digest = hashlib.sha256()
+        with open(target, "wb") as out:
+            for block in iter(lambda: src.read(UPLOAD_BLOCK_BYTES), b""):
+                digest.update(block)
+                out.write(block)
+        members.append((name, str(target), digest.hexdigest()))
+
+    def wanted(name: str) -> bool:
+        return is_supported(name) and "__MACOSX/" not in name
+
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and wanted(info.filename):
+                    with zf.open(info) as src:
+                        copy(info.filename, src)
+    else:
+        with tarfile.open(archive) as tf:
+            for member in tf:
+                if member.isfile() and wanted(member.name):
+                    src = tf.extractfile(member)
+                    if src is not None:
+                        copy(member.name, src)
+    return members
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": f'"{etag}"'})
+
+
+def _profile_upload(path: str) -> DatasetAccumulator:
+    """Потоковое профилирование сохранённой загрузки (пустой CSV – ошибка)."""
+    acc = profile_csv(path, chunksize=API_CHUNKSIZE, exact_unique_columns=ID_COLUMNS)
+    if acc.n_rows == 0:
+        raise pd.errors.EmptyDataError("CSV файл пуст или не содержит данных")
+    return acc
+
+
+# === ЗАДАЧИ ДЛЯ ПУЛА (выполняются вне event loop) ===
+def _quality_job(path: str, min_rows: int, max_missing_threshold: float) -> Dict[str, Any]:
+    """Оценка качества CSV: всё CPU-bound чтение и профилирование."""
+    acc = _profile_upload(path)
+
+    # Используем логику из нашего проекта HW03 (агрегаты собраны по чанкам)
+    summary: DatasetSummary = acc.to_summary()
+    missing_df = acc.missing_table()
+    flags = compute_quality_flags(summary, missing_df)
+
+    # Определяем, подходит ли датасет для модели
+    ok_for_model = (
+        summary.n_rows >= min_rows and
+        flags.get("max_missing_share", 1.0) < max_missing_threshold and
+        not flags.get("too_many_missing", True) and
+        not flags.get("has_constant_columns", False)  # Используем нашу новую эвристику
+    )
+
+    return {
+        "ok_for_model": ok_for_model,
+        "quality_score": round(flags.get("quality_score", 0.0), 3),
+        "dataset_info": {
+            "n_rows": summary.n_rows,
+            "n_cols": summary.n_cols,
+        },
+        "flags": flags,  # Включаем ВСЕ флаги из HW03
+        "percentiles": _numeric_percentiles(summary),
+    }
+
+
+def _quality_flags_job(
+    path: str,
+    high_cardinality_threshold: int,
+    zero_values_threshold: float,
+) -> Dict[str, Any]:
+    """Полный набор флагов качества CSV (выполняется в пуле)."""
+    acc = _profile_upload(path)
+
+    # Используем логику из HW03 (агрегаты собраны по чанкам)
+    summary: DatasetSummary = acc.to_summary()
+    missing_df = acc.missing_table()
+
+    # === ВЫЗЫВАЕМ НАШУ ФУНКЦИЮ ИЗ HW03 ===
+    flags = compute_quality_flags(summary, missing_df)
+    # === КОНЕЦ ВЫЗОВА ===
+
+    # Дополнительная проверка на дубликаты ID (если есть колонка 'user_id' или 'id'):
+    # дубликаты есть, если различных значений (пропуск – тоже значение) меньше строк.
+    # Для ID_COLUMNS уникальные посчитаны точно (без HyperLogLog) при любом числе строк.
+    columns = {col.name: col for col in summary.columns}
+    id_col = next((columns[name] for name in ID_COLUMNS if name in columns), None)
+    has_id_duplicates = False
+    if id_col is not None and id_col.unique is not None:
+        distinct = id_col.unique + (1 if id_col.missing > 0 else 0)
+        # оценку (если колонка всё же профилирована приближённо) сравниваем
+        # с запасом в три стандартные ошибки HyperLogLog
+        slack = 3 * UNIQUE_ERROR * summary.n_rows if id_col.unique_is_estimate else 0
+        has_id_duplicates = distinct < summary.n_rows - slack
+
+    # Добавляем эту проверку в флаги
+    flags["has_suspicious_id_duplicates"] = has_id_duplicates
+
+    # Проверка на много нулей в числовых колонках (нули посчитаны при профилировании)
+    has_many_zeros = False
+    for col in summary.columns:
+        if not col.is_numeric or col.dtype == "bool" or not col.zero_count:
+            continue
+        zero_share = col.zero_count / summary.n_rows
+        if zero_share > zero_values_threshold:
+            has_many_zeros = True
+            break
+
+    flags["has_many_zero_values"] = has_many_zeros
+    flags["zero_values_threshold"] = zero_values_threshold
+    flags["high_cardinality_threshold"] = high_cardinality_threshold
+
+    return {
+        "flags": flags,  # Все флаги из compute_quality_flags + дополнительные
+        "additional_flags": {
+            "has_suspicious_id_duplicates": has_id_duplicates,
+            "has_many_zero_values": has_many_zeros,
+            "zero_values_threshold": zero_values_threshold,
+            "high_cardinality_threshold": high_cardinality_threshold,
+        },
+        "dataset_info": {
+            "n_rows": summary.n_rows,
+            "n_cols": summary.n_cols,
+        },
+        "percentiles": _numeric_percentiles(summary),
+    }
+
+
+async def _submit_report(
+    file: UploadFile,
+    base_dir: Optional[str] = None,
+    **params: Any,
+) -> ReportJob:
+    """Создать задачу отчёта, сохранить в неё загрузку и поставить в очередь."""
+    try:
+        job = _jobs.create(source_name=file.filename, base_dir=base_dir)
+    except JobQueueFull as exc:
+        raise HTTPException(status_code=503, detail=f"Очередь отчётов заполнена: {exc}")
+    await _save_upload(file, _jobs.input_path(job))
+    _jobs.submit(job, **params)
+    return job
+
+
+def _job_response(job: ReportJob) -> Dict[str, Any]:
+    result = {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "stages": job.stages,
+        "error": job.error,
+        "source_name": job.source_name,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "status_url": f"/reports/{job.id}",
+    }
+    if job.status == "done":
+        result["artifacts"] = {
+            name: f"/reports/{job.id}/artifacts/{name}" for name in _jobs.artifacts(job)
+        }
+    return result
+
+
 # === БАЗОВЫЙ ЭНДПОИНТ ИЗ СЕМИНАРА ===
 @app.get("/health")
 async def health_check() -> Dict[str, Any]:
@@ -79,58 +457,53 @@ async def quality_check(data: Dict[str, Any]) -> Dict[str, Any]:
 
 @app.post("/quality-from-csv")
 async def quality_from_csv(
-    file: UploadFile = File(...),
+    response: Response,
+    file: Optional[UploadFile] = File(None),
     min_rows: int = 50,
     max_missing_threshold: float = 0.5,
-) -> Dict[str, Any]:
-    """Оценка качества датасета из CSV-файла."""
+    if_none_match: Optional[str] = Header(None),
+) -> Any:
+    """
+    Оценка качества датасета из CSV-файла.
+
+    Ответ кэшируется по содержимому файла и параметрам (заголовок ETag);
+    с If-None-Match файл можно не передавать – при попадании в кэш ответ 304.
+    """
     start_time = time.time()
     
     # Проверка расширения файла
-    if not file.filename or not file.filename.lower().endswith('.csv'):
+    if file is not None and (not file.filename or not is_supported(file.filename)):
         raise HTTPException(
             status_code=400,
-            detail="Файл должен быть в формате CSV"
+            detail=UNSUPPORTED_FORMAT
         )
     
     try:
-        # Чтение CSV
-        contents = await file.read()
-        df = pd.read_csv(pd.io.common.BytesIO(contents))
-        
-        # Проверка на пустой датасет
-        if df.empty:
-            raise HTTPException(
-                status_code=400,
-                detail="CSV файл пуст или не содержит данных"
-            )
-        
-        # Используем логику из нашего проекта HW03
-        summary: DatasetSummary = summarize_dataset(df)
-        missing_df = missing_table(df)
-        flags = compute_quality_flags(summary, missing_df)
-        
-        # Определяем, подходит ли датасет для модели
-        ok_for_model = (
-            summary.n_rows >= min_rows and
-            flags.get("max_missing_share", 1.0) < max_missing_threshold and
-            not flags.get("too_many_missing", True) and
-            not flags.get("has_constant_columns", False)  # Используем нашу новую эвристику
+        # Загрузка пишется на диск блоками, результат берётся из кэша или считается в пуле
+        result, etag = await _cached_upload_job(
+            file,
+            if_none_match,
+            "quality",
+            {"min_rows": min_rows, "max_missing_threshold": max_missing_threshold},
+            _quality_job,
         )
+        if result is None:
+            return _not_modified(etag)
+        response.headers["ETag"] = f'"{etag}"'
         
         latency_ms = (time.time() - start_time) * 1000
         
         return {
-            "ok_for_model": ok_for_model,
-            "quality_score": round(flags.get("quality_score", 0.0), 3),
+            "ok_for_model": result["ok_for_model"],
+            "quality_score": result["quality_score"],
             "latency_ms": round(latency_ms, 2),
-            "dataset_info": {
-                "n_rows": summary.n_rows,
-                "n_cols": summary.n_cols,
-            },
-            "flags": flags,  # Включаем ВСЕ флаги из HW03
+            "dataset_info": result["dataset_info"],
+            "flags": result["flags"],
+            "percentiles": result["percentiles"],
         }
         
+    except HTTPException:
+        raise
     except pd.errors.EmptyDataError:
         raise HTTPException(
             status_code=400,
@@ -147,83 +520,57 @@ async def quality_from_csv(
 # === НОВЫЙ ЭНДПОИНТ ДЛЯ HW04 (ОБЯЗАТЕЛЬНЫЙ) ===
 @app.post("/quality-flags-from-csv")
 async def quality_flags_from_csv(
-    file: UploadFile = File(...),
+    response: Response,
+    file: Optional[UploadFile] = File(None),
     high_cardinality_threshold: int = 50,
     zero_values_threshold: float = 0.3,
-) -> Dict[str, Any]:
+    if_none_match: Optional[str] = Header(None),
+) -> Any:
     """
     Возвращает полный набор флагов качества из CSV-файла.
     Включает все эвристики, добавленные в HW03.
+    Кэширование и ETag – как в /quality-from-csv.
     """
     start_time = time.time()
     
     # Проверка файла
-    if not file.filename or not file.filename.lower().endswith('.csv'):
+    if file is not None and (not file.filename or not is_supported(file.filename)):
         raise HTTPException(
             status_code=400,
-            detail="Файл должен быть в формате CSV"
+            detail=UNSUPPORTED_FORMAT
         )
     
     try:
-        # Чтение CSV
-        contents = await file.read()
-        df = pd.read_csv(pd.io.common.BytesIO(contents))
-        
-        if df.empty:
-            raise HTTPException(
-                status_code=400,
-                detail="CSV файл пуст"
-            )
-        
-        # Используем логику из HW03
-        summary: DatasetSummary = summarize_dataset(df)
-        missing_df = missing_table(df)
-        
-        # === ВЫЗЫВАЕМ НАШУ ФУНКЦИЮ ИЗ HW03 ===
-        flags = compute_quality_flags(summary, missing_df)
-        # === КОНЕЦ ВЫЗОВА ===
-        
-        # Дополнительная проверка на дубликаты ID (если есть колонка 'user_id' или 'id')
-        has_id_duplicates = False
-        if 'user_id' in df.columns:
-            has_id_duplicates = df['user_id'].duplicated().any()
-        elif 'id' in df.columns:
-            has_id_duplicates = df['id'].duplicated().any()
-        
-        # Добавляем эту проверку в флаги
-        flags["has_suspicious_id_duplicates"] = has_id_duplicates
-        
-        # Проверка на много нулей в числовых колонках
-        has_many_zeros = False
-        numeric_cols = df.select_dtypes(include='number').columns
-        for col in numeric_cols:
-            zero_share = (df[col] == 0).sum() / len(df)
-            if zero_share > zero_values_threshold:
-                has_many_zeros = True
-                break
-        
-        flags["has_many_zero_values"] = has_many_zeros
-        flags["zero_values_threshold"] = zero_values_threshold
-        flags["high_cardinality_threshold"] = high_cardinality_threshold
+        # Загрузка пишется на диск блоками, результат берётся из кэша или считается в пуле
+        result, etag = await _cached_upload_job(
+            file,
+            if_none_match,
+            "quality-flags",
+            {
+                "high_cardinality_threshold": high_cardinality_threshold,
+                "zero_values_threshold": zero_values_threshold,
+            },
+            _quality_flags_job,
+        )
+        if result is None:
+            return _not_modified(etag)
+        response.headers["ETag"] = f'"{etag}"'
         
         latency_ms = (time.time() - start_time) * 1000
         
         return {
-            "flags": flags,  # Все флаги из compute_quality_flags + дополнительные
-            "additional_flags": {
-                "has_suspicious_id_duplicates": has_id_duplicates,
-                "has_many_zero_values": has_many_zeros,
-                "zero_values_threshold": zero_values_threshold,
-                "high_cardinality_threshold": high_cardinality_threshold,
-            },
+            "flags": result["flags"],  # Все флаги из compute_quality_flags + дополнительные
+            "additional_flags": result["additional_flags"],
             "latency_ms": round(latency_ms, 2),
             "dataset_info": {
-                "n_rows": summary.n_rows,
-                "n_cols": summary.n_cols,
-                "file_name": file.filename,
-            }
+                **result["dataset_info"],
+                "file_name": file.filename if file is not None else None,
+            },
+            "percentiles": result["percentiles"],
         }
         
+    except HTTPException:
+        raise
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=400, detail="CSV файл пуст")
     except Exception as e:
@@ -234,81 +581,175 @@ async def quality_flags_from_csv(
 # === КОНЕЦ НОВОГО ЭНДПОИНТА ===
 
 
+# === ПАКЕТНАЯ ПРОВЕРКА МНОГИХ ФАЙЛОВ ===
+@app.post("/quality-batch")
+async def quality_batch(
+    files: List[UploadFile] = File(...),
+    min_rows: int = 50,
+    max_missing_threshold: float = 0.5,
+) -> StreamingResponse:
+    """
+    Оценка качества многих CSV за один запрос: файлы в multipart и/или
+    zip/tar-архивы с CSV внутри.
+
+    Файлы профилируются параллельно в пуле (как в /quality-from-csv, с тем же
+    кэшем результатов). Ответ – NDJSON: по строке на файл в порядке готовности,
+    последняя строка – сводный вердикт ``{"summary": {...}}``.
+    """
+    params = {"min_rows": min_rows, "max_missing_threshold": max_missing_threshold}
+    work_dir = Path(tempfile.mkdtemp(prefix="eda_batch_"))
+    try:
+        # (имя файла, путь на диске, sha256) или (имя файла, None, текст ошибки)
+        entries: List[Tuple[str, Optional[Path], str]] = []
+        for i, upload in enumerate(files):
+            name = upload.filename or f"file_{i}"
+            lower = name.lower()
+            if is_supported(lower):
+                digest = hashlib.sha256()
+                target = work_dir / f"upload_{i:05d}{Path(lower).suffix}"
+                path = await _save_upload(upload, target, digest=digest)
+                entries.append((name, path, digest.hexdigest()))
+            elif lower.endswith(ARCHIVE_SUFFIXES):
+                archive = await _save_upload(upload, work_dir / f"archive_{i:05d}")
+                member_dir = work_dir / f"archive_{i:05d}_members"
+                member_dir.mkdir()
+                try:
+                    members = await _run_in_pool(_extract_archive, str(archive), str(member_dir))
+                except (zipfile.BadZipFile, tarfile.TarError) as exc:
+                    entries.append((name, None, f"Не удалось распаковать архив: {exc}"))
+                    continue
+                finally:
+                    archive.unlink(missing_ok=True)
+                entries.extend((f"{name}/{member}", Path(path), sha) for member, path, sha in members)
+            else:
+                entries.append((name, None, f"{UNSUPPORTED_FORMAT} или zip/tar-архивом"))
+            if len(entries) > API_BATCH_MAX_FILES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Слишком много файлов в пакете (максимум {API_BATCH_MAX_FILES})",
+                )
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+    async def check(name: str, path: Optional[Path], content: str) -> Dict[str, Any]:
+        if path is None:
+            return {"file": name, "error": content}
+        try:
+            result, etag = await _cached_result(content, path, "quality", params, _quality_job)
+        except pd.errors.EmptyDataError:
+            return {"file": name, "error": "CSV файл пуст или не содержит данных"}
+        except Exception as e:  # noqa: BLE001
+            return {"file": name, "error": f"Ошибка обработки файла: {e}"}
+        finally:
+            path.unlink(missing_ok=True)
+        return {"file": name, "etag": etag, **result}
+
+    async def stream() -> AsyncIterator[bytes]:
+        start_time = time.time()
+        tasks = [asyncio.create_task(check(*entry)) for entry in entries]
+        scores: List[float] = []
+        n_ok = n_errors = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                if "error" in line:
+                    n_errors += 1
+                else:
+                    scores.append(line["quality_score"])
+                    n_ok += bool(line["ok_for_model"])
+                yield (json.dumps(line, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+            summary = {
+                "files": len(entries),
+                "ok_for_model_files": n_ok,
+                "failed_files": len(scores) - n_ok,
+                "error_files": n_errors,
+                "ok_for_model": bool(entries) and n_ok == len(entries),
+                "min_quality_score": min(scores) if scores else None,
+                "mean_quality_score": round(sum(scores) / len(scores), 3) if scores else None,
+                "latency_ms": round((time.time() - start_time) * 1000, 2),
+            }
+            yield (json.dumps({"summary": summary}, ensure_ascii=False) + "\n").encode("utf-8")
+        finally:
+            for task in tasks:
+                task.cancel()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+# === ФОНОВАЯ ГЕНЕРАЦИЯ ОТЧЁТОВ ===
+@app.post("/reports", status_code=202)
+async def create_report(
+    file: UploadFile = File(...),
+    sep: str = ",",
+    max_hist_columns: int = 6,
+    top_k_categories: int = 5,
+    title: str = "EDA-отчёт",
+    min_missing_share: float = 0.3,
+    chunksize: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Ставит в очередь полный EDA-отчёт (как ``eda-cli report``, с графиками)
+    и сразу возвращает id задачи. Прогресс – GET /reports/{job_id}.
+    """
+    if not file.filename or not is_supported(file.filename):
+        raise HTTPException(status_code=400, detail=UNSUPPORTED_FORMAT)
+    job = await _submit_report(
+        file,
+        sep=sep,
+        max_hist_columns=max_hist_columns,
+        top_k_categories=top_k_categories,
+        title=title,
+        min_missing_share=min_missing_share,
+        chunksize=chunksize,
+    )
+    return _job_response(job)
+
+
+@app.get("/reports/{job_id}")
+async def get_report(job_id: str) -> Dict[str, Any]:
+    """Статус задачи по этапам; для готового отчёта – ссылки на артефакты."""
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return _job_response(job)
+
+
+@app.get("/reports/{job_id}/artifacts/{name:path}")
+async def get_report_artifact(job_id: str, name: str) -> FileResponse:
+    """Файл из каталога отчёта (report.md, summary.csv, графики и т.д.)."""
+    job = _jobs.get(job_id)
+    path = _jobs.artifact_path(job, name) if job is not None else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="Артефакт не найден")
+    return FileResponse(path)
+
+
 # === ДОПОЛНИТЕЛЬНЫЙ ЭНДПОИНТ (ОПЦИОНАЛЬНО) ===
-@app.post("/report-from-csv")
+@app.post("/report-from-csv", status_code=202)
 async def report_from_csv(
     file: UploadFile = File(...),
     max_hist_columns: int = 6,
     top_k_categories: int = 5,
-    out_dir: str = "api_reports",
+    out_dir: str = API_REPORTS_DIR,
 ) -> Dict[str, Any]:
     """
-    Генерирует полный EDA-отчёт из CSV-файла.
-    Использует параметры из HW03.
+    Генерирует полный EDA-отчёт из CSV-файла в фоне (см. POST /reports).
+    Отчёт появится в ``<out_dir>/<job_id>/report``.
     """
-    try:
-        # Чтение CSV
-        contents = await file.read()
-        df = pd.read_csv(pd.io.common.BytesIO(contents))
-        
-        if df.empty:
-            raise HTTPException(status_code=400, detail="CSV файл пуст")
-        
-        # Создаем директорию для отчёта
-        report_dir = Path(out_dir) / f"report_{uuid.uuid4().hex[:8]}"
-        report_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Сохраняем CSV для обработки CLI
-        temp_csv = report_dir / "temp_data.csv"
-        df.to_csv(temp_csv, index=False)
-        
-        # Здесь можно было бы вызвать CLI команду,
-        # но для простоты делаем базовую обработку
-        
-        summary = summarize_dataset(df)
-        missing_df = missing_table(df)
-        flags = compute_quality_flags(summary, missing_df)
-        
-        # Сохраняем базовую информацию
-        import json
-        report_info = {
-            "dataset_info": {
-                "n_rows": summary.n_rows,
-                "n_cols": summary.n_cols,
-                "file_name": file.filename,
-            },
-            "quality_flags": flags,
-            "report_settings": {
-                "max_hist_columns": max_hist_columns,
-                "top_k_categories": top_k_categories,
-                "out_dir": str(report_dir),
-            },
-            "report_files": [
-                str(report_dir / "dataset_info.json"),
-                str(report_dir / "temp_data.csv"),
-            ]
-        }
-        
-        # Сохраняем JSON с информацией
-        with open(report_dir / "dataset_info.json", "w") as f:
-            json.dump(report_info, f, indent=2, default=str)
-        
-        # Удаляем временный CSV
-        temp_csv.unlink()
-        
-        return {
-            "status": "report_generated",
-            "report_dir": str(report_dir),
-            "message": f"Отчёт сгенерирован в {report_dir}",
-            "dataset_info": report_info["dataset_info"],
-            "quality_score": flags.get("quality_score", 0.0),
-        }
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Ошибка генерации отчёта: {str(e)}"
-        )
+    job = await _submit_report(
+        file,
+        base_dir=out_dir,
+        max_hist_columns=max_hist_columns,
+        top_k_categories=top_k_categories,
+    )
+    return {
+        **_job_response(job),
+        "report_dir": str(job.report_dir),
+        "message": f"Отчёт поставлен в очередь, статус: /reports/{job.id}",
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,309 @@
+"""
+Постоянный кэш профилей на диске (SQLite).
+
+Ключ – отпечаток файла (путь, размер, mtime и хэш содержимого) плюс
+параметры профилирования. Значение – сериализованный профиль: DatasetSummary,
+таблица пропусков, корреляция и top-k категорий. Размер кэша ограничен,
+при переполнении вытесняются давно не использованные записи (LRU).
+
+Там же хранятся состояния инкрементального профилирования дописываемых
+файлов (смещение + агрегаты, см. streaming.profile_csv_incremental).
+
+TTLCache – небольшой кэш результатов в памяти процесса (для HTTP-сервиса).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .core import DatasetSummary
+
+PathLike = Union[str, Path]
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Хэш содержимого считается по выборке блоков: начало и конец файла плюс
+# равномерно расставленные блоки посередине. Полный хэш 20 ГБ файла стоил бы
+# столько же, сколько его чтение; вместе с размером и mtime выборки хватает,
+# чтобы заметить любое обычное изменение файла.
+_HEAD_TAIL_BYTES = 1024 * 1024
+_SAMPLE_BLOCKS = 16
+_SAMPLE_BLOCK_BYTES = 64 * 1024
+
+
+def content_hash(path: PathLike, upto: Optional[int] = None) -> str:
+    """
+    Хэш содержимого первых ``upto`` байт файла (по умолчанию – всего файла)
+    по выборке блоков.
+    """
+    size = os.path.getsize(path) if upto is None else upto
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(size).encode())
+    with open(path, "rb") as f:
+        if size <= 2 * _HEAD_TAIL_BYTES + _SAMPLE_BLOCKS * _SAMPLE_BLOCK_BYTES:
+            digest.update(f.read(size))
+            return digest.hexdigest()
+        offsets = [0, size - _HEAD_TAIL_BYTES]
+        middle = np.linspace(_HEAD_TAIL_BYTES, size - _HEAD_TAIL_BYTES, _SAMPLE_BLOCKS + 2)[1:-1]
+        for offset in sorted(offsets + [int(x) for x in middle]):
+            f.seek(offset)
+            length = _HEAD_TAIL_BYTES if offset in offsets else _SAMPLE_BLOCK_BYTES
+            digest.update(f.read(min(length, size - offset)))
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: PathLike) -> Dict[str, Any]:
+    """Отпечаток файла: абсолютный путь, размер, mtime и хэш содержимого."""
+    p = Path(path).resolve()
+    stat = p.stat()
+    return {
+        "path": str(p),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "content": content_hash(p),
+    }
+
+
+def state_key(path: PathLike, params: Dict[str, Any]) -> str:
+    """
+    Ключ состояния инкрементального профилирования: только путь и параметры –
+    содержимое файла проверяется по хэшу префикса в самом состоянии.
+    """
+    payload = json.dumps(
+        {"path": str(Path(path).resolve()), "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def profile_key(path: PathLike, params: Dict[str, Any]) -> str:
+    """Ключ кэша: отпечаток файла + параметры, влияющие на результат."""
+    payload = json.dumps(
+        {"file": file_fingerprint(path), "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _frame_to_dict(df: pd.DataFrame) -> Dict[str, Any]:
+    return {
+        "index": df.index.tolist(),
+        "columns": df.columns.tolist(),
+        "dtypes": [str(dt) for dt in df.dtypes],
+        "data": df.to_numpy(dtype=object).tolist(),
+    }
+
+
+def _frame_from_dict(data: Dict[str, Any]) -> pd.DataFrame:
+    df = pd.DataFrame(data["data"], index=data["index"], columns=data["columns"])
+    if df.empty and not data["index"]:
+        df = pd.DataFrame(columns=data["columns"])
+    return df.astype(dict(zip(data["columns"], data["dtypes"])))
+
+
+@dataclass
+class Profile:
+    """Результат профилирования, который хранится в кэше."""
+
+    summary: DatasetSummary
+    missing: pd.DataFrame = field(default_factory=pd.DataFrame)
+    correlation: pd.DataFrame = field(default_factory=pd.DataFrame)
+    top_categories: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    # Число попарно полных строк для каждой пары матрицы correlation
+    correlation_counts: pd.DataFrame = field(default_factory=pd.DataFrame)
+    # Доля пропусков по корзинам строк × колонкам (для матрицы пропусков)
+    missing_density: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+    def to_bytes(self) -> bytes:
+        payload = {
+            "summary": self.summary.to_dict(),
+            "missing": _frame_to_dict(self.missing),
+            "correlation": _frame_to_dict(self.correlation),
+            "top_categories": [
+                [name, _frame_to_dict(table)] for name, table in self.top_categories.items()
+            ],
+            "correlation_counts": _frame_to_dict(self.correlation_counts),
+            "missing_density": _frame_to_dict(self.missing_density),
+        }
+        # json сохраняет float без потерь (repr), NaN – как литерал NaN
+        return zlib.compress(json.dumps(payload, default=str).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "Profile":
+        payload = json.loads(zlib.decompress(blob).decode("utf-8"))
+        return cls(
+            summary=DatasetSummary.from_dict(payload["summary"]),
+            missing=_frame_from_dict(payload["missing"]),
+            correlation=_frame_from_dict(payload["correlation"]),
+            top_categories={
+                name: _frame_from_dict(table) for name, table in payload["top_categories"]
+            },
+            correlation_counts=(
+                _frame_from_dict(payload["correlation_counts"])
+                if "correlation_counts" in payload
+                else pd.DataFrame()
+            ),
+            missing_density=(
+                _frame_from_dict(payload["missing_density"])
+                if "missing_density" in payload
+                else pd.DataFrame()
+            ),
+        )
+
+
+def default_cache_dir() -> Path:
+    """
+    Каталог кэша по умолчанию: $EDA_CLI_CACHE_DIR или ~/.cache/eda-cli.
+    Переменная читается при каждом вызове, а не при импорте модуля.
+    """
+    return Path(os.environ.get("EDA_CLI_CACHE_DIR", Path.home() / ".cache" / "eda-cli"))
+
+
+class ProfileCache:
+    """
+    Кэш профилей в SQLite с ограничением суммарного размера и LRU-вытеснением.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[PathLike] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.db_path = self.cache_dir / "profiles.sqlite"
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS profiles (
+                    key TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS profiles_last_access ON profiles (last_access)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Соединение с транзакцией: commit при успехе, всегда close."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Profile]:
+        blob = self._get_blob(key)
+        return None if blob is None else Profile.from_bytes(blob)
+
+    def put(self, key: str, profile: Profile, source: PathLike = "") -> None:
+        self._put_blob(key, profile.to_bytes(), source)
+
+    def get_state(self, key: str) -> Optional[Any]:
+        """
+        Состояние инкрементального профилирования (streaming.IncrementalState).
+        Хранится в той же таблице и вытесняется по тем же правилам, что и профили.
+        """
+        blob = self._get_blob("state:" + key)
+        return None if blob is None else pickle.loads(zlib.decompress(blob))
+
+    def put_state(self, key: str, state: Any, source: PathLike = "") -> None:
+        self._put_blob("state:" + key, zlib.compress(pickle.dumps(state)), source)
+
+    def _get_blob(self, key: str) -> Optional[bytes]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM profiles WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE profiles SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+        return row[0]
+
+    def _put_blob(self, key: str, blob: bytes, source: PathLike = "") -> None:
+        if len(blob) > self.max_bytes:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles (key, source, payload, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, str(source), blob, len(blob), time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Удаляет давно не использованные записи, пока кэш не влезет в лимит."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM profiles").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM profiles ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM profiles WHERE key = ?", (key,))
+            total -= size
+
+    def total_bytes(self) -> int:
+        with self._connect() as conn:
+            return int(conn.execute("SELECT COALESCE(SUM(size), 0) FROM profiles").fetchone()[0])
+
+
+class TTLCache:
+    """
+    LRU-кэш в памяти: не больше ``max_entries`` записей, каждая живёт
+    ``ttl`` секунд с момента записи.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = int(max_entries)
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires <= self._clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,41 +1,199 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 import pandas as pd
 import typer
 
+from .cache import Profile, ProfileCache, profile_key, state_key
 from .core import (
+    HIST_BINS,
+    MISSING_BUCKETS,
     DatasetSummary,
     compute_quality_flags,
-    correlation_matrix,
     flatten_summary_for_print,
+    missing_density,
     missing_table,
+    missing_table_from_summary,
     summarize_dataset,
     top_categories,
 )
+from .correlation import (
+    CORR_METHODS,
+    KENDALL_MAX_ROWS,
+    WIDE_CORR_COLUMNS,
+    correlation_edges,
+    edges_from_matrix,
+    heatmap_from_edges,
+    is_edge_list,
+    pairwise_correlation,
+)
+from .readers import METADATA_FILL_FIELDS, detect_format, parquet_metadata_summary, read_frame
+from .sampling import Sample, describe_sample, sample_file, summarize_sample
+from .streaming import DatasetAccumulator, profile_csv, profile_csv_incremental
 from .viz import (
-    plot_correlation_heatmap,
-    plot_missing_matrix,
-    plot_histograms_per_column,
+    RENDERERS,
+    correlation_heatmap_job,
+    missing_density_job,
+    render_plots,
     save_top_categories_tables,
+    summary_histogram_jobs,
 )
 
 app = typer.Typer(help="Мини-CLI для EDA CSV-файлов")
 
+# Размер чанка для --incremental без явного --chunksize
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _parse_columns(columns: Optional[str]) -> Optional[List[str]]:
+    """``--columns "a,b,c"`` -> ["a", "b", "c"] (None – все колонки)."""
+    if not columns:
+        return None
+    return [name.strip() for name in columns.split(",") if name.strip()]
 
-def _load_csv(
+
+def _load_data(
     path: Path,
     sep: str = ",",
     encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+    workers: int = 1,
 ) -> pd.DataFrame:
+    """
+    CSV, Parquet, Feather или Arrow IPC (по расширению), только ``columns``.
+    CSV при ``workers > 1`` разбирается в нескольких процессах.
+    """
+    if not path.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        return read_frame(path, sep=sep, encoding=encoding, columns=columns, workers=workers)
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать файл: {exc}") from exc
+
+
+def _profile_chunked(
+    path: Path,
+    chunksize: int,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    workers: int = 1,
+    cache: Optional[ProfileCache] = None,
+    incremental: bool = False,
+    columns: Optional[Sequence[str]] = None,
+    missing_buckets: int = MISSING_BUCKETS,
+) -> DatasetAccumulator:
+    if not path.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    if chunksize <= 0:
+        raise typer.BadParameter("--chunksize должен быть положительным")
+    if incremental and cache is None:
+        raise typer.BadParameter("--incremental хранит состояние в кэше и несовместим с --no-cache")
+    if incremental and (columns or detect_format(path) != "csv"):
+        raise typer.BadParameter("--incremental поддерживается только для CSV без --columns")
+    try:
+        if not incremental:
+            return profile_csv(
+                path,
+                chunksize=chunksize,
+                sep=sep,
+                encoding=encoding,
+                workers=workers,
+                columns=columns,
+                missing_buckets=missing_buckets,
+            )
+        assert cache is not None
+        # "correlation"/"histograms"/"missing_buckets": состояния без со-моментов,
+        # гистограмм и корзин пропусков (старых версий) не подхватываются
+        key = state_key(
+            path,
+            {
+                "sep": sep,
+                "encoding": encoding,
+                "correlation": True,
+                "histograms": True,
+                "missing_buckets": missing_buckets,
+            },
+        )
+        acc, state = profile_csv_incremental(
+            path,
+            cache.get_state(key),
+            chunksize=chunksize,
+            sep=sep,
+            encoding=encoding,
+            workers=workers,
+            missing_buckets=missing_buckets,
+        )
+        if state is not None:
+            cache.put_state(key, state, source=path)
+        return acc
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать файл: {exc}") from exc
+
+
+def _sample_data(
+    path: Path,
+    sample: Optional[int],
+    sample_frac: Optional[float],
+    stratify: Optional[str],
+    chunksize: Optional[int],
+    sep: str = ",",
+    encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+) -> Sample:
+    """Однопроходная выборка для --sample / --sample-frac (seed фиксирован)."""
     if not path.exists():
         raise typer.BadParameter(f"Файл '{path}' не найден")
+    if sample is not None and sample_frac is not None:
+        raise typer.BadParameter("Укажите только одно из --sample и --sample-frac")
     try:
-        return pd.read_csv(path, sep=sep, encoding=encoding)
+        return sample_file(
+            path,
+            n=sample,
+            frac=sample_frac,
+            stratify=stratify,
+            chunksize=chunksize or DEFAULT_CHUNKSIZE,
+            sep=sep,
+            encoding=encoding,
+            columns=columns,
+        )
     except Exception as exc:  # noqa: BLE001
-        raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
+        raise typer.BadParameter(f"Не удалось построить выборку: {exc}") from exc
+
+
+def _check_sampling(sampling: bool, stratify: Optional[str], incremental: bool) -> None:
+    if stratify is not None and not sampling:
+        raise typer.BadParameter("--stratify работает только вместе с --sample или --sample-frac")
+    if sampling and incremental:
+        raise typer.BadParameter("Выборочный режим несовместим с --incremental")
+
+
+def _open_cache(enabled: bool, cache_dir: Optional[str]) -> Optional[ProfileCache]:
+    if not enabled:
+        return None
+    return ProfileCache(cache_dir or None)
+
+
+def _cached_profile(
+    path: Path,
+    cache: Optional[ProfileCache],
+    params: Dict[str, Any],
+    build: Callable[[], Profile],
+) -> Profile:
+    """
+    Профиль из кэша, если файл не менялся; иначе ``build()`` и запись в кэш.
+    Ключ считается до профилирования: если файл изменится во время работы,
+    запись просто не совпадёт со следующим отпечатком.
+    """
+    if cache is None or not path.exists():
+        return build()
+    key = profile_key(path, params)
+    profile = cache.get(key)
+    if profile is None:
+        profile = build()
+        cache.put(key, profile, source=path)
+    return profile
 
 
 @app.command()
@@ -43,89 +201,320 @@ def overview(
     path: str = typer.Argument(..., help="Путь к CSV-файлу."),
     sep: str = typer.Option(",", help="Разделитель в CSV."),
     encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: Optional[int] = typer.Option(
+        None,
+        help="Читать CSV чанками по N строк (потоковый режим для больших файлов).",
+    ),
+    workers: int = typer.Option(
+        1,
+        help="Число процессов для разбора CSV и профилирования колонок (или чанков при --chunksize).",
+    ),
+    cache: bool = typer.Option(
+        True,
+        help="Брать профиль из дискового кэша, если файл не менялся.",
+    ),
+    cache_dir: Optional[str] = typer.Option(
+        None,
+        help="Каталог кэша профилей (по умолчанию ~/.cache/eda-cli или $EDA_CLI_CACHE_DIR).",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        help="Для дописываемых файлов: разбирать только новые строки (потоковый режим).",
+    ),
+    columns: Optional[str] = typer.Option(
+        None,
+        help="Профилировать только эти колонки (через запятую); для Parquet/Arrow читаются только они.",
+    ),
+    metadata_only: bool = typer.Option(
+        False,
+        help="Только для Parquet: строки, пропуски, min/max из статистик футера.",
+    ),
+    metadata_fill: str = typer.Option(
+        "",
+        help="С --metadata-only: какие поля досчитать по данным через запятую "
+        f"({', '.join(METADATA_FILL_FIELDS)}; только нужные колонки, по row group). "
+        "По умолчанию – только футер, без чтения данных.",
+    ),
+    sample: Optional[int] = typer.Option(
+        None,
+        help="Оценить статистики по случайной выборке из N строк (один проход по файлу).",
+    ),
+    sample_frac: Optional[float] = typer.Option(
+        None,
+        help="Оценить статистики по случайной выборке такой доли строк.",
+    ),
+    stratify: Optional[str] = typer.Option(
+        None,
+        help="Стратифицировать выборку по этой колонке.",
+    ),
 ) -> None:
     """
     Напечатать краткий обзор датасета:
     - размеры;
     - типы;
     - простая табличка по колонкам.
+
+    Кроме CSV читаются Parquet, Feather и Arrow IPC (по расширению файла).
     """
-    df = _load_csv(Path(path), sep=sep, encoding=encoding)
-    summary: DatasetSummary = summarize_dataset(df)
+    columns_list = _parse_columns(columns)
+    sampling = sample is not None or sample_frac is not None
+    _check_sampling(sampling, stratify, incremental)
+    streaming = not sampling and (bool(chunksize) or incremental)
+    if metadata_only and (detect_format(path) != "parquet" or streaming or sampling):
+        raise typer.BadParameter("--metadata-only работает только для Parquet и без потокового режима.")
+    fill = [name.strip() for name in metadata_fill.split(",") if name.strip()]
+    if set(fill) - set(METADATA_FILL_FIELDS):
+        raise typer.BadParameter(f"--metadata-fill: допустимы поля {', '.join(METADATA_FILL_FIELDS)}")
+    profile_cache = _open_cache(cache, cache_dir)
+
+    def build() -> Profile:
+        if metadata_only:
+            return Profile(summary=parquet_metadata_summary(path, columns=columns_list, fill=fill))
+        if sampling:
+            sampled = _sample_data(
+                Path(path), sample, sample_frac, stratify, chunksize, sep=sep, encoding=encoding, columns=columns_list
+            )
+            return Profile(summary=summarize_sample(sampled))
+        if streaming:
+            acc = _profile_chunked(
+                Path(path),
+                chunksize or DEFAULT_CHUNKSIZE,
+                sep=sep,
+                encoding=encoding,
+                workers=workers,
+                cache=profile_cache,
+                incremental=incremental,
+                columns=columns_list,
+            )
+            return Profile(summary=acc.to_summary())
+        df = _load_data(Path(path), sep=sep, encoding=encoding, columns=columns_list, workers=workers)
+        return Profile(summary=summarize_dataset(df, workers=workers))
+
+    params = {
+        "kind": "overview",
+        "sep": sep,
+        "encoding": encoding,
+        "streaming": streaming,
+        "columns": columns_list,
+        "metadata_only": metadata_only,
+        "metadata_fill": fill if metadata_only else None,
+        "sample": [sample, sample_frac, stratify] if sampling else None,
+    }
+    summary: DatasetSummary = _cached_profile(Path(path), profile_cache, params, build).summary
     summary_df = flatten_summary_for_print(summary)
 
+    if summary.is_sample:
+        typer.echo(
+            f"Оценки по выборке из {summary.sample_rows} строк "
+            f"(интервалы {summary.confidence:.0%}: mean_ci, std_ci, missing_share_ci)"
+        )
     typer.echo(f"Строк: {summary.n_rows}")
     typer.echo(f"Столбцов: {summary.n_cols}")
     typer.echo("\nКолонки:")
     typer.echo(summary_df.to_string(index=False))
 
 
-@app.command()
-def report(
-    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
-    out_dir: str = typer.Option("reports", help="Каталог для отчёта."),
-    sep: str = typer.Option(",", help="Разделитель в CSV."),
-    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
-    # ========== НОВЫЕ ПАРАМЕТРЫ ==========
-    max_hist_columns: int = typer.Option(
-        6, 
-        help="Максимум числовых колонок для гистограмм."
-    ),
-    top_k_categories: int = typer.Option(
-        5, 
-        help="Сколько top-значений выводить для категориальных признаков."
-    ),
-    title: str = typer.Option(
-        "EDA-отчёт", 
-        help="Заголовок отчёта в Markdown."
-    ),
-    min_missing_share: float = typer.Option(
-        0.3, 
-        help="Порог доли пропусков для проблемных колонок."
-    ),
-) -> None:
+# Названия методов корреляции для report.md
+CORR_METHOD_TITLES = {
+    "pearson": "Пирсон",
+    "spearman": "Спирмен (ранговая)",
+    "kendall": f"Кендалл tau-b (ранговая; по подвыборке до {KENDALL_MAX_ROWS} строк)",
+}
+
+# Подписи шкалы тепловой карты
+CORR_SCALE_LABELS = {"pearson": "Pearson r", "spearman": "Spearman rho", "kendall": "Kendall tau"}
+
+# Этапы generate_report в порядке выполнения (для отслеживания прогресса)
+REPORT_STAGES = ("profile", "tables", "markdown", "plots")
+
+
+def generate_report(
+    path: str,
+    out_dir: str = "reports",
+    sep: str = ",",
+    encoding: str = "utf-8",
+    max_hist_columns: int = 6,
+    top_k_categories: int = 5,
+    title: str = "EDA-отчёт",
+    min_missing_share: float = 0.3,
+    chunksize: Optional[int] = None,
+    workers: int = 1,
+    cache: bool = True,
+    cache_dir: Optional[str] = None,
+    incremental: bool = False,
+    columns: Optional[Sequence[str]] = None,
+    source_name: Optional[str] = None,
+    progress: Optional[Callable[[str], None]] = None,
+    sample: Optional[int] = None,
+    sample_frac: Optional[float] = None,
+    stratify: Optional[str] = None,
+    corr_top_k: Optional[int] = None,
+    corr_threshold: Optional[float] = None,
+    corr_method: str = "pearson",
+    missing_buckets: int = MISSING_BUCKETS,
+    renderer: str = "matplotlib",
+) -> Path:
     """
-    Сгенерировать полный EDA-отчёт:
-    - текстовый overview и summary по колонкам (CSV/Markdown);
-    - статистика пропусков;
-    - корреляционная матрица;
-    - top-k категорий по категориальным признакам;
-    - картинки: гистограммы, матрица пропусков, heatmap корреляции.
+    Полный конвейер команды ``report``: профиль, таблицы, Markdown и графики
+    в каталоге ``out_dir``. Возвращает путь к ``report.md``.
+
+    ``progress`` вызывается с именем этапа из REPORT_STAGES перед его началом;
+    ``source_name`` – имя исходного файла для отчёта (по умолчанию имя ``path``);
+    ``columns`` – профилировать только эти колонки; ``sample``/``sample_frac``
+    (и ``stratify``) – считать оценки по однопроходной случайной выборке.
+
+    Если задан ``corr_top_k`` или ``corr_threshold`` либо числовых колонок
+    больше WIDE_CORR_COLUMNS, вместо матрицы p×p сохраняется список сильных
+    пар ``correlation_edges.csv``, а тепловая карта строится по самым связанным
+    колонкам. ``corr_method`` – "pearson", "spearman" или "kendall"
+    (ранговые методы – только без потокового режима). Матрица пропусков –
+    доли пропусков в не более чем ``missing_buckets`` корзинах строк, они
+    считаются при профилировании (и в потоковом режиме), так что при
+    попадании в кэш файл не читается вовсе. ``renderer="fast"`` рисует
+    матрицу пропусков и тепловую карту напрямую в PNG, без matplotlib
+    (кроме подписей вне пиксельного шрифта, см. fastplot).
     """
+
+    def _stage(name: str) -> None:
+        if progress is not None:
+            progress(name)
+
     out_root = Path(out_dir)
     out_root.mkdir(parents=True, exist_ok=True)
 
-    df = _load_csv(Path(path), sep=sep, encoding=encoding)
+    sampling = sample is not None or sample_frac is not None
+    _check_sampling(sampling, stratify, incremental)
+    if corr_top_k is not None and corr_top_k <= 0:
+        raise typer.BadParameter("--corr-top-k должен быть положительным")
+    if corr_threshold is not None and not 0 <= corr_threshold <= 1:
+        raise typer.BadParameter("--corr-threshold должен быть в [0, 1]")
+    streaming = not sampling and (bool(chunksize) or incremental)
+    if missing_buckets <= 0:
+        raise typer.BadParameter("--missing-buckets должен быть положительным")
+    if renderer not in RENDERERS:
+        raise typer.BadParameter(f"--renderer должен быть одним из: {', '.join(RENDERERS)}")
+    if corr_method not in CORR_METHODS:
+        raise typer.BadParameter(f"--corr-method должен быть одним из: {', '.join(CORR_METHODS)}")
+    if streaming and corr_method != "pearson":
+        # по чанкам копятся только суммы и со-моменты – ранги требуют всей колонки
+        raise typer.BadParameter("В потоковом режиме (--chunksize/--incremental) доступна только --corr-method pearson")
+    profile_cache = _open_cache(cache, cache_dir)
+    df: Optional[pd.DataFrame] = None
+
+    def is_wide(n_numeric: int) -> bool:
+        return corr_top_k is not None or corr_threshold is not None or n_numeric > WIDE_CORR_COLUMNS
+
+    def correlation(data: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Матрица r и число строк каждой пары (или список пар для широких таблиц)."""
+        if is_wide(data.select_dtypes(include="number").shape[1]):
+            return {
+                "correlation": correlation_edges(
+                    data, threshold=corr_threshold, top_k=corr_top_k, method=corr_method
+                )
+            }
+        corr, counts = pairwise_correlation(data, method=corr_method)
+        return {"correlation": corr, "correlation_counts": counts}
 
-    # 1. Обзор
-    summary = summarize_dataset(df)
+    def build() -> Profile:
+        nonlocal df
+        if sampling:
+            sampled = _sample_data(
+                Path(path), sample, sample_frac, stratify, chunksize, sep=sep, encoding=encoding, columns=columns
+            )
+            df = sampled.df
+            sample_summary = summarize_sample(sampled)
+            return Profile(
+                summary=sample_summary,
+                missing=missing_table_from_summary(sample_summary),
+                missing_density=missing_density(df, missing_buckets),
+                top_categories=top_categories(df, top_k=top_k_categories, workers=workers),
+                **correlation(df),
+            )
+        if streaming:
+            acc = _profile_chunked(
+                Path(path),
+                chunksize or DEFAULT_CHUNKSIZE,
+                sep=sep,
+                encoding=encoding,
+                workers=workers,
+                cache=profile_cache,
+                incremental=incremental,
+                columns=columns,
+                missing_buckets=missing_buckets,
+            )
+            corr = acc.correlation()
+            counts = acc.covariance.pair_counts(list(corr.columns)) if not corr.empty else pd.DataFrame()
+            if is_wide(corr.shape[1]):
+                corr = edges_from_matrix(corr, threshold=corr_threshold, top_k=corr_top_k, counts=counts)
+                counts = pd.DataFrame()
+            return Profile(
+                summary=acc.to_summary(),
+                missing=acc.missing_table(),
+                missing_density=acc.missing_density(),
+                correlation=corr,
+                correlation_counts=counts,
+                top_categories=acc.top_categories(top_k=top_k_categories),
+            )
+        df = _load_data(Path(path), sep=sep, encoding=encoding, columns=columns, workers=workers)
+        return Profile(
+            summary=summarize_dataset(df, workers=workers),
+            missing=missing_table(df, workers=workers),
+            missing_density=missing_density(df, missing_buckets),
+            top_categories=top_categories(df, top_k=top_k_categories, workers=workers),
+            **correlation(df),
+        )
+
+    # 1. Обзор: профиль из кэша или профилирование файла
+    _stage("profile")
+    params = {
+        "kind": "report",
+        "sep": sep,
+        "encoding": encoding,
+        "streaming": streaming,
+        "top_k": top_k_categories,
+        "columns": list(columns) if columns else None,
+        "sample": [sample, sample_frac, stratify] if sampling else None,
+        "corr": [corr_top_k, corr_threshold, WIDE_CORR_COLUMNS, corr_method],
+        "histograms": HIST_BINS,
+        "missing_buckets": missing_buckets,
+    }
+    profile = _cached_profile(Path(path), profile_cache, params, build)
+    summary = profile.summary
     summary_df = flatten_summary_for_print(summary)
-    missing_df = missing_table(df)
-    corr_df = correlation_matrix(df)
-    # Используем новый параметр top_k_categories
-    top_cats = top_categories(df, top_k=top_k_categories)
+    missing_df = profile.missing
+    corr_df = profile.correlation
+    wide_corr = not corr_df.empty and is_edge_list(corr_df)
+    top_cats = profile.top_categories
 
-    # 2. Качество в целом - передаем df для новых эвристик
-    quality_flags = compute_quality_flags(summary, missing_df, df)
+    # 2. Качество в целом - доля нулей берётся из summary (или из df)
+    quality_flags = compute_quality_flags(summary, missing_df, df, extended=True)
     
     # Определяем проблемные колонки по пропускам
     problematic_cols = missing_df[missing_df["missing_share"] > min_missing_share]
     problematic_list = problematic_cols.index.tolist()
 
     # 3. Сохраняем табличные артефакты
+    _stage("tables")
     summary_df.to_csv(out_root / "summary.csv", index=False)
     if not missing_df.empty:
         missing_df.to_csv(out_root / "missing.csv", index=True)
-    if not corr_df.empty:
+    if wide_corr:
+        corr_df.to_csv(out_root / "correlation_edges.csv", index=False)
+    elif not corr_df.empty:
         corr_df.to_csv(out_root / "correlation.csv", index=True)
+        if not profile.correlation_counts.empty:
+            profile.correlation_counts.to_csv(out_root / "correlation_n.csv", index=True)
     save_top_categories_tables(top_cats, out_root / "top_categories")
 
     # 4. Markdown-отчёт с новыми параметрами
+    _stage("markdown")
     md_path = out_root / "report.md"
     with md_path.open("w", encoding="utf-8") as f:
         f.write(f"# {title}\n\n")
-        f.write(f"Исходный файл: `{Path(path).name}`\n\n")
+        f.write(f"Исходный файл: `{source_name or Path(path).name}`\n\n")
         f.write(f"Строк: **{summary.n_rows}**, столбцов: **{summary.n_cols}**\n\n")
+        if summary.is_sample:
+            f.write("\n".join(describe_sample(summary, stratify)) + "\n\n")
         
         # Добавляем информацию о параметрах отчёта
         f.write("## Параметры отчёта\n\n")
@@ -152,7 +541,10 @@ def report(
         if missing_df.empty:
             f.write("Пропусков нет или датасет пуст.\n\n")
         else:
-            f.write("См. файлы `missing.csv` и `missing_matrix.png`.\n")
+            f.write(
+                "См. файлы `missing.csv` и `missing_matrix.png` "
+                f"(доля пропусков по корзинам строк, не больше {missing_buckets} корзин).\n"
+            )
             if problematic_list:
                 f.write(f"\n**Проблемные колонки (пропусков > {min_missing_share:.0%}):**\n\n")
                 for col in problematic_list:
@@ -161,10 +553,27 @@ def report(
             f.write("\n")
 
         f.write("## Корреляция числовых признаков\n\n")
-        if corr_df.empty:
+        f.write(f"Метод: **{CORR_METHOD_TITLES[corr_method]}**.\n\n")
+        if wide_corr:
+            f.write(
+                f"Широкая таблица: вместо матрицы p×p сохранены {len(corr_df)} самых сильных пар "
+                "(`correlation_edges.csv`: left, right, r, n – число строк пары).\n"
+                "На `correlation_heatmap.png` – только самые связанные колонки, сгруппированные по блокам.\n\n"
+            )
+            for row in corr_df.head(10).itertuples(index=False):
+                f.write(f"- `{row.left}` – `{row.right}`: r = {row.r:.3f} (n = {row.n})\n")
+            f.write("\n")
+        elif corr_df.empty:
             f.write("Недостаточно числовых колонок для корреляции.\n\n")
         else:
             f.write("См. `correlation.csv` и `correlation_heatmap.png`.\n\n")
+            counts = profile.correlation_counts
+            if not counts.empty and int(counts.to_numpy().min()) < int(counts.to_numpy().max()):
+                # из-за пропусков пары считаются по разному числу строк
+                f.write(
+                    "Пропуски учитываются попарно: число строк для каждой пары – в `correlation_n.csv` "
+                    f"(от {int(counts.to_numpy().min())} до {int(counts.to_numpy().max())}).\n\n"
+                )
 
         f.write("## Категориальные признаки\n\n")
         if not top_cats:
@@ -179,11 +588,151 @@ def report(
 
         f.write("## Гистограммы числовых колонок\n\n")
         f.write(f"См. файлы `hist_*.png` (первые {max_hist_columns} числовых колонок).\n")
+        if streaming:
+            f.write("В потоковом режиме бины адаптивные: их ширина подбирается по мере чтения чанков.\n")
 
     # 5. Картинки - используем новый параметр max_hist_columns
-    plot_histograms_per_column(df, out_root, max_columns=max_hist_columns)
-    plot_missing_matrix(df, out_root / "missing_matrix.png")
-    plot_correlation_heatmap(df, out_root / "correlation_heatmap.png")
+    _stage("plots")
+    # гистограммы – по счётчикам из профиля, без исходных данных
+    plots = summary_histogram_jobs(summary, out_root, max_columns=max_hist_columns)
+    plots.append(missing_density_job(profile.missing_density, out_root / "missing_matrix.png", renderer=renderer))
+    # матрица уже посчитана при профилировании (и в потоковом режиме тоже)
+    plots.append(
+        correlation_heatmap_job(
+            df,
+            out_root / "correlation_heatmap.png",
+            corr=heatmap_from_edges(corr_df) if wide_corr else corr_df,
+            label=CORR_SCALE_LABELS[corr_method],
+            renderer=renderer,
+        )
+    )
+    # графики рисуются параллельно: в воркеры уходят только счётчики и матрицы
+    render_plots(plots, workers=workers)
+
+    return md_path
+
+
+@app.command()
+def report(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    out_dir: str = typer.Option("reports", help="Каталог для отчёта."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    # ========== НОВЫЕ ПАРАМЕТРЫ ==========
+    max_hist_columns: int = typer.Option(
+        6, 
+        help="Максимум числовых колонок для гистограмм."
+    ),
+    top_k_categories: int = typer.Option(
+        5, 
+        help="Сколько top-значений выводить для категориальных признаков."
+    ),
+    title: str = typer.Option(
+        "EDA-отчёт", 
+        help="Заголовок отчёта в Markdown."
+    ),
+    min_missing_share: float = typer.Option(
+        0.3, 
+        help="Порог доли пропусков для проблемных колонок."
+    ),
+    chunksize: Optional[int] = typer.Option(
+        None,
+        help="Читать CSV чанками по N строк (потоковый режим для больших файлов).",
+    ),
+    workers: int = typer.Option(
+        1,
+        help="Число процессов для разбора CSV, профилирования колонок (или чанков при --chunksize) и отрисовки графиков.",
+    ),
+    cache: bool = typer.Option(
+        True,
+        help="Брать профиль из дискового кэша, если файл не менялся.",
+    ),
+    cache_dir: Optional[str] = typer.Option(
+        None,
+        help="Каталог кэша профилей (по умолчанию ~/.cache/eda-cli или $EDA_CLI_CACHE_DIR).",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        help="Для дописываемых файлов: разбирать только новые строки (потоковый режим).",
+    ),
+    columns: Optional[str] = typer.Option(
+        None,
+        help="Профилировать только эти колонки (через запятую); для Parquet/Arrow читаются только они.",
+    ),
+    sample: Optional[int] = typer.Option(
+        None,
+        help="Оценить статистики по случайной выборке из N строк (один проход по файлу).",
+    ),
+    sample_frac: Optional[float] = typer.Option(
+        None,
+        help="Оценить статистики по случайной выборке такой доли строк.",
+    ),
+    stratify: Optional[str] = typer.Option(
+        None,
+        help="Стратифицировать выборку по этой колонке.",
+    ),
+    corr_top_k: Optional[int] = typer.Option(
+        None,
+        help="Широкие таблицы: сохранять по K самых сильных корреляций на колонку вместо матрицы p×p.",
+    ),
+    corr_threshold: Optional[float] = typer.Option(
+        None,
+        help="Широкие таблицы: сохранять пары с |r| не ниже порога вместо матрицы p×p.",
+    ),
+    corr_method: str = typer.Option(
+        "pearson",
+        help="Метод корреляции: pearson, spearman или kendall (kendall – по подвыборке до 2000 строк).",
+    ),
+    missing_buckets: int = typer.Option(
+        MISSING_BUCKETS,
+        help="Матрица пропусков: максимум корзин строк (доля пропусков в каждой корзине).",
+    ),
+    renderer: str = typer.Option(
+        "matplotlib",
+        help="Рендер матрицы пропусков и heatmap: matplotlib или fast (прямая запись PNG, без matplotlib). "
+        "Подписи fast рисует пиксельным шрифтом (латиница, цифры, знаки); графики с другими символами "
+        "в названиях колонок (например, кириллицей) всё равно рисуются через matplotlib.",
+    ),
+) -> None:
+    """
+    Сгенерировать полный EDA-отчёт:
+    - текстовый overview и summary по колонкам (CSV/Markdown);
+    - статистика пропусков;
+    - корреляционная матрица;
+    - top-k категорий по категориальным признакам;
+    - картинки: гистограммы, матрица пропусков, heatmap корреляции.
+
+    С ``--chunksize`` файл читается потоково: сводка, пропуски, флаги качества
+    и top-k категорий считаются по чанкам, без загрузки всего CSV в память.
+    С ``--incremental`` (тоже потоково) разбираются только строки, дописанные
+    после прошлого запуска. С ``--sample``/``--sample-frac`` отчёт строится по
+    случайной выборке, а mean/std/доля пропусков даются с доверительными интервалами.
+    """
+    md_path = generate_report(
+        path,
+        out_dir=out_dir,
+        sep=sep,
+        encoding=encoding,
+        max_hist_columns=max_hist_columns,
+        top_k_categories=top_k_categories,
+        title=title,
+        min_missing_share=min_missing_share,
+        chunksize=chunksize,
+        workers=workers,
+        cache=cache,
+        cache_dir=cache_dir,
+        incremental=incremental,
+        columns=_parse_columns(columns),
+        sample=sample,
+        sample_frac=sample_frac,
+        stratify=stratify,
+        corr_top_k=corr_top_k,
+        corr_threshold=corr_threshold,
+        corr_method=corr_method,
+        missing_buckets=missing_buckets,
+        renderer=renderer,
+    )
+    out_root = md_path.parent
 
     typer.echo(f"Отчёт сгенерирован в каталоге: {out_root}")
     typer.echo(f"- Основной markdown: {md_path}")
@@ -1,11 +1,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 from pandas.api import types as ptypes
 
+from .correlation import pairwise_correlation
+
+
+# Перцентили, которые считаются для числовых колонок: имя поля -> уровень.
+PERCENTILES: Dict[str, float] = {
+    "p1": 0.01,
+    "p5": 0.05,
+    "p25": 0.25,
+    "p50": 0.50,
+    "p75": 0.75,
+    "p95": 0.95,
+    "p99": 0.99,
+}
+
 
 @dataclass
 class ColumnSummary:
@@ -14,35 +29,468 @@ class ColumnSummary:
     non_null: int
     missing: int
     missing_share: float
-    unique: int
+    # None – не посчитано (например, сводка только по метаданным Parquet)
+    unique: Optional[int]
     example_values: List[Any]
     is_numeric: bool
     min: Optional[float] = None
     max: Optional[float] = None
     mean: Optional[float] = None
     std: Optional[float] = None
+    p1: Optional[float] = None
+    p5: Optional[float] = None
+    p25: Optional[float] = None
+    p50: Optional[float] = None
+    p75: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+    # Число нулевых значений (только для numeric) – нужно эвристикам качества,
+    # когда исходный DataFrame уже недоступен.
+    zero_count: Optional[int] = None
+    # True, если unique – оценка HyperLogLog, а не точный подсчёт
+    unique_is_estimate: bool = False
+    # Доверительные интервалы (нижняя, верхняя граница) – только для сводки
+    # по выборке (eda_cli.sampling)
+    mean_ci: Optional[Tuple[float, float]] = None
+    std_ci: Optional[Tuple[float, float]] = None
+    missing_share_ci: Optional[Tuple[float, float]] = None
+    # Гистограмма числовых значений: счётчики и границы бинов (len + 1),
+    # считаются при профилировании – графикам не нужен исходный DataFrame
+    hist_counts: Optional[List[int]] = None
+    hist_edges: Optional[List[float]] = None
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ColumnSummary":
+        data = dict(data)
+        for key in CI_FIELDS:
+            if data.get(key) is not None:
+                data[key] = tuple(data[key])
+        return cls(**data)
+
+
+# Поля ColumnSummary с доверительными интервалами
+CI_FIELDS = ("mean_ci", "std_ci", "missing_share_ci")
+
 
 @dataclass
 class DatasetSummary:
     n_rows: int
     n_cols: int
     columns: List[ColumnSummary]
+    # Для сводки по выборке: сколько строк в выборке и уровень доверия
+    # интервалов; n_rows – по-прежнему число строк во всём файле
+    sample_rows: Optional[int] = None
+    confidence: Optional[float] = None
+
+    @property
+    def is_sample(self) -> bool:
+        return self.sample_rows is not None
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "n_rows": self.n_rows,
             "n_cols": self.n_cols,
             "columns": [c.to_dict() for c in self.columns],
+            "sample_rows": self.sample_rows,
+            "confidence": self.confidence,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DatasetSummary":
+        return cls(
+            n_rows=data["n_rows"],
+            n_cols=data["n_cols"],
+            columns=[ColumnSummary.from_dict(c) for c in data["columns"]],
+            sample_rows=data.get("sample_rows"),
+            confidence=data.get("confidence"),
+        )
+
+
+# Число бинов гистограммы числовой колонки (как ``bins=20`` у ax.hist)
+HIST_BINS = 20
+# Наибольшее число корзин строк в матрице пропусков
+MISSING_BUCKETS = 256
+# По сколько строк маска пропусков считается за раз (missing_density)
+_MISSING_CHUNK_ROWS = 1_000_000
+
+# Сколько байт float64-блока держим в памяти за раз при профилировании
+# числовых колонок (блок = несколько колонок x все строки).
+_NUMERIC_BLOCK_BYTES = 256 * 1024 * 1024
+
+# С какого числа строк unique для строковых колонок оценивается через
+# HyperLogLog вместо полной хэш-таблицы (None – всегда точно).
+APPROX_UNIQUE_ROWS: Optional[int] = 1_000_000
+# Целевая относительная ошибка оценки unique.
+UNIQUE_ERROR = 0.01
+# Число счётчиков Space-Saving на колонку для top-k категорий в потоковом режиме.
+TOP_CATEGORIES_CAPACITY = 10_000
+# По сколько строк колонка подаётся в скетч top-k категорий.
+_SKETCH_CHUNK_ROWS = 1_000_000
+# Целые до 2^53 по модулю представимы в float64 точно.
+_FLOAT_EXACT_INT = float(2**53)
+
+
+def _first_unique_strings(s: pd.Series, k: int) -> List[str]:
+    """
+    Первые k различных непустых значений колонки в виде строк.
+
+    Эквивалентно ``s.dropna().astype(str).unique()[:k]``, но смотрит только
+    на префикс колонки (окно растёт, пока не наберётся k значений).
+    """
+    if k <= 0:
+        return []
+    n = len(s)
+    window = max(64, 16 * k)
+    while True:
+        values = s.iloc[:window].dropna().astype(str).unique()
+        if len(values) >= k or window >= n:
+            return values[:k].tolist()
+        window *= 4
+
+
+def _is_block_numeric(s: pd.Series) -> bool:
+    """
+    Числовая колонка NumPy-типа, которую можно обработать как float64-блок.
+    Nullable-типы pandas (Int64, Float64, boolean) и float32/float16
+    считаются поколоночно: у pandas для них своя точность mean/std.
+    """
+    dtype = s.dtype
+    if not isinstance(dtype, np.dtype):
+        return False
+    return dtype.kind in "biu" or dtype == np.float64
+
+
+def _numeric_block_stats(block: np.ndarray, moments_only: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Статистики для блока числовых колонок формы (n_cols, n_rows) за один проход.
+
+    Возвращает массивы длины n_cols: count, min, max, mean, m2 (сумма квадратов
+    отклонений от среднего), std, unique, zeros, матрицу quantiles
+    (n_cols, len(PERCENTILES)) – точные перцентили по уже отсортированному блоку –
+    и гистограммы hist_counts (n_cols, HIST_BINS) / hist_edges (n_cols, HIST_BINS + 1).
+    Среднее и std считаются по той же схеме, что и в pandas (nanops): для
+    float64 результат совпадает с ``Series.mean()`` / ``Series.std()`` бит
+    в бит, для очень больших целых – с точностью до последнего знака.
+
+    ``moments_only`` – только count, min, max, mean, m2, std и zeros, без
+    сортировки блока (потоковому режиму unique, перцентили и гистограммы
+    дают свои скетчи).
+    """
+    n_cols, n_rows = block.shape
+    if n_rows == 0:
+        empty = np.full(n_cols, np.nan)
+        zeros = np.zeros(n_cols, dtype=np.int64)
+        return {
+            "count": zeros,
+            "min": empty,
+            "max": empty,
+            "mean": empty,
+            "m2": empty,
+            "std": empty,
+            "unique": zeros,
+            "zeros": zeros,
+            "quantiles": np.full((n_cols, len(PERCENTILES)), np.nan),
+            "hist_counts": np.zeros((n_cols, HIST_BINS), dtype=np.int64),
+            "hist_edges": np.full((n_cols, HIST_BINS + 1), np.nan),
+        }
+    mask = np.isnan(block)
+    count = n_rows - mask.sum(axis=1)
+    rows = np.arange(n_cols)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(mask, 0.0, block).sum(axis=1) / count
+        sqr = (mean[:, None] - block) ** 2
+        sqr[mask] = 0.0
+        m2 = sqr.sum(axis=1)
+        std = np.sqrt(m2 / (count - 1))
+    del sqr
+    zeros = (block == 0).sum(axis=1)
+    if moments_only:
+        # fmin/fmax пропускают NaN; для колонки из одних NaN – NaN без предупреждения
+        return {
+            "count": count,
+            "min": np.fmin.reduce(block, axis=1),
+            "max": np.fmax.reduce(block, axis=1),
+            "mean": mean,
+            "m2": m2,
+            "std": std,
+            "zeros": zeros,
+        }
+
+    # Сортировка даёт min/max и число уникальных; NaN уходят в конец строки.
+    ordered = np.sort(block, axis=1)
+    last = np.maximum(count - 1, 0)
+    min_ = ordered[:, 0]
+    max_ = ordered[rows, last]
+    if n_rows > 1:
+        changes = (ordered[:, 1:] != ordered[:, :-1]) & ~np.isnan(ordered[:, 1:])
+        unique = changes.sum(axis=1) + (count > 0)
+    else:
+        unique = (count > 0).astype(np.int64)
+
+    return {
+        "count": count,
+        "min": min_,
+        "max": max_,
+        "mean": mean,
+        "m2": m2,
+        "std": std,
+        "unique": unique,
+        "zeros": zeros,
+        "quantiles": _sorted_quantiles(ordered, count),
+        **_sorted_histograms(ordered, count),
+    }
+
+
+def _sorted_quantiles(ordered: np.ndarray, count: np.ndarray) -> np.ndarray:
+    """
+    Перцентили PERCENTILES по строкам отсортированного блока (NaN в конце),
+    с линейной интерполяцией так же, как ``np.quantile`` / ``Series.quantile``.
+    """
+    levels = np.array(list(PERCENTILES.values()))
+    rows = np.arange(ordered.shape[0])[:, None]
+    pos = np.maximum(count - 1, 0)[:, None] * levels[None, :]
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, np.maximum(count - 1, 0)[:, None])
+    t = pos - lo
+    a, b = ordered[rows, lo], ordered[rows, hi]
+    diff = b - a
+    with np.errstate(invalid="ignore"):
+        result = np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+    result[count == 0] = np.nan
+    return result
+
+
+def _histogram_edges(min_val: float, max_val: float, bins: int = HIST_BINS) -> Optional[np.ndarray]:
+    """Границы равных бинов от min до max, как у ``np.histogram`` (None для inf)."""
+    if not (np.isfinite(min_val) and np.isfinite(max_val)):
+        return None
+    if min_val == max_val:
+        min_val, max_val = min_val - 0.5, max_val + 0.5
+    return np.linspace(min_val, max_val, bins + 1)
+
+
+def _sorted_histograms(ordered: np.ndarray, count: np.ndarray, bins: int = HIST_BINS) -> Dict[str, np.ndarray]:
+    """
+    Гистограммы строк отсортированного блока (NaN в конце) – те же счётчики,
+    что ``np.histogram(values, bins)``: по сортированным значениям это
+    бинарный поиск границ, а не отдельный проход по данным.
+    """
+    counts = np.zeros((ordered.shape[0], bins), dtype=np.int64)
+    edges = np.full((ordered.shape[0], bins + 1), np.nan)
+    for j in range(ordered.shape[0]):
+        if count[j] == 0:
+            continue
+        values = ordered[j, : count[j]]
+        row_edges = _histogram_edges(values[0], values[-1], bins)
+        if row_edges is None:
+            continue
+        # бин k – [e_k, e_k+1), последний включает правую границу
+        pos = np.searchsorted(values, row_edges, side="left")
+        pos[-1] = count[j]
+        counts[j], edges[j] = np.diff(pos), row_edges
+    return {"hist_counts": counts, "hist_edges": edges}
+
+
+def _histogram_fields(counts: np.ndarray, edges: np.ndarray) -> Dict[str, Optional[List[Any]]]:
+    """Поля hist_counts/hist_edges для ColumnSummary (пустые, если границ нет)."""
+    if len(edges) == 0 or not np.isfinite(edges).all():
+        return {}
+    return {"hist_counts": [int(c) for c in counts], "hist_edges": [float(e) for e in edges]}
+
+
+def _percentile_fields(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Словарь полей p1..p99 для ColumnSummary."""
+    return {name: float(v) for name, v in zip(PERCENTILES, values)}
+
+
+def _numeric_column_blocks(
+    df: pd.DataFrame,
+    positions: Sequence[int],
+) -> Iterator[Tuple[List[int], np.ndarray]]:
+    """
+    Нарезает числовые колонки на float64-блоки формы (n_cols, n_rows),
+    ограниченные по памяти ``_NUMERIC_BLOCK_BYTES``.
+    """
+    n_rows = len(df)
+    per_block = max(1, _NUMERIC_BLOCK_BYTES // max(1, 8 * n_rows))
+    for start in range(0, len(positions), per_block):
+        chunk = list(positions[start : start + per_block])
+        block = np.empty((len(chunk), n_rows), dtype=np.float64)
+        for j, pos in enumerate(chunk):
+            block[j] = df.iloc[:, pos].to_numpy(dtype=np.float64, na_value=np.nan)
+        yield chunk, block
+
+
+def _summarize_column_reference(
+    s: pd.Series,
+    n_rows: int,
+    example_values_per_column: int = 3,
+) -> ColumnSummary:
+    """
+    Поколоночный расчёт ColumnSummary через методы pandas.
+
+    Используется для колонок, которые не укладываются в float64-блок,
+    и как эталон в тестах/бенчмарке.
+    """
+    non_null = int(s.notna().sum())
+    missing = n_rows - non_null
+    missing_share = float(missing / n_rows) if n_rows > 0 else 0.0
+    unique = int(s.nunique(dropna=True))
+
+    # Примерные значения выводим как строки
+    examples = (
+        s.dropna().astype(str).unique()[:example_values_per_column].tolist()
+        if non_null > 0
+        else []
+    )
+
+    is_numeric = bool(ptypes.is_numeric_dtype(s))
+    min_val: Optional[float] = None
+    max_val: Optional[float] = None
+    mean_val: Optional[float] = None
+    std_val: Optional[float] = None
+    zero_count: Optional[int] = None
+    percentiles: Dict[str, Optional[float]] = {}
+    histogram: Dict[str, Optional[List[Any]]] = {}
+
+    if is_numeric and non_null > 0:
+        min_val = float(s.min())
+        max_val = float(s.max())
+        mean_val = float(s.mean())
+        std_val = float(s.std())
+        zero_count = int((s == 0).sum())
+        if not ptypes.is_bool_dtype(s):
+            percentiles = _percentile_fields(s.quantile(list(PERCENTILES.values())).tolist())
+            edges = _histogram_edges(min_val, max_val)
+            if edges is not None:
+                values = s.dropna().to_numpy(dtype=np.float64)
+                histogram = _histogram_fields(np.histogram(values, bins=edges)[0], edges)
+
+    return ColumnSummary(
+        name=s.name,
+        dtype=str(s.dtype),
+        non_null=non_null,
+        missing=missing,
+        missing_share=missing_share,
+        unique=unique,
+        example_values=examples,
+        is_numeric=is_numeric,
+        min=min_val,
+        max=max_val,
+        mean=mean_val,
+        std=std_val,
+        zero_count=zero_count,
+        **percentiles,
+        **histogram,
+    )
+
+
+def _approx_unique(values: pd.Series, unique_error: float) -> int:
+    """Оценка числа уникальных непустых значений через HyperLogLog."""
+    from .sketches import HyperLogLog
+
+    hll = HyperLogLog(error=unique_error)
+    hll.update(values.to_numpy())
+    estimate = len(hll)
+    return int(min(len(values), max(1 if len(values) else 0, estimate)))
+
+
+def _summarize_object_column(
+    s: pd.Series,
+    n_rows: int,
+    example_values_per_column: int = 3,
+    approx_unique_rows: Optional[int] = APPROX_UNIQUE_ROWS,
+    unique_error: float = UNIQUE_ERROR,
+) -> ColumnSummary:
+    """
+    ColumnSummary для нечисловой колонки за один проход factorize:
+    коды дают non_null, массив уникальных – unique и примерные значения.
+
+    Начиная с ``approx_unique_rows`` строк вместо factorize (хэш-таблица на все
+    уникальные значения) unique оценивается скетчем HyperLogLog.
+    """
+    if approx_unique_rows is not None and n_rows >= approx_unique_rows:
+        values = s.dropna()
+        non_null = len(values)
+        missing = n_rows - non_null
+        return ColumnSummary(
+            name=s.name,
+            dtype=str(s.dtype),
+            non_null=non_null,
+            missing=missing,
+            missing_share=float(missing / n_rows) if n_rows > 0 else 0.0,
+            unique=_approx_unique(values, unique_error),
+            example_values=_first_unique_strings(s, example_values_per_column),
+            is_numeric=False,
+            unique_is_estimate=True,
+        )
+
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    non_null = int(np.count_nonzero(codes >= 0))
+    missing = n_rows - non_null
+    examples = _first_unique_strings(pd.Series(uniques), example_values_per_column)
+    return ColumnSummary(
+        name=s.name,
+        dtype=str(s.dtype),
+        non_null=non_null,
+        missing=missing,
+        missing_share=float(missing / n_rows) if n_rows > 0 else 0.0,
+        unique=len(uniques),
+        example_values=examples,
+        is_numeric=False,
+    )
+
+
+def _numeric_column_summary(
+    s: pd.Series,
+    n_rows: int,
+    stats: Dict[str, np.ndarray],
+    j: int,
+    example_values_per_column: int = 3,
+) -> ColumnSummary:
+    """ColumnSummary числовой колонки из j-й строки статистик блока."""
+    non_null = int(stats["count"][j])
+    missing = n_rows - non_null
+    has_values = non_null > 0
+    unique = int(stats["unique"][j])
+    if has_values and s.dtype.kind in "iu" and max(-stats["min"][j], stats["max"][j]) > _FLOAT_EXACT_INT:
+        # в float64 соседние целые больше 2^53 склеиваются – считаем по исходным
+        unique = int(s.nunique(dropna=True))
+    return ColumnSummary(
+        name=s.name,
+        dtype=str(s.dtype),
+        non_null=non_null,
+        missing=missing,
+        missing_share=float(missing / n_rows) if n_rows > 0 else 0.0,
+        unique=unique,
+        example_values=_first_unique_strings(s, example_values_per_column),
+        is_numeric=True,
+        min=float(stats["min"][j]) if has_values else None,
+        max=float(stats["max"][j]) if has_values else None,
+        mean=float(stats["mean"][j]) if has_values else None,
+        std=float(stats["std"][j]) if has_values else None,
+        zero_count=int(stats["zeros"][j]) if has_values else None,
+        **(
+            {
+                **_percentile_fields(stats["quantiles"][j]),
+                **_histogram_fields(stats["hist_counts"][j], stats["hist_edges"][j]),
+            }
+            if has_values and not ptypes.is_bool_dtype(s)
+            else {}
+        ),
+    )
+
 
 def summarize_dataset(
     df: pd.DataFrame,
     example_values_per_column: int = 3,
+    workers: int = 1,
+    approx_unique_rows: Optional[int] = APPROX_UNIQUE_ROWS,
+    unique_error: float = UNIQUE_ERROR,
 ) -> DatasetSummary:
     """
     Полный обзор датасета по колонкам:
@@ -52,67 +500,53 @@ def summarize_dataset(
     - количество уникальных;
     - несколько примерных значений;
     - базовые числовые статистики (для numeric).
-    """
-    n_rows, n_cols = df.shape
-    columns: List[ColumnSummary] = []
-
-    for name in df.columns:
-        s = df[name]
-        dtype_str = str(s.dtype)
 
-        non_null = int(s.notna().sum())
-        missing = n_rows - non_null
-        missing_share = float(missing / n_rows) if n_rows > 0 else 0.0
-        unique = int(s.nunique(dropna=True))
+    Числовые колонки обрабатываются блоками через NumPy (все статистики
+    за один проход по блоку), нечисловые – одним ``pd.factorize`` на колонку.
+    При ``workers > 1`` колонки профилируются в пуле процессов (eda_cli.parallel).
 
-        # Примерные значения выводим как строки
-        examples = (
-            s.dropna().astype(str).unique()[:example_values_per_column].tolist()
-            if non_null > 0
-            else []
+    Для строковых колонок начиная с ``approx_unique_rows`` строк unique
+    оценивается HyperLogLog с ошибкой ``unique_error`` (см. unique_is_estimate).
+    """
+    if workers > 1 and df.shape[1] > 1:
+        from .parallel import summarize_parallel
+
+        return summarize_parallel(
+            df,
+            example_values_per_column,
+            workers=workers,
+            approx_unique_rows=approx_unique_rows,
+            unique_error=unique_error,
         )
 
-        is_numeric = bool(ptypes.is_numeric_dtype(s))
-        min_val: Optional[float] = None
-        max_val: Optional[float] = None
-        mean_val: Optional[float] = None
-        std_val: Optional[float] = None
-
-        if is_numeric and non_null > 0:
-            min_val = float(s.min())
-            max_val = float(s.max())
-            mean_val = float(s.mean())
-            std_val = float(s.std())
-
-        columns.append(
-            ColumnSummary(
-                name=name,
-                dtype=dtype_str,
-                non_null=non_null,
-                missing=missing,
-                missing_share=missing_share,
-                unique=unique,
-                example_values=examples,
-                is_numeric=is_numeric,
-                min=min_val,
-                max=max_val,
-                mean=mean_val,
-                std=std_val,
+    n_rows, n_cols = df.shape
+    columns: List[Optional[ColumnSummary]] = [None] * n_cols
+
+    numeric_positions: List[int] = []
+    for pos in range(n_cols):
+        s = df.iloc[:, pos]
+        if _is_block_numeric(s):
+            numeric_positions.append(pos)
+        elif ptypes.is_numeric_dtype(s):
+            columns[pos] = _summarize_column_reference(s, n_rows, example_values_per_column)
+        else:
+            columns[pos] = _summarize_object_column(
+                s, n_rows, example_values_per_column, approx_unique_rows, unique_error
             )
-        )
 
-    return DatasetSummary(n_rows=n_rows, n_cols=n_cols, columns=columns)
+    for chunk, block in _numeric_column_blocks(df, numeric_positions):
+        stats = _numeric_block_stats(block)
+        del block
+        for j, pos in enumerate(chunk):
+            columns[pos] = _numeric_column_summary(
+                df.iloc[:, pos], n_rows, stats, j, example_values_per_column
+            )
 
+    return DatasetSummary(n_rows=n_rows, n_cols=n_cols, columns=list(columns))
 
-def missing_table(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Таблица пропусков по колонкам: count/share.
-    """
-    if df.empty:
-        return pd.DataFrame(columns=["missing_count", "missing_share"])
 
-    total = df.isna().sum()
-    share = total / len(df)
+def _missing_frame(total: pd.Series, n_rows: int) -> pd.DataFrame:
+    share = total / n_rows
     result = (
         pd.DataFrame(
             {
@@ -125,24 +559,102 @@ def missing_table(df: pd.DataFrame) -> pd.DataFrame:
     return result
 
 
-def correlation_matrix(df: pd.DataFrame) -> pd.DataFrame:
+def missing_table(df: pd.DataFrame, workers: int = 1) -> pd.DataFrame:
     """
-    Корреляция Пирсона для числовых колонок.
+    Таблица пропусков по колонкам: count/share.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=["missing_count", "missing_share"])
+
+    if workers > 1 and df.shape[1] > 1:
+        from .parallel import missing_counts_parallel
+
+        return _missing_frame(missing_counts_parallel(df, workers=workers), len(df))
+
+    return _missing_frame(df.isna().sum(), len(df))
+
+
+def missing_table_from_summary(summary: DatasetSummary) -> pd.DataFrame:
+    """
+    Та же таблица пропусков, что и missing_table, но по готовому DatasetSummary
+    (когда исходного DataFrame целиком в памяти нет – потоковый режим и т.п.).
+    """
+    if summary.n_rows == 0 or summary.n_cols == 0:
+        return pd.DataFrame(columns=["missing_count", "missing_share"])
+
+    total = pd.Series(
+        [c.missing for c in summary.columns],
+        index=[c.name for c in summary.columns],
+        dtype="int64",
+    )
+    return _missing_frame(total, summary.n_rows)
+
+
+def missing_density(df: pd.DataFrame, buckets: int = MISSING_BUCKETS) -> pd.DataFrame:
+    """
+    Доля пропусков по корзинам подряд идущих строк (не больше ``buckets``)
+    и колонкам – данные для матрицы пропусков без массива rows×cols.
+    Индекс – номер первой строки корзины.
+    """
+    from .sketches import MissingDensity
+
+    acc = MissingDensity(buckets)
+    for start in range(0, max(1, len(df)), _MISSING_CHUNK_ROWS):
+        part = df.iloc[start : start + _MISSING_CHUNK_ROWS]
+        acc.update(part.isna().to_numpy(), [str(c) for c in df.columns])
+    return acc.density()
+
+
+def correlation_matrix(df: pd.DataFrame, method: str = "pearson") -> pd.DataFrame:
+    """
+    Корреляция числовых колонок: "pearson", "spearman" или "kendall".
+
+    Пропуски учитываются попарно, как в ``DataFrame.corr()``, но все пары
+    считаются матричными произведениями (correlation.pairwise_correlation);
+    там же – число строк для каждой пары. Для Спирмена каждая колонка
+    ранжируется один раз, Кендалл для больших таблиц – по подвыборке строк.
     """
     numeric_df = df.select_dtypes(include="number")
     if numeric_df.empty:
         return pd.DataFrame()
-    return numeric_df.corr(numeric_only=True)
+    return pairwise_correlation(numeric_df, method=method)[0]
+
+
+def _top_table(vc: pd.Series) -> pd.DataFrame:
+    """Таблица value/count/share по отсортированным частотам top-k значений."""
+    share = vc / vc.sum()
+    return pd.DataFrame(
+        {
+            "value": vc.index.astype(str),
+            "count": vc.values,
+            "share": share.values,
+        }
+    )
+
+
+def _sketch_value_counts(s: pd.Series, top_k: int, capacity: int) -> pd.Series:
+    """Top-k частот колонки через скетч Space-Saving (колонка подаётся кусками)."""
+    from .sketches import SpaceSaving
+
+    sketch = SpaceSaving(capacity)
+    for start in range(0, len(s), _SKETCH_CHUNK_ROWS):
+        sketch.update(s.iloc[start : start + _SKETCH_CHUNK_ROWS].dropna())
+    return sketch.top(top_k)
 
 
 def top_categories(
     df: pd.DataFrame,
     max_columns: int = 5,
     top_k: int = 5,
+    workers: int = 1,
+    sketch_capacity: Optional[int] = None,
 ) -> Dict[str, pd.DataFrame]:
     """
     Для категориальных/строковых колонок считает top-k значений.
     Возвращает словарь: колонка -> DataFrame со столбцами value/count/share.
+
+    С ``sketch_capacity`` частоты считаются скетчем Space-Saving с ограниченной
+    памятью (счётчики завышены не более чем на n_rows / sketch_capacity).
     """
     result: Dict[str, pd.DataFrame] = {}
     candidate_cols: List[str] = []
@@ -152,31 +664,44 @@ def top_categories(
         if ptypes.is_object_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
             candidate_cols.append(name)
 
-    for name in candidate_cols[:max_columns]:
-        s = df[name]
-        vc = s.value_counts(dropna=True).head(top_k)
+    selected = candidate_cols[:max_columns]
+    if sketch_capacity is not None:
+        counts = {name: _sketch_value_counts(df[name], top_k, sketch_capacity) for name in selected}
+    elif workers > 1 and len(selected) > 1:
+        from .parallel import value_counts_parallel
+
+        counts = value_counts_parallel(df, selected, top_k, workers=workers)
+    else:
+        counts = {name: df[name].value_counts(dropna=True).head(top_k) for name in selected}
+
+    for name in selected:
+        vc = counts[name]
         if vc.empty:
             continue
-        share = vc / vc.sum()
-        table = pd.DataFrame(
-            {
-                "value": vc.index.astype(str),
-                "count": vc.values,
-                "share": share.values,
-            }
-        )
-        result[name] = table
+        result[name] = _top_table(vc)
 
     return result
 
 
-def compute_quality_flags(summary: DatasetSummary, missing_df: pd.DataFrame, df: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+def compute_quality_flags(
+    summary: DatasetSummary,
+    missing_df: pd.DataFrame,
+    df: Optional[pd.DataFrame] = None,
+    extended: Optional[bool] = None,
+) -> Dict[str, Any]:
     """
     Простейшие эвристики «качества» данных:
     - слишком много пропусков;
     - подозрительно мало строк;
     и т.п.
+
+    Расширенные эвристики (константные колонки, кардинальность, ID, нули)
+    считаются, если передан ``df`` или ``extended=True``. Без ``df`` доля нулей
+    берётся из ``ColumnSummary.zero_count``.
     """
+    if extended is None:
+        extended = df is not None
+
     flags: Dict[str, Any] = {}
     flags["too_few_rows"] = summary.n_rows < 100
     flags["too_many_columns"] = summary.n_cols > 100
@@ -195,25 +720,38 @@ def compute_quality_flags(summary: DatasetSummary, missing_df: pd.DataFrame, df:
     # 4. Доля нулевых значений в числовых колонках
     flags["has_many_zero_values"] = False
     
-    if df is not None:
+    if extended:
         # Собираем дополнительную информацию для новых эвристик
         for col in summary.columns:
-            # Проверка на константные колонки
-            if col.unique == 1 and col.non_null > 0:
+            # Проверка на константные колонки (если unique не посчитан, как в
+            # сводке по метаданным Parquet, – по совпадению min и max)
+            if col.unique is not None:
+                is_constant = col.unique == 1
+            else:
+                is_constant = col.min is not None and col.min == col.max
+            if is_constant and col.non_null > 0:
                 flags["has_constant_columns"] = True
                 
             # Проверка на высокую кардинальность категориальных признаков
-            if not col.is_numeric and col.unique > 100:  # Порог: более 100 уникальных значений
+            if not col.is_numeric and col.unique is not None and col.unique > 100:  # Порог: более 100 уникальных значений
                 flags["has_high_cardinality_categoricals"] = True
                 
-            # Проверка на подозрительные ID дубликаты
+            # Проверка на подозрительные ID дубликаты (с оценкой HyperLogLog
+            # порог 90% остаётся надёжным: ошибка оценки ~1%). Для сводки по
+            # выборке unique посчитан по выборке – и сравнивается с её размером
             if 'id' in col.name.lower():
-                if col.unique < summary.n_rows * 0.9:  # Если уникальных меньше 90% строк
+                rows = summary.sample_rows if summary.is_sample else summary.n_rows
+                if col.unique is not None and col.unique < rows * 0.9:  # Если уникальных меньше 90% строк
                     flags["has_suspicious_id_duplicates"] = True
             
             # Проверка на много нулевых значений в числовых колонках
             if col.is_numeric and col.non_null > 0:
-                zero_count = (df[col.name] == 0).sum()
+                if col.zero_count is not None:
+                    zero_count = col.zero_count
+                elif df is not None:
+                    zero_count = (df[col.name] == 0).sum()
+                else:
+                    continue
                 zero_share = zero_count / col.non_null if col.non_null > 0 else 0
                 if zero_share > 0.5:  # Порог: более 50% нулей
                     flags["has_many_zero_values"] = True
@@ -254,11 +792,15 @@ def flatten_summary_for_print(summary: DatasetSummary) -> pd.DataFrame:
                 "missing": col.missing,
                 "missing_share": col.missing_share,
                 "unique": col.unique,
+                "unique_is_estimate": col.unique_is_estimate,
                 "is_numeric": col.is_numeric,
                 "min": col.min,
                 "max": col.max,
                 "mean": col.mean,
                 "std": col.std,
+                **{name: getattr(col, name) for name in PERCENTILES},
+                # интервалы есть только у сводки по выборке
+                **({name: getattr(col, name) for name in CI_FIELDS} if summary.is_sample else {}),
             }
         )
     return pd.DataFrame(rows)
\ No newline at end of file
@@ -0,0 +1,520 @@
+"""
+Корреляция Пирсона без всей таблицы в памяти.
+
+CovarianceAccumulator копит по чанкам суммы и со-моменты для каждой пары
+числовых колонок – O(p²) памяти независимо от числа строк – и сливается
+с аккумуляторами других чанков и шардов. Пропуски учитываются попарно,
+как в ``DataFrame.corr()``: пара строк входит в суммы для (i, j), только
+если в ней есть оба значения.
+
+Для плотных таблиц (pairwise_correlation, correlation_edges) есть и
+ранговые методы: Спирмен – тот же Пирсон по рангам, которые считаются один
+раз на колонку, Кендалл (tau-b) – матричные произведения векторов знаков
+пар строк, для больших таблиц по случайной подвыборке строк.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class CovarianceAccumulator:
+    """
+    Попарные суммы по сдвинутым значениям a = x - shift (сдвиг – средние
+    первого чанка, чтобы суммы квадратов не теряли точность):
+
+    - ``count[i, j]`` – строк, где есть и i, и j;
+    - ``sums[i, j]`` – сумма a_i по этим строкам;
+    - ``squares[i, j]`` – сумма a_i² по ним же;
+    - ``products[i, j]`` – сумма a_i * a_j.
+
+    Каждая матрица за чанк – одно матричное произведение маски/значений.
+    """
+
+    names: List[str] = field(default_factory=list)
+    shift: np.ndarray = field(default_factory=lambda: np.empty(0))
+    count: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+    sums: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+    squares: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+    products: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+
+    def _positions(self, names: Sequence[str], shift: np.ndarray) -> np.ndarray:
+        """Индексы колонок ``names``; новые колонки добавляются с нулевыми суммами."""
+        index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        new = [j for j, name in enumerate(names) if name not in index]
+        if new:
+            p, q = len(self.names), len(self.names) + len(new)
+            for attr in ("count", "sums", "squares", "products"):
+                grown = np.zeros((q, q))
+                grown[:p, :p] = getattr(self, attr)
+                setattr(self, attr, grown)
+            self.shift = np.concatenate([self.shift, shift[new]])
+            for j in new:
+                index[names[j]] = len(self.names)
+                self.names.append(names[j])
+        return np.array([index[name] for name in names], dtype=np.intp)
+
+    def update(self, block: np.ndarray, names: Sequence[str]) -> None:
+        """
+        Учесть чанк: ``block`` – float64 (n_cols, n_rows) с NaN на месте
+        пропусков, ``names`` – имена его строк-колонок.
+        """
+        if block.shape[0] == 0 or block.shape[1] == 0:
+            return
+        present = ~np.isnan(block)
+        counts = present.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, np.nansum(block, axis=1) / np.maximum(counts, 1), 0.0)
+        pos = self._positions(names, means)
+        values = np.where(present, block - self.shift[pos][:, None], 0.0)
+        mask = present.astype(np.float64)
+        idx = np.ix_(pos, pos)
+        self.count[idx] += mask @ mask.T
+        self.sums[idx] += values @ mask.T
+        self.squares[idx] += (values * values) @ mask.T
+        self.products[idx] += values @ values.T
+
+    def update_frame(self, df: pd.DataFrame) -> None:
+        """Учесть чанк-DataFrame (берутся числовые колонки, как в ``corr()``)."""
+        numeric = df.select_dtypes(include="number")
+        if numeric.shape[1] == 0:
+            return
+        block = np.empty((numeric.shape[1], len(numeric)), dtype=np.float64)
+        for j in range(numeric.shape[1]):
+            block[j] = numeric.iloc[:, j].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.update(block, list(numeric.columns))
+
+    def merge(self, other: "CovarianceAccumulator") -> None:
+        """Слить суммы другого чанка/шарда (его сдвиг пересчитывается в наш)."""
+        if not other.names:
+            return
+        pos = self._positions(other.names, other.shift)
+        # a_self = a_other + d, где d = shift_other - shift_self
+        d = other.shift - self.shift[pos]
+        count, sums = other.count, other.sums
+        sums_shifted = sums + d[:, None] * count
+        squares = other.squares + 2 * d[:, None] * sums + (d * d)[:, None] * count
+        products = other.products + sums * d[None, :] + sums.T * d[:, None] + np.outer(d, d) * count
+        idx = np.ix_(pos, pos)
+        self.count[idx] += count
+        self.sums[idx] += sums_shifted
+        self.squares[idx] += squares
+        self.products[idx] += products
+
+    def pair_counts(self, columns: Sequence[str]) -> pd.DataFrame:
+        """Число строк, где есть обе колонки пары (эффективный размер выборки)."""
+        index = {name: i for i, name in enumerate(self.names)}
+        pos = np.array([index[name] for name in columns], dtype=np.intp)
+        return pd.DataFrame(self.count[np.ix_(pos, pos)], index=list(columns), columns=list(columns))
+
+    def correlation(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Матрица корреляции Пирсона (как ``DataFrame.corr()``); ``columns`` –
+        какие колонки и в каком порядке вернуть (по умолчанию все).
+        """
+        names = list(self.names) if columns is None else [c for c in columns if c in self.names]
+        if not names:
+            return pd.DataFrame()
+        index = {name: i for i, name in enumerate(self.names)}
+        pos = np.array([index[name] for name in names], dtype=np.intp)
+        idx = np.ix_(pos, pos)
+        n, s, sq, prod = self.count[idx], self.sums[idx], self.squares[idx], self.products[idx]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = prod - s * s.T / n
+            var_i = sq - s * s / n
+            var_j = var_i.T
+            r = cov / np.sqrt(var_i * var_j)
+        r[(n < 1) | (var_i <= 0) | (var_j <= 0)] = np.nan
+        r = np.clip(r, -1.0, 1.0)
+        return pd.DataFrame(r, index=names, columns=names)
+
+
+# ---------- Широкие таблицы: блочный расчёт и список сильных пар ----------
+
+# С какого числа числовых колонок report переходит на список пар вместо
+# плотной матрицы p×p
+WIDE_CORR_COLUMNS = 500
+# Пар на колонку по умолчанию в режиме широких таблиц
+DEFAULT_TOP_K = 10
+# Колонок в блоке: блок пар – одно матричное произведение (BLAS)
+CORR_BLOCK_COLUMNS = 512
+# Колонок на сжатой тепловой карте
+HEATMAP_MAX_COLUMNS = 40
+
+EDGE_COLUMNS = ["left", "right", "r", "n"]
+
+CORR_METHODS = ("pearson", "spearman", "kendall")
+# Строк, по которым считается Кендалл: дальше – случайная подвыборка
+# (O(n²·p²) операций; стандартная ошибка tau ~ 0.015 при 2000 строк)
+KENDALL_MAX_ROWS = 2_000
+# Элементов в блоке векторов знаков (пары строк × колонки)
+_SIGN_BLOCK = 1 << 22
+
+
+def is_edge_list(corr: pd.DataFrame) -> bool:
+    """Результат correlation_edges (а не квадратная матрица: у неё index == columns)."""
+    return list(corr.columns) == EDGE_COLUMNS and list(corr.index) != EDGE_COLUMNS
+
+
+def _numeric_positions(df: pd.DataFrame) -> List[int]:
+    """
+    Позиции числовых колонок (как ``select_dtypes(include="number")``, но
+    без копии данных: тип проверяется на пустом срезе).
+    """
+    probe = df.iloc[:0].set_axis(range(df.shape[1]), axis=1)
+    return list(probe.select_dtypes(include="number").columns)
+
+
+def _prepare(df: pd.DataFrame, positions: Sequence[int], ranks: bool = False) -> tuple:
+    """
+    Колонки ``positions`` как float64 (n_rows, len(positions)): значения
+    (или ранги, rank_columns) минус среднее по непустым, 0 на месте пропусков;
+    маска непустых и признак «есть пропуски». Готовится по блоку колонок,
+    а не по всей таблице.
+    """
+    values = np.empty((len(df), len(positions)), dtype=np.float64)
+    for j, pos in enumerate(positions):
+        column = df.iloc[:, pos]
+        if ranks:
+            column = column.rank(method="average")
+        values[:, j] = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    present = ~np.isnan(values)
+    counts = present.sum(axis=0)
+    with np.errstate(invalid="ignore"):
+        means = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0.0)
+    values -= means
+    values[~present] = 0.0
+    return values, present, ~present.all(axis=0)
+
+
+def _block_corr(
+    x: np.ndarray,
+    mx: np.ndarray,
+    gaps_x: np.ndarray,
+    y: np.ndarray,
+    my: np.ndarray,
+    gaps_y: np.ndarray,
+) -> tuple:
+    """
+    Попарная корреляция колонок блока ``x`` с колонками блока ``y``
+    (центрированные значения с нулями вместо пропусков и маски непустых).
+
+    Если пропусков в обоих блоках нет, хватает одного произведения xᵀy;
+    иначе суммы по попарно полным строкам собираются из пяти произведений
+    масок и значений. Возвращает (r, n) формы (|x|, |y|).
+    """
+    n_rows = x.shape[0]
+    if not gaps_x.any() and not gaps_y.any():
+        prod = x.T @ y
+        norm = np.sqrt(np.einsum("ij,ij->j", x, x))[:, None] * np.sqrt(np.einsum("ij,ij->j", y, y))[None, :]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = prod / norm
+        r[norm <= 0] = np.nan
+        return np.clip(r, -1.0, 1.0), np.full(r.shape, float(n_rows))
+
+    fx, fy = mx.astype(np.float64), my.astype(np.float64)
+    n = fx.T @ fy
+    sx = x.T @ fy
+    sy = fx.T @ y
+    sxx = (x * x).T @ fy
+    syy = fx.T @ (y * y)
+    sxy = x.T @ y
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+    r[(n < 1) | (var_x <= 0) | (var_y <= 0)] = np.nan
+    return np.clip(r, -1.0, 1.0), n
+
+
+def _check_method(method: str) -> None:
+    if method not in CORR_METHODS:
+        raise ValueError(f"Неизвестный метод корреляции '{method}' (доступны: {', '.join(CORR_METHODS)})")
+
+
+def rank_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Средние ранги каждой колонки по её непустым значениям (пропуски остаются
+    NaN). Ранги колонки не зависят от пары: блочный расчёт (_prepare) считает
+    их для блока колонок и использует во всех его парах;
+    ``DataFrame.corr("spearman")`` при пропусках переранжирует каждую пару
+    по её общим строкам, поэтому результаты совпадают, если пропусков нет.
+    """
+    return df.rank(method="average")
+
+
+def _kendall(
+    values: np.ndarray,
+    max_rows: int = KENDALL_MAX_ROWS,
+    seed: int = 0,
+) -> tuple:
+    """
+    Tau-b Кендалла для всех пар колонок ``values`` (n_rows, p) с NaN на
+    месте пропусков; пары строк учитываются, если в обеих есть оба значения.
+
+    Для колонки x вектор знаков s_x = sign(x_a - x_b) по всем парам строк
+    a < b (0 – ничья или пропуск); тогда для всех пар колонок сразу
+    C - D = SᵀS, а число пар без ничьих по x среди полных для (x, y) –
+    (S∘S)ᵀB, где B – маска «y есть в обеих строках». Пары строк
+    перебираются блоками по строке-якорю. Если строк больше ``max_rows``,
+    берётся случайная подвыборка из ``max_rows`` строк (оценка с ошибкой
+    порядка 1/sqrt(max_rows)). Возвращает (r, n) – n по использованным строкам.
+    """
+    if max_rows and values.shape[0] > max_rows:
+        rows = np.sort(np.random.default_rng(seed).choice(values.shape[0], max_rows, replace=False))
+        values = values[rows]
+    n_rows, p = values.shape
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    mask = present.astype(np.float64)
+    concordance = np.zeros((p, p))
+    untied = np.zeros((p, p))
+    step = max(1, _SIGN_BLOCK // max(1, n_rows * p))
+    for a in range(0, n_rows - 1, step):
+        anchors = np.arange(a, min(n_rows - 1, a + step))
+        later = np.arange(a + 1, n_rows)
+        # пары (i, j), i – якорь из блока, j > i
+        upper = anchors[:, None] < later[None, :]
+        both = present[anchors][:, None, :] & present[later][None, :, :] & upper[:, :, None]
+        signs = np.sign(filled[anchors][:, None, :] - filled[later][None, :, :])
+        signs = (signs * both).reshape(-1, p).astype(np.float32)
+        both = both.reshape(-1, p).astype(np.float32)
+        # суммы ±1 по блоку точны во float32 (меньше 2^24 слагаемых)
+        concordance += signs.T @ signs
+        untied += (signs * signs).T @ both
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = concordance / np.sqrt(untied * untied.T)
+    r[(untied <= 0) | (untied.T <= 0)] = np.nan
+    return np.clip(r, -1.0, 1.0), mask.T @ mask
+
+
+def pairwise_correlation(
+    df: pd.DataFrame,
+    method: str = "pearson",
+    block_columns: int = CORR_BLOCK_COLUMNS,
+    max_rows: int = KENDALL_MAX_ROWS,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Корреляция по попарно полным строкам (как ``DataFrame.corr()``) и число
+    таких строк для каждой пары.
+
+    Вместо цикла по парам все суммы собираются матричными произведениями
+    масок и значений (_block_corr), блоками по ``block_columns`` колонок;
+    блоки без пропусков обходятся одним произведением. Центрированные
+    значения и маски готовятся по блоку (_prepare), поэтому кроме p×p
+    результата в памяти – два блока n_rows × ``block_columns``, а не копия
+    всей таблицы. ``method``:
+    "pearson", "spearman" (Пирсон по рангам из rank_columns) или "kendall"
+    (tau-b, _kendall; приближённо, если строк больше ``max_rows``).
+    Возвращает (r, n) – две матрицы p×p по числовым колонкам.
+    """
+    _check_method(method)
+    positions = _numeric_positions(df)
+    names = [df.columns[j] for j in positions]
+    p = len(names)
+    if p == 0:
+        return pd.DataFrame(), pd.DataFrame()
+    if method == "kendall":
+        raw = np.column_stack([df.iloc[:, j].to_numpy(dtype=np.float64, na_value=np.nan) for j in positions])
+        r, n = _kendall(raw, max_rows=max_rows)
+        return (
+            pd.DataFrame(r, index=names, columns=names),
+            pd.DataFrame(n.astype(np.int64), index=names, columns=names),
+        )
+    ranks = method == "spearman"
+    r = np.empty((p, p))
+    n = np.empty((p, p))
+    for a in range(0, p, block_columns):
+        rows = slice(a, min(p, a + block_columns))
+        x = _prepare(df, positions[rows], ranks)
+        for b in range(a, p, block_columns):
+            cols = slice(b, min(p, b + block_columns))
+            y = x if b == a else _prepare(df, positions[cols], ranks)
+            block_r, block_n = _block_corr(*x, *y)
+            r[rows, cols], n[rows, cols] = block_r, block_n
+            r[cols, rows], n[cols, rows] = block_r.T, block_n.T
+    diagonal = np.diag_indices(p)
+    r[diagonal] = np.where(np.isnan(r[diagonal]), np.nan, 1.0)
+    return (
+        pd.DataFrame(r, index=names, columns=names),
+        pd.DataFrame(n.astype(np.int64), index=names, columns=names),
+    )
+
+
+def _merge_top(
+    best: Dict[str, np.ndarray],
+    rows: np.ndarray,
+    r: np.ndarray,
+    n: np.ndarray,
+    cols: np.ndarray,
+    k: int,
+) -> None:
+    """Обновить top-k по |r| для строк ``rows`` кандидатами из блока (r, n)."""
+    cand_r = np.concatenate([best["r"][rows], r], axis=1)
+    cand_n = np.concatenate([best["n"][rows], n], axis=1)
+    cand_j = np.concatenate([best["j"][rows], np.broadcast_to(cols, r.shape)], axis=1)
+    score = np.where(np.isnan(cand_r), -1.0, np.abs(cand_r))
+    keep = np.argpartition(-score, k - 1, axis=1)[:, :k]
+    best["r"][rows] = np.take_along_axis(cand_r, keep, axis=1)
+    best["n"][rows] = np.take_along_axis(cand_n, keep, axis=1)
+    best["j"][rows] = np.take_along_axis(cand_j, keep, axis=1)
+
+
+def _edge_frame(names: Sequence[str], i: np.ndarray, j: np.ndarray, r: np.ndarray, n: np.ndarray) -> pd.DataFrame:
+    """Список пар (i < j) без повторов, по убыванию |r|."""
+    if len(i) == 0:
+        return pd.DataFrame(columns=EDGE_COLUMNS)
+    lo, hi = np.minimum(i, j), np.maximum(i, j)
+    _, first = np.unique(lo * len(names) + hi, return_index=True)
+    lo, hi, r, n = lo[first], hi[first], r[first], n[first]
+    order = np.lexsort((hi, lo, -np.abs(r)))
+    return pd.DataFrame(
+        {
+            "left": [names[a] for a in lo[order]],
+            "right": [names[b] for b in hi[order]],
+            "r": r[order],
+            "n": n[order].astype(np.int64),
+        }
+    )
+
+
+def correlation_edges(
+    df: pd.DataFrame,
+    threshold: Optional[float] = None,
+    top_k: Optional[int] = None,
+    block_columns: int = CORR_BLOCK_COLUMNS,
+    method: str = "pearson",
+) -> pd.DataFrame:
+    """
+    Сильные корреляции числовых колонок в виде списка пар
+    (left, right, r, n) вместо плотной матрицы p×p.
+
+    Матрица считается блоками по ``block_columns`` колонок (каждый блок пар –
+    матричные произведения), в памяти одновременно только два блока
+    значений n_rows × ``block_columns`` (готовятся по блоку, _prepare),
+    один блок пар и по ``top_k`` лучших пар на колонку. Пара попадает в результат, если
+    |r| >= ``threshold`` или она среди ``top_k`` самых сильных для одной из
+    своих колонок (если заданы оба – достаточно любого). Пропуски
+    учитываются попарно, как в ``DataFrame.corr()``; n – число строк пары.
+    Для "spearman" блоки считаются по рангам; "kendall" требует всей
+    матрицы (pairwise_correlation), из которой пары отбираются edges_from_matrix.
+    """
+    _check_method(method)
+    if threshold is None and top_k is None:
+        top_k = DEFAULT_TOP_K
+    if method == "kendall":
+        corr, counts = pairwise_correlation(df, method="kendall")
+        return edges_from_matrix(corr, threshold=threshold, top_k=top_k, counts=counts)
+    positions = _numeric_positions(df)
+    names = [df.columns[j] for j in positions]
+    p = len(names)
+    if p < 2:
+        return pd.DataFrame(columns=EDGE_COLUMNS)
+    ranks = method == "spearman"
+    k = min(top_k, p - 1) if top_k else 0
+    best = {"r": np.full((p, k), np.nan), "n": np.zeros((p, k)), "j": np.full((p, k), -1, dtype=np.intp)}
+    hits: List[tuple] = []
+
+    starts = range(0, p, block_columns)
+    for a in starts:
+        rows = np.arange(a, min(p, a + block_columns))
+        x = _prepare(df, [positions[i] for i in rows], ranks)
+        for b in starts:
+            if b < a:
+                continue
+            cols = np.arange(b, min(p, b + block_columns))
+            y = x if b == a else _prepare(df, [positions[j] for j in cols], ranks)
+            r, n = _block_corr(*x, *y)
+            if a == b:
+                np.fill_diagonal(r, np.nan)
+            if threshold is not None:
+                hit_i, hit_j = np.nonzero(np.abs(np.nan_to_num(r)) >= threshold)
+                hits.append((rows[hit_i], cols[hit_j], r[hit_i, hit_j], n[hit_i, hit_j]))
+            if k:
+                _merge_top(best, rows, r, n, cols, k)
+                if a != b:
+                    _merge_top(best, cols, r.T, n.T, rows, k)
+
+    if k:
+        filled = (best["j"] >= 0) & ~np.isnan(best["r"])
+        src = np.repeat(np.arange(p)[:, None], k, axis=1)
+        hits.append((src[filled], best["j"][filled], best["r"][filled], best["n"][filled]))
+    i, j, r, n = (np.concatenate(parts) for parts in zip(*hits)) if hits else ([],) * 4
+    return _edge_frame(names, np.asarray(i, dtype=np.intp), np.asarray(j, dtype=np.intp), np.asarray(r), np.asarray(n))
+
+
+def edges_from_matrix(
+    corr: pd.DataFrame,
+    threshold: Optional[float] = None,
+    top_k: Optional[int] = None,
+    counts: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Тот же отбор пар, что у correlation_edges, по готовой матрице (например,
+    из CovarianceAccumulator в потоковом режиме).
+    """
+    if threshold is None and top_k is None:
+        top_k = DEFAULT_TOP_K
+    names = list(corr.columns)
+    p = len(names)
+    if p < 2:
+        return pd.DataFrame(columns=EDGE_COLUMNS)
+    r = corr.to_numpy(dtype=np.float64, copy=True)
+    np.fill_diagonal(r, np.nan)
+    score = np.where(np.isnan(r), -1.0, np.abs(r))
+    keep = np.zeros_like(score, dtype=bool)
+    if threshold is not None:
+        keep |= score >= threshold
+    if top_k:
+        k = min(top_k, p - 1)
+        best = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        top = np.zeros_like(keep)
+        np.put_along_axis(top, best, True, axis=1)
+        keep |= top & (score >= 0)
+    i, j = np.nonzero(keep)
+    n = counts.to_numpy()[i, j] if counts is not None else np.full(len(i), -1)
+    return _edge_frame(names, i, j, r[i, j], n)
+
+
+def heatmap_from_edges(edges: pd.DataFrame, max_columns: int = HEATMAP_MAX_COLUMNS) -> pd.DataFrame:
+    """
+    Сжатая матрица для тепловой карты широкой таблицы: ``max_columns``
+    колонок с наибольшей суммарной |r| по списку пар, упорядоченных жадной
+    сериацией: следующей ставится колонка, сильнее всего связанная с
+    предыдущей, так что группы коррелированных признаков образуют блоки у
+    диагонали. Пары, которых нет в списке, – NaN.
+    """
+    if edges.empty:
+        return pd.DataFrame()
+    strength = pd.concat(
+        [
+            edges.groupby("left")["r"].apply(lambda r: r.abs().sum()),
+            edges.groupby("right")["r"].apply(lambda r: r.abs().sum()),
+        ]
+    ).groupby(level=0).sum()
+    chosen = strength.sort_values(ascending=False, kind="stable").index[:max_columns].tolist()
+    index = {name: i for i, name in enumerate(chosen)}
+    matrix = np.full((len(chosen), len(chosen)), np.nan)
+    np.fill_diagonal(matrix, 1.0)
+    inside = edges[edges["left"].isin(index) & edges["right"].isin(index)]
+    li = inside["left"].map(index).to_numpy()
+    ri = inside["right"].map(index).to_numpy()
+    matrix[li, ri] = matrix[ri, li] = inside["r"].to_numpy()
+
+    affinity = np.nan_to_num(np.abs(matrix))
+    np.fill_diagonal(affinity, -1.0)
+    order = [0]
+    placed = np.zeros(len(chosen), dtype=bool)
+    placed[0] = True
+    for _ in range(len(chosen) - 1):
+        links = np.where(placed, -2.0, affinity[order[-1]])
+        order.append(int(np.argmax(links)))
+        placed[order[-1]] = True
+    names = [chosen[i] for i in order]
+    return pd.DataFrame(matrix[np.ix_(order, order)], index=names, columns=names)
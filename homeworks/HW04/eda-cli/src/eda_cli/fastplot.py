@@ -0,0 +1,411 @@
+"""
+Быстрый рендер «сеточных» графиков отчёта без matplotlib.
+
+Матрица пропусков и тепловая карта корреляции – это просто цветные клетки,
+поэтому их можно записать напрямую из NumPy: значения переводятся в цвета
+таблицей палитры (256 цветов), клетки растягиваются до нужного размера, и
+изображение кодируется в PNG (zlib) или SVG. Подписи в PNG рисуются
+встроенным пиксельным шрифтом 3×5 (латиница в верхнем регистре, цифры,
+знаки), в SVG – обычным текстом. Если в подписях PNG есть символы вне
+шрифта (например, кириллица), график рисуется через matplotlib, чтобы
+подписи остались читаемыми.
+
+Сигнатуры render_missing_matrix / render_heatmap те же, что у рендеров
+viz, – их можно подставить в PlotJob (``renderer="fast"``).
+"""
+
+from __future__ import annotations
+
+import base64
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+# Опорные точки палитр matplotlib (позиция -> RGB), между ними – линейно
+_VIRIDIS = [
+    (0.0, (68, 1, 84)),
+    (0.125, (71, 44, 122)),
+    (0.25, (59, 81, 139)),
+    (0.375, (44, 113, 142)),
+    (0.5, (33, 144, 141)),
+    (0.625, (39, 173, 129)),
+    (0.75, (92, 200, 99)),
+    (0.875, (170, 220, 50)),
+    (1.0, (253, 231, 37)),
+]
+_COOLWARM = [
+    (0.0, (59, 76, 192)),
+    (0.125, (98, 130, 234)),
+    (0.25, (141, 176, 254)),
+    (0.375, (184, 208, 249)),
+    (0.5, (221, 221, 221)),
+    (0.625, (245, 196, 173)),
+    (0.75, (244, 154, 123)),
+    (0.875, (222, 96, 77)),
+    (1.0, (180, 4, 38)),
+]
+# Цвет клеток с NaN, фона и текста
+_NAN_RGB = (235, 235, 235)
+_BACKGROUND = 255
+_INK = (0, 0, 0)
+
+# Пиксельный шрифт 3×5: строки глифа сверху вниз
+_GLYPHS: Dict[str, Tuple[str, ...]] = {
+    "A": (".#.", "#.#", "###", "#.#", "#.#"),
+    "B": ("##.", "#.#", "##.", "#.#", "##."),
+    "C": (".##", "#..", "#..", "#..", ".##"),
+    "D": ("##.", "#.#", "#.#", "#.#", "##."),
+    "E": ("###", "#..", "##.", "#..", "###"),
+    "F": ("###", "#..", "##.", "#..", "#.."),
+    "G": (".##", "#..", "#.#", "#.#", ".##"),
+    "H": ("#.#", "#.#", "###", "#.#", "#.#"),
+    "I": ("###", ".#.", ".#.", ".#.", "###"),
+    "J": ("..#", "..#", "..#", "#.#", ".#."),
+    "K": ("#.#", "#.#", "##.", "#.#", "#.#"),
+    "L": ("#..", "#..", "#..", "#..", "###"),
+    "M": ("#.#", "###", "###", "#.#", "#.#"),
+    "N": ("##.", "#.#", "#.#", "#.#", "#.#"),
+    "O": (".#.", "#.#", "#.#", "#.#", ".#."),
+    "P": ("##.", "#.#", "##.", "#..", "#.."),
+    "Q": (".#.", "#.#", "#.#", "##.", ".##"),
+    "R": ("##.", "#.#", "##.", "#.#", "#.#"),
+    "S": (".##", "#..", ".#.", "..#", "##."),
+    "T": ("###", ".#.", ".#.", ".#.", ".#."),
+    "U": ("#.#", "#.#", "#.#", "#.#", "###"),
+    "V": ("#.#", "#.#", "#.#", "#.#", ".#."),
+    "W": ("#.#", "#.#", "###", "###", "#.#"),
+    "X": ("#.#", "#.#", ".#.", "#.#", "#.#"),
+    "Y": ("#.#", "#.#", ".#.", ".#.", ".#."),
+    "Z": ("###", "..#", ".#.", "#..", "###"),
+    "0": ("###", "#.#", "#.#", "#.#", "###"),
+    "1": (".#.", "##.", ".#.", ".#.", "###"),
+    "2": ("##.", "..#", ".#.", "#..", "###"),
+    "3": ("##.", "..#", ".#.", "..#", "##."),
+    "4": ("#.#", "#.#", "###", "..#", "..#"),
+    "5": ("###", "#..", "##.", "..#", "##."),
+    "6": (".##", "#..", "###", "#.#", "###"),
+    "7": ("###", "..#", ".#.", ".#.", ".#."),
+    "8": ("###", "#.#", "###", "#.#", "###"),
+    "9": ("###", "#.#", "###", "..#", "##."),
+    " ": ("...", "...", "...", "...", "..."),
+    ".": ("...", "...", "...", "...", ".#."),
+    ",": ("...", "...", "...", ".#.", "#.."),
+    "-": ("...", "...", "###", "...", "..."),
+    "_": ("...", "...", "...", "...", "###"),
+    ":": ("...", ".#.", "...", ".#.", "..."),
+    "(": ("..#", ".#.", ".#.", ".#.", "..#"),
+    ")": ("#..", ".#.", ".#.", ".#.", "#.."),
+    "/": ("..#", "..#", ".#.", "#..", "#.."),
+    "%": ("#.#", "..#", ".#.", "#..", "#.#"),
+    "+": ("...", ".#.", "###", ".#.", "..."),
+    "=": ("...", "###", "...", "###", "..."),
+    "?": ("##.", "..#", ".#.", "...", ".#."),
+    "~": ("...", "##.", ".##", "...", "..."),
+}
+# Глиф 3×5 плюс пиксель промежутка справа и снизу
+_GLYPH_W, _GLYPH_H = 4, 6
+# Подписи длиннее обрезаются
+_MAX_LABEL = 16
+# Ширина сетки в пикселях, к которой подбирается размер клетки
+_GRID_PX = 480
+_PAD = 6
+_BAR_W = 12
+
+
+def _lut(anchors: Sequence[Tuple[float, Tuple[int, int, int]]]) -> np.ndarray:
+    """Таблица палитры (256, 3) uint8 по опорным точкам."""
+    pos = np.array([p for p, _ in anchors])
+    rgb = np.array([c for _, c in anchors], dtype=np.float64)
+    x = np.linspace(0.0, 1.0, 256)
+    return np.stack([np.interp(x, pos, rgb[:, k]) for k in range(3)], axis=1).round().astype(np.uint8)
+
+
+VIRIDIS = _lut(_VIRIDIS)
+COOLWARM = _lut(_COOLWARM)
+
+
+def colorize(values: np.ndarray, lut: np.ndarray, vmin: float, vmax: float) -> np.ndarray:
+    """Значения -> RGB (h, w, 3) uint8 по таблице ``lut``; NaN – светло-серые."""
+    with np.errstate(invalid="ignore"):
+        scaled = (np.asarray(values, dtype=np.float64) - vmin) / (vmax - vmin)
+    nan = np.isnan(scaled)
+    index = np.clip(np.nan_to_num(scaled) * (len(lut) - 1), 0, len(lut) - 1).round().astype(np.intp)
+    rgb = lut[index]
+    rgb[nan] = _NAN_RGB
+    return rgb
+
+
+def encode_png(rgb: np.ndarray) -> bytes:
+    """RGB (h, w, 3) uint8 -> байты PNG (8 бит на канал, без фильтров строк)."""
+    height, width = rgb.shape[:2]
+    raw = np.zeros((height, 1 + 3 * width), dtype=np.uint8)
+    raw[:, 1:] = rgb.reshape(height, 3 * width)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _label(text: str) -> str:
+    text = str(text)
+    return text if len(text) <= _MAX_LABEL else text[: _MAX_LABEL - 1] + "~"
+
+
+def supports_labels(labels: Sequence[str]) -> bool:
+    """Все ли символы подписей есть в пиксельном шрифте (без учёта регистра)."""
+    return all(char in _GLYPHS for text in labels for char in str(text).upper())
+
+
+def _needs_matplotlib(out_path: Path, values: Optional[np.ndarray], labels: Sequence[str]) -> bool:
+    return values is not None and Path(out_path).suffix.lower() != ".svg" and not supports_labels(labels)
+
+
+def _text_bitmap(text: str, scale: int = 1) -> np.ndarray:
+    """Маска текста (5·scale, 4·scale·len) пиксельным шрифтом."""
+    text = text.upper()
+    bitmap = np.zeros((_GLYPH_H - 1, _GLYPH_W * len(text)), dtype=bool)
+    for i, char in enumerate(text):
+        glyph = _GLYPHS.get(char, _GLYPHS["?"])
+        bitmap[:, i * _GLYPH_W : i * _GLYPH_W + 3] = [[c == "#" for c in row] for row in glyph]
+    return np.kron(bitmap, np.ones((scale, scale), dtype=bool))
+
+
+def _draw_text(canvas: np.ndarray, text: str, x: int, y: int, scale: int = 1, vertical: bool = False) -> None:
+    """
+    Нарисовать текст с левым верхним углом (x, y); ``vertical`` – снизу
+    вверх, как подписи с rotation=90 у matplotlib.
+    """
+    bitmap = _text_bitmap(text, scale)
+    if vertical:
+        bitmap = np.rot90(bitmap)
+    h = min(bitmap.shape[0], canvas.shape[0] - y)
+    w = min(bitmap.shape[1], canvas.shape[1] - x)
+    if h > 0 and w > 0:
+        canvas[y : y + h, x : x + w][bitmap[:h, :w]] = _INK
+
+
+def _text_width(text: str, scale: int = 1) -> int:
+    return len(text) * _GLYPH_W * scale
+
+
+def _cell_size(n: int, lo: int = 6, hi: int = 24) -> int:
+    return int(np.clip(_GRID_PX // max(1, n), lo, hi))
+
+
+def _grid_image(
+    values: np.ndarray,
+    lut: np.ndarray,
+    vmin: float,
+    vmax: float,
+    title: str,
+    col_labels: List[str],
+    row_labels: List[Tuple[int, str]],
+    bar_label: str,
+    cell: Tuple[int, int],
+) -> np.ndarray:
+    """
+    PNG-кадр: заголовок, сетка клеток, подписи колонок (вертикально под
+    сеткой), подписи строк ``row_labels`` (номер строки сетки, текст) слева
+    и шкала палитры справа.
+    """
+    cell_h, cell_w = cell
+    rows, cols = values.shape
+    # мелкие клетки – мелкий шрифт; совсем узкие колонки не подписываются
+    col_scale = 2 if cell_w >= 12 else 1
+    col_labels = [_label(c) for c in col_labels] if cell_w >= 6 else []
+    row_labels = [(r, _label(t)) for r, t in row_labels]
+    bar_ticks = [f"{v:g}" for v in (vmax, (vmin + vmax) / 2, vmin)]
+
+    left = _PAD + max([_text_width(t, 2) for _, t in row_labels] + [0]) + _PAD
+    top = _PAD + _GLYPH_H * 2 + _PAD
+    grid_w, grid_h = cols * cell_w, rows * cell_h
+    bottom = _PAD + max([_text_width(t, col_scale) for t in col_labels] + [0]) + _PAD
+    bar_x = left + grid_w + 2 * _PAD
+    right = 2 * _PAD + _BAR_W + _PAD + max(_text_width(t, 2) for t in bar_ticks) + _GLYPH_H * 2 + _PAD
+    width, height = left + grid_w + right, top + grid_h + bottom
+
+    canvas = np.full((height, width, 3), _BACKGROUND, dtype=np.uint8)
+    cells = colorize(values, lut, vmin, vmax)
+    canvas[top : top + grid_h, left : left + grid_w] = np.repeat(np.repeat(cells, cell_h, axis=0), cell_w, axis=1)
+    _draw_text(canvas, title, max(_PAD, left + (grid_w - _text_width(title, 2)) // 2), _PAD, scale=2)
+
+    for j, text in enumerate(col_labels):
+        x = left + j * cell_w + (cell_w - (_GLYPH_H - 1) * col_scale) // 2
+        _draw_text(canvas, text, x, top + grid_h + _PAD, scale=col_scale, vertical=True)
+    for r, text in row_labels:
+        y = top + r * cell_h + (cell_h - (_GLYPH_H - 1) * 2) // 2
+        _draw_text(canvas, text, left - _PAD - _text_width(text, 2), max(0, y), scale=2)
+
+    # шкала: сверху vmax, снизу vmin
+    ramp = np.linspace(vmax, vmin, grid_h)[:, None].repeat(_BAR_W, axis=1)
+    canvas[top : top + grid_h, bar_x : bar_x + _BAR_W] = colorize(ramp, lut, vmin, vmax)
+    for text, y in zip(bar_ticks, (top, top + grid_h // 2 - _GLYPH_H, top + grid_h - 2 * _GLYPH_H)):
+        _draw_text(canvas, text, bar_x + _BAR_W + _PAD, y, scale=2)
+    label_x = bar_x + _BAR_W + _PAD + max(_text_width(t, 2) for t in bar_ticks) + _PAD
+    label_y = top + max(0, (grid_h - _text_width(bar_label, 2)) // 2)
+    _draw_text(canvas, bar_label, label_x, label_y, scale=2, vertical=True)
+    return canvas
+
+
+def _grid_svg(
+    values: np.ndarray,
+    lut: np.ndarray,
+    vmin: float,
+    vmax: float,
+    title: str,
+    col_labels: List[str],
+    row_labels: List[Tuple[int, str]],
+    bar_label: str,
+    cell: Tuple[int, int],
+) -> str:
+    """
+    SVG-кадр: клетки – встроенная PNG-картинка (по пикселю на клетку,
+    растянутая без сглаживания), подписи и шкала – векторные.
+    """
+    cell_h, cell_w = cell
+    rows, cols = values.shape
+    font = 10
+    left = _PAD + max([len(_label(t)) for _, t in row_labels] + [0]) * font * 0.6 + _PAD
+    top = _PAD + font * 2
+    grid_w, grid_h = cols * cell_w, rows * cell_h
+    bottom = _PAD + max([len(_label(c)) for c in col_labels] + [0]) * font * 0.6 + _PAD
+    bar_x = left + grid_w + 2 * _PAD
+    width, height = bar_x + _BAR_W + 8 * font, top + grid_h + bottom
+
+    cells = base64.b64encode(encode_png(colorize(values, lut, vmin, vmax))).decode("ascii")
+    stops = "".join(
+        f'<stop offset="{k / 8:.3f}" stop-color="rgb{tuple(int(v) for v in lut[int(round((8 - k) / 8 * 255))])}"/>'
+        for k in range(9)
+    )
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'font-family="sans-serif" font-size="{font}">',
+        f'<rect width="100%" height="100%" fill="white"/>',
+        f'<text x="{left + grid_w / 2:.1f}" y="{_PAD + font:.1f}" text-anchor="middle" '
+        f'font-size="{font + 2}">{escape(title)}</text>',
+        f'<image x="{left:.1f}" y="{top:.1f}" width="{grid_w}" height="{grid_h}" preserveAspectRatio="none" '
+        f'style="image-rendering:pixelated" href="data:image/png;base64,{cells}"/>',
+        f'<defs><linearGradient id="bar" x1="0" y1="0" x2="0" y2="1">{stops}</linearGradient></defs>',
+        f'<rect x="{bar_x:.1f}" y="{top:.1f}" width="{_BAR_W}" height="{grid_h}" fill="url(#bar)"/>',
+    ]
+    for text, y in zip((vmax, (vmin + vmax) / 2, vmin), (top + font, top + grid_h / 2 + font / 2, top + grid_h)):
+        parts.append(f'<text x="{bar_x + _BAR_W + 3:.1f}" y="{y:.1f}">{text:g}</text>')
+    parts.append(
+        f'<text transform="translate({width - _PAD:.1f},{top + grid_h / 2:.1f}) rotate(-90)" '
+        f'text-anchor="middle">{escape(bar_label)}</text>'
+    )
+    for j, text in enumerate(col_labels):
+        x, y = left + (j + 0.5) * cell_w + font / 3, top + grid_h + _PAD
+        parts.append(
+            f'<text transform="translate({x:.1f},{y:.1f}) rotate(-90)" text-anchor="end">{escape(_label(text))}</text>'
+        )
+    for r, text in row_labels:
+        y = top + (r + 0.5) * cell_h + font / 3
+        parts.append(f'<text x="{left - _PAD:.1f}" y="{y:.1f}" text-anchor="end">{escape(_label(text))}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def _write(
+    out_path: Path,
+    values: Optional[np.ndarray],
+    message: str,
+    lut: np.ndarray,
+    vmin: float,
+    vmax: float,
+    title: str,
+    col_labels: List[str],
+    row_labels: List[Tuple[int, str]],
+    bar_label: str,
+    cell: Tuple[int, int],
+) -> None:
+    """Записать кадр в PNG или SVG (по расширению ``out_path``)."""
+    out_path = Path(out_path)
+    svg = out_path.suffix.lower() == ".svg"
+    if values is None:
+        if svg:
+            out_path.write_text(
+                '<svg xmlns="http://www.w3.org/2000/svg" width="320" height="60" font-family="sans-serif">'
+                f'<text x="160" y="34" text-anchor="middle">{escape(message)}</text></svg>',
+                encoding="utf-8",
+            )
+        else:
+            canvas = np.full((60, 2 * _PAD + _text_width(message, 2), 3), _BACKGROUND, dtype=np.uint8)
+            _draw_text(canvas, message, _PAD, 24, scale=2)
+            out_path.write_bytes(encode_png(canvas))
+        return
+    args = (values, lut, vmin, vmax, title, col_labels, row_labels, bar_label, cell)
+    if svg:
+        out_path.write_text(_grid_svg(*args), encoding="utf-8")
+    else:
+        out_path.write_bytes(encode_png(_grid_image(*args)))
+
+
+def render_missing_matrix(
+    out_path: Path,
+    values: Optional[np.ndarray],
+    row_starts: List[int],
+    columns: List[str],
+) -> None:
+    """Матрица пропусков (доли по корзинам строк) – как viz._render_missing_matrix."""
+    if _needs_matplotlib(out_path, values, columns):
+        from .viz import _render_missing_matrix
+
+        _render_missing_matrix(out_path, values, row_starts, columns)
+        return
+    rows = len(row_starts)
+    cell = (max(1, 320 // max(1, rows)), _cell_size(len(columns)))
+    ticks = np.unique(np.linspace(0, rows - 1, min(5, rows)).astype(int)) if rows else []
+    _write(
+        out_path,
+        values,
+        "Empty dataset",
+        VIRIDIS,
+        0.0,
+        1.0,
+        "Missing values matrix",
+        columns,
+        [(int(t), str(row_starts[t])) for t in ticks],
+        "Missing share",
+        cell,
+    )
+
+
+def render_heatmap(
+    out_path: Path,
+    values: Optional[np.ndarray],
+    columns: List[str],
+    index: List[str],
+    label: str = "Pearson r",
+) -> None:
+    """Тепловая карта корреляции – как viz._render_heatmap."""
+    if _needs_matplotlib(out_path, values, [*columns, *index, label]):
+        from .viz import _render_heatmap
+
+        _render_heatmap(out_path, values, columns, index, label)
+        return
+    size = _cell_size(max(len(columns), len(index)))
+    _write(
+        out_path,
+        values,
+        "Not enough numeric columns for correlation",
+        COOLWARM,
+        -1.0,
+        1.0,
+        "Correlation heatmap",
+        columns,
+        list(enumerate(index)),
+        label,
+        (size, size),
+    )
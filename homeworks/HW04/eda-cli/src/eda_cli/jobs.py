@@ -0,0 +1,218 @@
+"""
+Фоновые задачи генерации отчётов для HTTP-сервиса.
+
+Каждая задача – каталог ``<base_dir>/<job_id>``: загруженный CSV, файл
+статуса ``status.json`` и каталог ``report/`` с артефактами полного
+конвейера ``cli.generate_report`` (таблицы, Markdown, графики). Задачи
+выполняются в пуле процессов ограниченного размера; статус пишет сам воркер,
+поэтому прогресс по этапам виден из процесса сервиса без общей памяти.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .cli import REPORT_STAGES, generate_report
+from .readers import is_supported
+
+PathLike = Union[str, Path]
+
+# Состояния задачи; done и failed – конечные
+JOB_STATES = ("queued", "running", "done", "failed")
+
+STATUS_FILE = "status.json"
+INPUT_STEM = "input"
+REPORT_DIR = "report"
+
+
+class JobQueueFull(Exception):
+    """Превышено число незавершённых задач."""
+
+
+@dataclass
+class ReportJob:
+    """Статус задачи генерации отчёта."""
+
+    id: str
+    job_dir: str
+    source_name: Optional[str] = None
+    status: str = "queued"
+    stage: Optional[str] = None
+    stages: Dict[str, str] = field(
+        default_factory=lambda: {name: "pending" for name in REPORT_STAGES}
+    )
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    @property
+    def report_dir(self) -> Path:
+        return Path(self.job_dir) / REPORT_DIR
+
+    @property
+    def input_path(self) -> Path:
+        """Загруженный файл; расширение исходного имени задаёт формат (CSV по умолчанию)."""
+        suffix = Path(self.source_name).suffix.lower() if self.source_name else ""
+        return Path(self.job_dir) / (INPUT_STEM + (suffix if is_supported(INPUT_STEM + suffix) else ".csv"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReportJob":
+        return cls(**data)
+
+
+def write_status(job: ReportJob) -> None:
+    """Атомарно записать статус (читатель никогда не видит файл наполовину)."""
+    path = Path(job.job_dir) / STATUS_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(job.to_dict(), ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_status(job_dir: PathLike) -> Optional[ReportJob]:
+    path = Path(job_dir) / STATUS_FILE
+    if not path.exists():
+        return None
+    return ReportJob.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+def _run_report_job(job_dir: str, params: Dict[str, Any]) -> None:
+    """Воркер: полный конвейер отчёта с записью прогресса в status.json."""
+    job = read_status(job_dir)
+    assert job is not None, f"Нет статуса задачи в {job_dir}"
+    job.status, job.started_at = "running", time.time()
+    write_status(job)
+
+    def progress(stage: str) -> None:
+        if job.stage is not None:
+            job.stages[job.stage] = "done"
+        job.stage = stage
+        job.stages[stage] = "running"
+        write_status(job)
+
+    input_path = job.input_path
+    try:
+        generate_report(
+            str(input_path),
+            out_dir=str(job.report_dir),
+            cache=False,
+            source_name=job.source_name,
+            progress=progress,
+            **params,
+        )
+        job.stages = {name: "done" for name in REPORT_STAGES}
+        job.status = "done"
+    except Exception as exc:  # noqa: BLE001
+        if job.stage is not None:
+            job.stages[job.stage] = "failed"
+        job.status, job.error = "failed", str(exc) or type(exc).__name__
+    finally:
+        job.finished_at = time.time()
+        write_status(job)
+        input_path.unlink(missing_ok=True)
+
+
+class JobManager:
+    """
+    Очередь задач генерации отчётов: не больше ``max_workers`` задач
+    выполняются одновременно, не больше ``max_pending`` ждут или выполняются.
+    """
+
+    def __init__(
+        self,
+        base_dir: PathLike = "api_reports",
+        max_workers: int = 2,
+        max_pending: int = 16,
+    ) -> None:
+        self.base_dir = Path(base_dir)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._jobs: Dict[str, Path] = {}
+        self._futures: Dict[str, Future] = {}
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def create(self, source_name: Optional[str] = None, base_dir: Optional[PathLike] = None) -> ReportJob:
+        """Зарегистрировать задачу: каталог и статус queued (входной файл кладёт вызывающий)."""
+        self._futures = {key: f for key, f in self._futures.items() if not f.done()}
+        pending = len(self._futures)
+        if pending >= self.max_pending:
+            raise JobQueueFull(f"В очереди уже {pending} задач")
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = Path(base_dir or self.base_dir) / job_id
+        job_dir.mkdir(parents=True, exist_ok=False)
+        job = ReportJob(id=job_id, job_dir=str(job_dir), source_name=source_name)
+        write_status(job)
+        self._jobs[job_id] = job_dir
+        return job
+
+    def input_path(self, job: ReportJob) -> Path:
+        return job.input_path
+
+    def submit(self, job: ReportJob, **params: Any) -> None:
+        """Поставить задачу в пул; ``params`` – параметры generate_report."""
+        future = self._get_executor().submit(_run_report_job, job.job_dir, params)
+        future.add_done_callback(lambda f, job_dir=job.job_dir: self._on_done(job_dir, f))
+        self._futures[job.id] = future
+
+    @staticmethod
+    def _on_done(job_dir: str, future: Future) -> None:
+        """Если воркер упал, не успев записать итог, задача помечается failed."""
+        if future.cancelled():
+            error = "Задача отменена"
+        elif future.exception() is not None:
+            error = str(future.exception()) or type(future.exception()).__name__
+        else:
+            return
+        job = read_status(job_dir)
+        if job is not None and not job.finished:
+            job.status, job.error, job.finished_at = "failed", error, time.time()
+            write_status(job)
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        job_dir = self._jobs.get(job_id)
+        if job_dir is None:
+            # задачи из каталога по умолчанию доступны и после перезапуска сервиса
+            if not job_id.isalnum():
+                return None
+            job_dir = self.base_dir / job_id
+        return read_status(job_dir)
+
+    def artifacts(self, job: ReportJob) -> List[str]:
+        """Относительные пути артефактов готового отчёта."""
+        if not job.report_dir.exists():
+            return []
+        return sorted(
+            p.relative_to(job.report_dir).as_posix() for p in job.report_dir.rglob("*") if p.is_file()
+        )
+
+    def artifact_path(self, job: ReportJob, name: str) -> Optional[Path]:
+        """Путь к артефакту ``name`` внутри каталога отчёта (None для чужих путей)."""
+        root = job.report_dir.resolve()
+        path = (root / name).resolve()
+        if not path.is_relative_to(root) or not path.is_file():
+            return None
+        return path
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,305 @@
+"""
+Параллельное профилирование колонок в пуле процессов.
+
+Колонки делятся на шарды, каждый шард обрабатывается отдельным процессом,
+результаты собираются обратно в исходном порядке колонок. Числовые колонки
+передаются воркерам через ``multiprocessing.shared_memory`` (float64-блок,
+без pickle). Строковые колонки воркеры берут из памяти родителя, унаследованной
+при fork (copy-on-write): pickle object-колонки стоит дороже самого профилирования.
+Там, где fork недоступен (или пул передан снаружи), строковые колонки
+сериализуются как обычные Series.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .core import (
+    _NUMERIC_BLOCK_BYTES,
+    APPROX_UNIQUE_ROWS,
+    UNIQUE_ERROR,
+    ColumnSummary,
+    DatasetSummary,
+    _is_block_numeric,
+    _numeric_block_stats,
+    _numeric_column_summary,
+    _summarize_column_reference,
+    _summarize_object_column,
+)
+
+# Описание float64-блока в разделяемой памяти: (имя сегмента, форма)
+BlockRef = Tuple[str, Tuple[int, int]]
+
+# Шард строковых колонок: позиции в унаследованном DataFrame или сами Series
+ColumnsPayload = Union[List[int], List[pd.Series]]
+
+# DataFrame, который воркеры наследуют от родителя при fork
+_INHERITED_FRAME: Optional[pd.DataFrame] = None
+
+
+def split_shards(items: Sequence[Any], n_shards: int) -> List[List[Any]]:
+    """Делит последовательность на не более чем ``n_shards`` непустых шардов подряд."""
+    n_shards = max(1, min(n_shards, len(items)))
+    bounds = np.linspace(0, len(items), n_shards + 1).astype(int)
+    return [list(items[a:b]) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+@contextmanager
+def shared_block(df: pd.DataFrame, positions: Sequence[int]) -> Iterator[BlockRef]:
+    """
+    Копирует числовые колонки ``positions`` в float64-блок (n_cols, n_rows)
+    в разделяемой памяти; сегмент удаляется при выходе из контекста.
+    """
+    shape = (len(positions), len(df))
+    shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * shape[0] * shape[1]))
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        for j, pos in enumerate(positions):
+            block[j] = df.iloc[:, pos].to_numpy(dtype=np.float64, na_value=np.nan)
+        del block
+        yield shm.name, shape
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Подключиться к сегменту родителя. Владелец сегмента – родитель, поэтому
+    воркер снимает его с учёта resource_tracker (иначе тот «чистит» сегмент
+    и предупреждает об утечке при завершении воркера).
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    except Exception:  # noqa: BLE001
+        pass
+    return shm
+
+
+def _numeric_shard_worker(ref: BlockRef, start: int, stop: int) -> Dict[str, np.ndarray]:
+    """Воркер: статистики строк ``start:stop`` разделяемого блока."""
+    name, shape = ref
+    shm = _attach(name)
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        stats = _numeric_block_stats(block[start:stop])
+        del block
+        return stats
+    finally:
+        shm.close()
+
+
+def _numeric_missing_worker(ref: BlockRef, start: int, stop: int) -> np.ndarray:
+    """Воркер: число NaN в строках ``start:stop`` разделяемого блока."""
+    name, shape = ref
+    shm = _attach(name)
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        counts = np.isnan(block[start:stop]).sum(axis=1)
+        del block
+        return counts
+    finally:
+        shm.close()
+
+
+def _resolve_columns(payload: ColumnsPayload) -> List[pd.Series]:
+    if payload and not isinstance(payload[0], pd.Series):
+        assert _INHERITED_FRAME is not None, "DataFrame не унаследован воркером"
+        return [_INHERITED_FRAME.iloc[:, pos] for pos in payload]
+    return list(payload)
+
+
+def _object_shard_worker(
+    payload: ColumnsPayload,
+    n_rows: int,
+    example_values_per_column: int,
+    approx_unique_rows: Optional[int],
+    unique_error: float,
+) -> List[ColumnSummary]:
+    """Воркер: ColumnSummary для шарда нечисловых колонок."""
+    result = []
+    for s in _resolve_columns(payload):
+        if pd.api.types.is_numeric_dtype(s):
+            result.append(_summarize_column_reference(s, n_rows, example_values_per_column))
+        else:
+            result.append(
+                _summarize_object_column(
+                    s, n_rows, example_values_per_column, approx_unique_rows, unique_error
+                )
+            )
+    return result
+
+
+def _object_missing_worker(payload: ColumnsPayload) -> List[int]:
+    return [int(s.isna().sum()) for s in _resolve_columns(payload)]
+
+
+def _value_counts_worker(payload: ColumnsPayload, top_k: int) -> List[pd.Series]:
+    return [s.value_counts(dropna=True).head(top_k) for s in _resolve_columns(payload)]
+
+
+def _payload(df: pd.DataFrame, shard: Sequence[int], inherited: bool) -> ColumnsPayload:
+    return list(shard) if inherited else [df.iloc[:, pos] for pos in shard]
+
+
+def _numeric_rounds(df: pd.DataFrame, positions: Sequence[int], workers: int) -> List[List[int]]:
+    """
+    Группы числовых колонок, которые одновременно лежат в разделяемой памяти:
+    на каждого воркера приходится не больше ``_NUMERIC_BLOCK_BYTES``.
+    """
+    per_round = max(workers, workers * (_NUMERIC_BLOCK_BYTES // max(1, 8 * len(df))))
+    return [list(positions[i : i + per_round]) for i in range(0, len(positions), per_round)]
+
+
+def _split_columns(df: pd.DataFrame) -> Tuple[List[int], List[int]]:
+    numeric, other = [], []
+    for pos in range(df.shape[1]):
+        (numeric if _is_block_numeric(df.iloc[:, pos]) else other).append(pos)
+    return numeric, other
+
+
+def summarize_parallel(
+    df: pd.DataFrame,
+    example_values_per_column: int = 3,
+    workers: int = 2,
+    executor: Optional[Executor] = None,
+    approx_unique_rows: Optional[int] = APPROX_UNIQUE_ROWS,
+    unique_error: float = UNIQUE_ERROR,
+) -> DatasetSummary:
+    """
+    Параллельный аналог core.summarize_dataset: колонки делятся на шарды
+    и профилируются в пуле из ``workers`` процессов.
+    """
+    n_rows, n_cols = df.shape
+    columns: List[Optional[ColumnSummary]] = [None] * n_cols
+    numeric_positions, other_positions = _split_columns(df)
+
+    with _executor(executor, workers, df) as (pool, inherited):
+        other_futures = [
+            (
+                shard,
+                pool.submit(
+                    _object_shard_worker,
+                    _payload(df, shard, inherited),
+                    n_rows,
+                    example_values_per_column,
+                    approx_unique_rows,
+                    unique_error,
+                ),
+            )
+            for shard in split_shards(other_positions, workers)
+        ]
+
+        for round_positions in _numeric_rounds(df, numeric_positions, workers):
+            with shared_block(df, round_positions) as ref:
+                shards = split_shards(range(len(round_positions)), workers)
+                futures = [
+                    (shard, pool.submit(_numeric_shard_worker, ref, shard[0], shard[-1] + 1))
+                    for shard in shards
+                ]
+                for shard, future in futures:
+                    stats = future.result()
+                    for j, local in enumerate(shard):
+                        pos = round_positions[local]
+                        columns[pos] = _numeric_column_summary(
+                            df.iloc[:, pos], n_rows, stats, j, example_values_per_column
+                        )
+
+        for shard, future in other_futures:
+            for pos, summary in zip(shard, future.result()):
+                columns[pos] = summary
+
+    return DatasetSummary(n_rows=n_rows, n_cols=n_cols, columns=list(columns))
+
+
+def missing_counts_parallel(
+    df: pd.DataFrame,
+    workers: int = 2,
+    executor: Optional[Executor] = None,
+) -> pd.Series:
+    """Число пропусков по колонкам (как ``df.isna().sum()``), посчитанное в пуле."""
+    counts = np.zeros(df.shape[1], dtype=np.int64)
+    numeric_positions, other_positions = _split_columns(df)
+
+    with _executor(executor, workers, df) as (pool, inherited):
+        other_futures = [
+            (shard, pool.submit(_object_missing_worker, _payload(df, shard, inherited)))
+            for shard in split_shards(other_positions, workers)
+        ]
+        for round_positions in _numeric_rounds(df, numeric_positions, workers):
+            with shared_block(df, round_positions) as ref:
+                shards = split_shards(range(len(round_positions)), workers)
+                futures = [
+                    (shard, pool.submit(_numeric_missing_worker, ref, shard[0], shard[-1] + 1))
+                    for shard in shards
+                ]
+                for shard, future in futures:
+                    for local, count in zip(shard, future.result()):
+                        counts[round_positions[local]] = count
+        for shard, future in other_futures:
+            for pos, count in zip(shard, future.result()):
+                counts[pos] = count
+
+    return pd.Series(counts, index=df.columns)
+
+
+def value_counts_parallel(
+    df: pd.DataFrame,
+    names: Sequence[str],
+    top_k: int,
+    workers: int = 2,
+    executor: Optional[Executor] = None,
+) -> Dict[str, pd.Series]:
+    """``value_counts().head(top_k)`` для колонок ``names``, посчитанные в пуле."""
+    result: Dict[str, pd.Series] = {}
+    positions = [df.columns.get_loc(name) for name in names]
+    with _executor(executor, workers, df) as (pool, inherited):
+        futures = [
+            (
+                [df.columns[pos] for pos in shard],
+                pool.submit(_value_counts_worker, _payload(df, shard, inherited), top_k),
+            )
+            for shard in split_shards(positions, workers)
+        ]
+        for shard, future in futures:
+            for name, vc in zip(shard, future.result()):
+                result[name] = vc
+    return {name: result[name] for name in names}
+
+
+@contextmanager
+def _executor(
+    executor: Optional[Executor],
+    workers: int,
+    df: pd.DataFrame,
+) -> Iterator[Tuple[Executor, bool]]:
+    """
+    Использует переданный пул или создаёт временный ProcessPoolExecutor.
+
+    Второе значение – унаследуют ли воркеры ``df`` от родителя (fork): тогда
+    им достаточно передавать позиции колонок.
+    """
+    global _INHERITED_FRAME
+
+    if executor is not None:
+        yield executor, False
+        return
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        context = None
+    if context is not None:
+        _INHERITED_FRAME = df
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            yield pool, context is not None
+    finally:
+        _INHERITED_FRAME = None
@@ -0,0 +1,562 @@
+"""
+Чтение входных файлов: CSV и колоночные форматы Arrow (Parquet, Feather, Arrow IPC).
+
+Колоночные форматы читаются через pyarrow (необязательная зависимость,
+``pip install "s03[arrow]"``): файл отображается в память (memory map),
+читаются только нужные колонки, а преобразование в pandas по возможности
+обходится без копирования (числовые колонки без пропусков).
+
+Большие CSV можно разбирать в несколько процессов: файл отображается в
+память, делится на диапазоны байт по границам записей (с учётом переводов
+строк внутри кавычек), и каждый диапазон разбирается отдельным воркером.
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .core import APPROX_UNIQUE_ROWS, UNIQUE_ERROR, ColumnSummary, DatasetSummary
+from .sketches import HyperLogLog
+
+PathLike = Union[str, Path]
+
+# Минимальный размер диапазона при параллельном разборе CSV: мелкие куски
+# не окупают запуск воркера
+MIN_RANGE_BYTES = 1 << 20
+
+# Блок, которым считаются кавычки при поиске границ записей
+_SCAN_BLOCK_BYTES = 1 << 24
+
+# Расширение файла -> формат
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "ipc",
+    ".arrow": "ipc",
+    ".ipc": "ipc",
+}
+
+
+def detect_format(path: PathLike) -> str:
+    """Формат по расширению: ``csv``, ``parquet`` или ``ipc`` (неизвестное – csv)."""
+    return FORMATS.get(Path(path).suffix.lower(), "csv")
+
+
+def is_supported(name: str) -> bool:
+    return Path(name).suffix.lower() in FORMATS
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.feather  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:  # pragma: no cover - зависит от окружения
+        raise ImportError(
+            "Для Parquet/Feather/Arrow нужен pyarrow: pip install \"s03[arrow]\""
+        ) from exc
+    return pyarrow
+
+
+def _to_pandas(table: Any) -> pd.DataFrame:
+    # split_blocks: каждая колонка – отдельный блок, без склейки (и копии)
+    # в общий 2D-массив; self_destruct освобождает буферы Arrow по ходу
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def read_table(path: PathLike, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Прочитать Parquet/Feather/Arrow IPC целиком (только колонки ``columns``).
+
+    Parquet читается с memory map, декодируются только страницы выбранных
+    колонок. Файл Arrow IPC отображается в память без чтения: буферы
+    невыбранных колонок не затрагиваются вовсе.
+    """
+    pa = _pyarrow()
+    fmt = detect_format(path)
+    cols = list(columns) if columns else None
+    if fmt == "parquet":
+        table = pa.parquet.read_table(path, columns=cols, memory_map=True)
+    elif fmt == "ipc":
+        table = pa.feather.read_table(path, columns=cols, memory_map=True)
+    else:
+        raise ValueError(f"Неколоночный формат: {path}")
+    return _to_pandas(table)
+
+
+def iter_table_chunks(
+    path: PathLike,
+    chunksize: int,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Чанки Parquet/Arrow IPC по ``chunksize`` строк (для потокового профилирования)."""
+    pa = _pyarrow()
+    fmt = detect_format(path)
+    cols = list(columns) if columns else None
+    if fmt == "parquet":
+        parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=cols):
+            yield _to_pandas(pa.Table.from_batches([batch]))
+    elif fmt == "ipc":
+        table = pa.feather.read_table(path, columns=cols, memory_map=True)
+        for start in range(0, table.num_rows, chunksize):
+            yield _to_pandas(table.slice(start, chunksize))
+    else:
+        raise ValueError(f"Неколоночный формат: {path}")
+
+
+def iter_frame_chunks(
+    path: PathLike,
+    chunksize: int,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Чанки по ``chunksize`` строк из файла любого поддерживаемого формата."""
+    if detect_format(path) != "csv":
+        yield from iter_table_chunks(path, chunksize, columns=columns)
+        return
+    usecols = list(columns) if columns else None
+    with pd.read_csv(path, sep=sep, encoding=encoding, chunksize=chunksize, usecols=usecols) as reader:
+        yield from reader
+
+
+def read_frame(
+    path: PathLike,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """
+    Прочитать файл любого поддерживаемого формата в DataFrame.
+    CSV при ``workers > 1`` разбирается параллельно (read_csv_parallel).
+    """
+    if detect_format(path) == "csv":
+        if workers > 1:
+            return read_csv_parallel(path, sep=sep, encoding=encoding, columns=columns, workers=workers)
+        return pd.read_csv(path, sep=sep, encoding=encoding, usecols=list(columns) if columns else None)
+    return read_table(path, columns=columns)
+
+
+# ---------- Параллельный разбор CSV по диапазонам байт ----------
+
+
+class _ByteRange(io.RawIOBase):
+    """Файл, ограниченный диапазоном байт ``[start, end)``."""
+
+    def __init__(self, f: BinaryIO, start: int, end: int) -> None:
+        self._f = f
+        self._f.seek(start)
+        self._end = end
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        n = min(len(buffer), self._end - self._f.tell())
+        if n <= 0:
+            return 0
+        data = self._f.read(n)
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def is_byte_splittable(encoding: str) -> bool:
+    """
+    Можно ли искать границы записей побайтно: перевод строки и кавычка
+    кодируются одним ASCII-байтом (utf-8, cp1251, latin-1 – да; utf-16 – нет).
+    BOM (utf-8-sig) не мешает: он только в начале файла, до заголовка.
+    """
+    try:
+        return '\n"'.encode(encoding).endswith(b'\n"')
+    except LookupError:
+        return False
+
+
+def _count_quotes(data: np.ndarray, start: int, end: int) -> int:
+    total = 0
+    for pos in range(start, end, _SCAN_BLOCK_BYTES):
+        total += int(np.count_nonzero(data[pos : min(end, pos + _SCAN_BLOCK_BYTES)] == ord('"')))
+    return total
+
+
+def _record_end(buf: Any, data: np.ndarray, pos: int, in_quotes: bool) -> int:
+    """
+    Позиция сразу после ближайшего перевода строки начиная с ``pos``, который
+    не находится внутри кавычек (``in_quotes`` – состояние на ``pos``).
+    Экранированная кавычка ``""`` меняет чётность дважды и не мешает.
+    """
+    size = len(data)
+    while pos < size:
+        idx = buf.find(b"\n", pos)
+        if idx < 0:
+            return size
+        in_quotes ^= _count_quotes(data, pos, idx) % 2 == 1
+        if not in_quotes:
+            return idx + 1
+        pos = idx + 1
+    return size
+
+
+def csv_byte_ranges(
+    path: PathLike,
+    n_parts: int,
+    min_range_bytes: Optional[int] = None,
+) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Делит CSV на не более чем ``n_parts`` диапазонов байт по границам записей.
+
+    Возвращает конец заголовка и список ``(start, end)`` для строк данных.
+    Файл отображается в память; чтобы не резать запись с переводом строки
+    внутри кавычек, для каждой точки разреза считается чётность кавычек
+    от начала файла (векторно, numpy по отображению без копирования).
+    ``min_range_bytes`` – минимальный размер диапазона (по умолчанию MIN_RANGE_BYTES).
+    """
+    min_range_bytes = MIN_RANGE_BYTES if min_range_bytes is None else min_range_bytes
+    with open(path, "rb") as f:
+        size = Path(path).stat().st_size
+        if size == 0:
+            return 0, []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            data = np.frombuffer(buf, dtype=np.uint8)
+            try:
+                header_end = _record_end(buf, data, 0, False)
+                body = size - header_end
+                n_parts = max(1, min(n_parts, body // max(1, min_range_bytes)))
+                bounds = [header_end]
+                scanned, in_quotes = header_end, False
+                for k in range(1, n_parts):
+                    target = header_end + body * k // n_parts
+                    if target <= bounds[-1]:
+                        continue
+                    in_quotes ^= _count_quotes(data, scanned, target) % 2 == 1
+                    end = _record_end(buf, data, target, in_quotes)
+                    # чётность на новой границе (вне кавычек по построению)
+                    scanned, in_quotes = end, False
+                    if end < size:
+                        bounds.append(end)
+                bounds.append(size)
+            finally:
+                del data
+    ranges = [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+    return header_end, ranges
+
+
+def last_record_end(path: PathLike, size: int, start: int = 0) -> int:
+    """
+    Позиция сразу после последней завершённой записи CSV в первых ``size``
+    байтах файла (``start``, если после него завершённых записей нет).
+
+    ``start`` должен быть границей записи (вне кавычек). Как и в
+    csv_byte_ranges, перевод строки внутри кавычек запись не завершает:
+    чётность кавычек считается от ``start`` блоками по отображению файла.
+    """
+    if size <= start:
+        return start
+    end, in_quotes = start, False
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        data = np.frombuffer(buf, dtype=np.uint8)
+        try:
+            for pos in range(start, size, _SCAN_BLOCK_BYTES):
+                block = data[pos : min(size, pos + _SCAN_BLOCK_BYTES)]
+                quotes = np.flatnonzero(block == ord('"'))
+                newlines = np.flatnonzero(block == ord("\n"))
+                # перевод строки вне кавычек – чётное число кавычек перед ним
+                outside = (np.searchsorted(quotes, newlines) % 2 == 1) == in_quotes
+                closed = newlines[outside]
+                if len(closed):
+                    end = pos + int(closed[-1]) + 1
+                in_quotes ^= len(quotes) % 2 == 1
+                del block
+        finally:
+            del data
+    return end
+
+
+def csv_header(path: PathLike, sep: str = ",", encoding: str = "utf-8") -> List[str]:
+    return pd.read_csv(path, sep=sep, encoding=encoding, nrows=0).columns.tolist()
+
+
+def read_csv_range(
+    path: PathLike,
+    start: int,
+    end: int,
+    names: Sequence[str],
+    sep: str = ",",
+    encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Строки данных CSV из диапазона байт ``[start, end)`` (имена колонок – ``names``)."""
+    with open(path, "rb") as f:
+        return pd.read_csv(
+            io.BufferedReader(_ByteRange(f, start, end)),
+            sep=sep,
+            encoding=encoding,
+            header=None,
+            names=list(names),
+            usecols=list(columns) if columns else None,
+        )
+
+
+def _read_range_worker(args: Tuple[Any, ...]) -> pd.DataFrame:
+    path, start, end, names, sep, encoding, columns = args
+    return read_csv_range(path, start, end, names, sep=sep, encoding=encoding, columns=columns)
+
+
+def _mixed_kind(dtypes: Sequence[Any]) -> bool:
+    """Колонка в разных диапазонах получила несовместимые типы (число и строка)."""
+    kinds = {np.dtype(d).kind if not isinstance(d, pd.CategoricalDtype) else "O" for d in dtypes}
+    return len(kinds) > 1 and not kinds <= set("iuf")
+
+
+def read_csv_parallel(
+    path: PathLike,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+    workers: int = 2,
+    min_range_bytes: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    ``pd.read_csv`` в ``workers`` процессов: файл делится на диапазоны по
+    границам записей (csv_byte_ranges), каждый разбирается отдельно,
+    результаты склеиваются по порядку.
+
+    Каждый диапазон выводит типы сам; если колонка в одном диапазоне вышла
+    числовой, а в другом строковой, она перечитывается целиком одним
+    процессом, чтобы результат совпадал с обычным ``read_csv``. Для
+    кодировок, где перевод строки не один байт (utf-16), и маленьких файлов
+    – обычный ``read_csv``.
+    """
+    usecols = list(columns) if columns else None
+    if workers <= 1 or not is_byte_splittable(encoding):
+        return pd.read_csv(path, sep=sep, encoding=encoding, usecols=usecols)
+    _, ranges = csv_byte_ranges(path, workers, min_range_bytes=min_range_bytes)
+    if len(ranges) <= 1:
+        return pd.read_csv(path, sep=sep, encoding=encoding, usecols=usecols)
+
+    names = csv_header(path, sep=sep, encoding=encoding)
+    tasks = [(str(path), a, b, names, sep, encoding, usecols) for a, b in ranges]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        parts = list(pool.map(_read_range_worker, tasks))
+
+    mixed = [
+        name for name in parts[0].columns if _mixed_kind([part[name].dtype for part in parts])
+    ]
+    df = pd.concat(parts, ignore_index=True, copy=False)
+    for name in mixed:
+        df[name] = pd.read_csv(path, sep=sep, encoding=encoding, usecols=[name])[name]
+    return df
+
+
+def _pandas_dtype(arrow_type: Any, has_nulls: bool) -> str:
+    """dtype, который получится у колонки после ``to_pandas`` (как при чтении CSV)."""
+    pa = _pyarrow()
+    if pa.types.is_dictionary(arrow_type):
+        return "category"
+    try:
+        dtype = np.dtype(arrow_type.to_pandas_dtype())
+    except (NotImplementedError, TypeError):
+        return "object"
+    if dtype.kind in "iu" and has_nulls:
+        return "float64"
+    if dtype.kind == "b" and has_nulls:
+        return "object"
+    if dtype.kind in "OSU":
+        return "object"
+    return str(dtype)
+
+
+# Поля сводки, которых нет в статистиках футера Parquet: их можно досчитать
+# по данным (parquet_metadata_summary, ``fill``)
+METADATA_FILL_FIELDS = ("mean", "std", "unique", "examples")
+
+
+def parquet_metadata_summary(
+    path: PathLike,
+    columns: Optional[Sequence[str]] = None,
+    fill: Sequence[str] = (),
+) -> DatasetSummary:
+    """
+    Сводка по Parquet из футера: число строк, пропуски, min и max берутся из
+    статистик row group.
+
+    По умолчанию читается только футер: страницы данных не читаются, а поля,
+    которых в статистиках нет, остаются пустыми (``unique=None``). Поля из
+    ``fill`` (подмножество METADATA_FILL_FIELDS) досчитываются по данным:
+    row group за row group читаются только нужные колонки – для mean/std
+    числовые, для unique/examples все – и сворачиваются редьюсерами только
+    этих полей (без перцентилей, гистограмм и top-k). Колонки без
+    статистик (или вложенные типы) – исключение: для них пропуски всегда
+    считаются по данным. NaN в float-колонках статистики Parquet пропусками
+    не считают (pandas при записи превращает NaN в null, другие писатели –
+    не всегда).
+    """
+    unknown = sorted(set(fill) - set(METADATA_FILL_FIELDS))
+    if unknown:
+        raise ValueError(f"Неизвестные поля fill: {unknown}; допустимы: {', '.join(METADATA_FILL_FIELDS)}")
+    pa = _pyarrow()
+    parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+    n_rows = metadata.num_rows
+    names = list(columns) if columns else schema.names
+
+    # позиции листовых колонок футера для плоских колонок верхнего уровня
+    leaf_index: Dict[str, int] = {}
+    for i in range(metadata.num_columns):
+        leaf_index.setdefault(metadata.schema.column(i).path, i)
+
+    result: List[ColumnSummary] = []
+    for name in names:
+        field = schema.field(name)
+        nulls: Optional[int] = 0
+        min_val: Any = None
+        max_val: Any = None
+        i = leaf_index.get(name)
+        for rg in range(metadata.num_row_groups):
+            stats = metadata.row_group(rg).column(i).statistics if i is not None else None
+            if stats is None or not stats.has_null_count:
+                nulls = None
+                break
+            nulls += stats.null_count
+            if stats.has_min_max:
+                min_val = stats.min if min_val is None else min(min_val, stats.min)
+                max_val = stats.max if max_val is None else max(max_val, stats.max)
+        if nulls is None:
+            # статистик нет – читаем только эту колонку
+            nulls = parquet_file.read(columns=[name]).column(0).null_count
+            min_val = max_val = None
+
+        dtype = _pandas_dtype(field.type, nulls > 0)
+        is_numeric = dtype not in ("object", "category") and pd.api.types.is_numeric_dtype(np.dtype(dtype))
+        has_values = is_numeric and dtype != "bool" and min_val is not None
+        result.append(
+            ColumnSummary(
+                name=name,
+                dtype=dtype,
+                non_null=n_rows - nulls,
+                missing=nulls,
+                missing_share=float(nulls / n_rows) if n_rows > 0 else 0.0,
+                unique=None,
+                example_values=[],
+                is_numeric=is_numeric,
+                min=float(min_val) if has_values else None,
+                max=float(max_val) if has_values else None,
+            )
+        )
+    if fill:
+        result = _fill_from_row_groups(parquet_file, result, set(fill))
+    return DatasetSummary(n_rows=n_rows, n_cols=len(result), columns=result)
+
+
+class _FieldReducer:
+    """
+    Сливаемый по row group редьюсер одной колонки для parquet_metadata_summary:
+    ведёт только запрошенные поля. Моменты – в форме Уэлфорда со слиянием по
+    формуле Чана (``moments`` – какие из mean/std нужны), unique – множество (или HyperLogLog для больших файлов),
+    примеры – первые ``examples`` различных значений.
+    """
+
+    def __init__(self, dtype: str, moments: set, unique: bool, examples: int, approx: bool) -> None:
+        self.dtype = dtype
+        self.moments = moments
+        self.examples = examples
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.distinct: Optional[set] = set() if unique and not approx else None
+        self.hll = HyperLogLog(error=UNIQUE_ERROR) if unique and approx else None
+        self.first: List[Any] = []
+
+    def update(self, s: pd.Series) -> None:
+        values = s.dropna()
+        if len(values) == 0:
+            return
+        if self.moments:
+            numbers = values.to_numpy(dtype=np.float64)
+            mean = float(numbers.mean())
+            m2 = float(np.square(numbers - mean).sum())
+            total = self.count + len(numbers)
+            delta = mean - self.mean
+            self.m2 += m2 + delta * delta * self.count * len(numbers) / total
+            self.mean += delta * len(numbers) / total
+            self.count = total
+        if self.hll is not None:
+            self.hll.update(values.to_numpy())
+        if self.distinct is None and len(self.first) >= self.examples:
+            return
+        uniques = pd.unique(values.to_numpy()).tolist()
+        if self.distinct is not None:
+            self.distinct.update(uniques)
+        for value in uniques:
+            if len(self.first) >= self.examples:
+                break
+            if value not in self.first:
+                self.first.append(value)
+
+    def changes(self, non_null: int) -> Dict[str, Any]:
+        """Поля ColumnSummary, посчитанные этим редьюсером."""
+        # циклический импорт: streaming сам читает файлы через readers
+        from .streaming import _format_example
+
+        changes: Dict[str, Any] = {}
+        if self.moments and self.count > 0:
+            if "mean" in self.moments:
+                changes["mean"] = self.mean
+            if "std" in self.moments:
+                changes["std"] = float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float("nan")
+        if self.distinct is not None:
+            changes.update(unique=len(self.distinct), unique_is_estimate=False)
+        elif self.hll is not None:
+            unique = int(min(non_null, max(1 if non_null else 0, len(self.hll))))
+            changes.update(unique=unique, unique_is_estimate=True)
+        if self.examples:
+            changes["example_values"] = [_format_example(v, self.dtype) for v in self.first]
+        return changes
+
+
+def _fill_from_row_groups(
+    parquet_file: Any,
+    result: List[ColumnSummary],
+    fill: set,
+    example_values_per_column: int = 3,
+) -> List[ColumnSummary]:
+    """
+    Досчитать поля ``fill`` по данным: читаются только колонки, которым они
+    нужны (mean/std – числовые, unique/examples – все), по одному row group;
+    каждая колонка переводится в pandas отдельно и сразу сворачивается.
+    """
+    n_rows = parquet_file.metadata.num_rows
+    approx = APPROX_UNIQUE_ROWS is not None and n_rows >= APPROX_UNIQUE_ROWS
+    examples = example_values_per_column if "examples" in fill else 0
+    reducers: Dict[str, _FieldReducer] = {}
+    for col in result:
+        moments = fill & {"mean", "std"} if col.is_numeric else set()
+        if moments or "unique" in fill or examples:
+            reducers[col.name] = _FieldReducer(col.dtype, moments, "unique" in fill, examples, approx)
+    if not reducers:
+        return result
+    targets = list(reducers)
+    for rg in range(parquet_file.metadata.num_row_groups):
+        table = parquet_file.read_row_group(rg, columns=targets)
+        for j, name in enumerate(targets):
+            reducers[name].update(table.column(j).to_pandas())
+        del table
+
+    filled: List[ColumnSummary] = []
+    for col in result:
+        reducer = reducers.get(col.name)
+        changes = reducer.changes(col.non_null) if reducer is not None else {}
+        filled.append(replace(col, **changes))
+    return filled
@@ -0,0 +1,276 @@
+"""
+Выборочный режим для быстрой оценки больших файлов.
+
+Файл читается чанками за один проход; каждой строке присваивается случайный
+ключ U(0, 1), и в выборке остаются строки с наименьшими ключами (резервуарная
+выборка, векторно по чанку) – ``n`` строк на весь файл или на каждую страту,
+либо строки с ключом меньше ``frac`` (бернуллиевская выборка). Попутно
+считается размер каждой страты во всём файле, так что сводка по выборке
+взвешивается (вес строки – N_h / n_h) и сопровождается доверительными
+интервалами для mean, std и missing_share.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .core import DatasetSummary, summarize_dataset
+from .readers import iter_frame_chunks
+
+PathLike = Union[str, Path]
+
+# Метка страты для выборки без стратификации
+_ALL = "__all__"
+# Предел резервуара в режиме ``n``: n строк на каждую страту держатся в памяти
+# до конца прохода, так что n × число страт не должно его превышать
+MAX_RESERVOIR_ROWS = 5_000_000
+
+
+@dataclass
+class Sample:
+    """Выборка из файла и размеры страт во всём файле и в выборке."""
+
+    df: pd.DataFrame
+    n_rows: int
+    stratify: Optional[str] = None
+    # страта каждой строки выборки (строковые метки, NaN -> "nan")
+    strata: pd.Series = field(default_factory=lambda: pd.Series(dtype=object))
+    strata_rows: Dict[str, int] = field(default_factory=dict)
+    strata_sampled: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Вес строки выборки: сколько строк файла она представляет."""
+        ratio = {h: self.strata_rows[h] / n for h, n in self.strata_sampled.items() if n > 0}
+        return self.strata.map(ratio).to_numpy(dtype=np.float64)
+
+
+def _labels(chunk: pd.DataFrame, stratify: Optional[str]) -> pd.Series:
+    if stratify is None:
+        return pd.Series(_ALL, index=chunk.index, dtype=object)
+    return chunk[stratify].astype(str)
+
+
+def _smallest_per_stratum(keys: np.ndarray, labels: pd.Series, limits: Dict[str, int]) -> np.ndarray:
+    """Маска: в каждой страте ``limits[h]`` строк с наименьшими ключами."""
+    order = np.lexsort((keys, labels.to_numpy()))
+    ordered = labels.to_numpy()[order]
+    # позиция строки внутри своей страты после сортировки по ключу
+    starts = np.r_[0, np.flatnonzero(ordered[1:] != ordered[:-1]) + 1]
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    limit = pd.Series(ordered).map(limits).to_numpy()
+    mask = np.zeros(len(keys), dtype=bool)
+    mask[order[rank < limit]] = True
+    return mask
+
+
+def sample_chunks(
+    chunks: Iterable[pd.DataFrame],
+    n: Optional[int] = None,
+    frac: Optional[float] = None,
+    stratify: Optional[str] = None,
+    seed: Optional[int] = 0,
+    max_reservoir_rows: int = MAX_RESERVOIR_ROWS,
+) -> Sample:
+    """
+    Однопроходная выборка из потока чанков: ``n`` строк (на страту при
+    ``stratify``, затем пропорционально размерам страт) или доля ``frac``.
+    Строки выборки идут в порядке файла.
+
+    Отобранные куски копятся списком и склеиваются один раз; в режиме ``n``
+    буфер прореживается до резервуара, когда вдвое его перерастает. Память
+    резервуара – не больше ``max_reservoir_rows`` строк (n × число страт,
+    иначе ValueError); при ``frac`` она пропорциональна frac × размер файла.
+    """
+    if (n is None) == (frac is None):
+        raise ValueError("Нужно задать ровно одно из n и frac")
+    if n is not None and n <= 0:
+        raise ValueError("Размер выборки должен быть положительным")
+    if frac is not None and not 0 < frac <= 1:
+        raise ValueError("Доля выборки должна быть в (0, 1]")
+
+    rng = np.random.default_rng(seed)
+    frames: List[pd.DataFrame] = []
+    key_parts: List[np.ndarray] = []
+    label_parts: List[pd.Series] = []
+    buffered = 0
+    strata_rows: Dict[str, int] = {}
+    n_rows = 0
+
+    def _collapse() -> Tuple[pd.DataFrame, np.ndarray, pd.Series]:
+        frame, keys, labels = pd.concat(frames), np.concatenate(key_parts), pd.concat(label_parts)
+        frames[:], key_parts[:], label_parts[:] = [frame], [keys], [labels]
+        return frame, keys, labels
+
+    for chunk in chunks:
+        if stratify is not None and stratify not in chunk.columns:
+            raise ValueError(f"Колонка для стратификации '{stratify}' не найдена")
+        chunk = chunk.set_axis(pd.RangeIndex(n_rows, n_rows + len(chunk)))
+        n_rows += len(chunk)
+        keys = rng.random(len(chunk))
+        labels = _labels(chunk, stratify)
+        for label, count in labels.value_counts(sort=False).items():
+            strata_rows[label] = strata_rows.get(label, 0) + int(count)
+
+        if frac is not None:
+            mask = keys < frac
+            chunk, keys, labels = chunk[mask], keys[mask], labels[mask]
+        frames.append(chunk)
+        key_parts.append(keys)
+        label_parts.append(labels)
+        buffered += len(chunk)
+        if n is None:
+            continue
+        reservoir = n * len(strata_rows)
+        if reservoir > max_reservoir_rows:
+            raise ValueError(
+                f"Резервуар выборки {n} × {len(strata_rows)} страт больше {max_reservoir_rows} строк: "
+                "уменьшите n или стратифицируйте по колонке с меньшим числом значений"
+            )
+        # прореживание при двукратном переполнении – склейки линейны по числу строк
+        if buffered > max(2 * reservoir, n):
+            kept, kept_keys, kept_labels = _collapse()
+            mask = _smallest_per_stratum(kept_keys, kept_labels, {h: n for h in strata_rows})
+            frames[:], key_parts[:], label_parts[:] = [kept[mask]], [kept_keys[mask]], [kept_labels[mask]]
+            buffered = int(mask.sum())
+
+    if not frames:
+        raise ValueError("Файл пуст")
+    kept, kept_keys, kept_labels = _collapse()
+    if n is not None:
+        limits = {h: n for h in strata_rows}
+        if stratify is not None:
+            # пропорциональное размещение: n_h ~ n * N_h / N, но не меньше 1
+            limits = {h: max(1, int(round(n * rows / n_rows))) for h, rows in strata_rows.items()}
+        mask = _smallest_per_stratum(kept_keys, kept_labels, limits)
+        kept, kept_labels = kept[mask], kept_labels[mask]
+
+    kept = kept.sort_index()
+    kept_labels = kept_labels.loc[kept.index]
+    sampled = kept_labels.value_counts(sort=False)
+    return Sample(
+        df=kept.reset_index(drop=True),
+        n_rows=n_rows,
+        stratify=stratify,
+        strata=kept_labels.reset_index(drop=True),
+        strata_rows=strata_rows,
+        strata_sampled={h: int(sampled.get(h, 0)) for h in strata_rows},
+    )
+
+
+def sample_file(
+    path: PathLike,
+    n: Optional[int] = None,
+    frac: Optional[float] = None,
+    stratify: Optional[str] = None,
+    chunksize: int = 100_000,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+    seed: Optional[int] = 0,
+) -> Sample:
+    """sample_chunks по файлу любого поддерживаемого формата."""
+    if columns and stratify is not None and stratify not in columns:
+        columns = [*columns, stratify]
+    chunks = iter_frame_chunks(path, chunksize, sep=sep, encoding=encoding, columns=columns)
+    return sample_chunks(chunks, n=n, frac=frac, stratify=stratify, seed=seed)
+
+
+def _total_variance(u: np.ndarray, sample: Sample) -> float:
+    """
+    Дисперсия оценки суммы ``sum(w * u)`` при стратифицированной простой
+    случайной выборке без возвращения: sum_h N_h^2 (1 - n_h/N_h) s_h^2 / n_h.
+    """
+    groups = pd.Series(u).groupby(sample.strata.to_numpy())
+    var = groups.var(ddof=1)
+    total = 0.0
+    for h, s2 in var.items():
+        n_h, rows = sample.strata_sampled[h], sample.strata_rows[h]
+        if n_h > 1 and np.isfinite(s2):
+            total += rows * rows * (1 - n_h / rows) * s2 / n_h
+    return total
+
+
+def _interval(value: float, se: float, z: float, low: float = -np.inf, high: float = np.inf) -> Tuple[float, float]:
+    return (float(max(low, value - z * se)), float(min(high, value + z * se)))
+
+
+def summarize_sample(
+    sample: Sample,
+    confidence: float = 0.95,
+    example_values_per_column: int = 3,
+) -> DatasetSummary:
+    """
+    Сводка по выборке с оценками для всего файла.
+
+    mean, std и missing_share – взвешенные оценки (веса N_h / n_h) с
+    доверительными интервалами уровня ``confidence`` (нормальное
+    приближение; для mean и std – через линеаризацию отношения, с поправкой
+    на конечную совокупность). non_null, missing и zero_count пересчитаны
+    на весь файл. min, max, перцентили, unique и примеры – по самой выборке.
+    """
+    df = sample.df
+    summary = summarize_dataset(df, example_values_per_column=example_values_per_column)
+    summary.n_rows = sample.n_rows
+    summary.sample_rows = len(df)
+    summary.confidence = confidence
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    w = sample.weights
+    total_w = float(w.sum())
+
+    for col in summary.columns:
+        s = df[col.name]
+        missing = s.isna().to_numpy()
+        share = float(np.dot(w, missing) / total_w) if total_w else 0.0
+        se = np.sqrt(_total_variance(missing - share, sample)) / total_w if total_w else 0.0
+        col.missing_share, col.missing_share_ci = share, _interval(share, se, z, 0.0, 1.0)
+        col.missing = int(round(share * sample.n_rows))
+        col.non_null = sample.n_rows - col.missing
+
+        present = ~missing
+        if col.mean is None or present.sum() == 0:
+            continue
+        y = np.where(present, s.to_numpy(dtype=np.float64, na_value=np.nan), 0.0)
+        weight = w * present
+        x_hat = float(weight.sum())
+        mean = float(np.dot(weight, y) / x_hat)
+        se = np.sqrt(_total_variance(present * (y - mean), sample)) / x_hat
+        col.mean, col.mean_ci = mean, _interval(mean, se, z)
+
+        n_present = int(present.sum())
+        if col.zero_count is not None:
+            col.zero_count = int(round(np.dot(weight, y == 0)))
+        if n_present < 2:
+            continue
+        sq = present * (y - mean) ** 2
+        var = float(np.dot(w, sq) / x_hat) * n_present / (n_present - 1)
+        std = float(np.sqrt(var))
+        se_var = np.sqrt(_total_variance(present * (sq - var), sample)) / x_hat
+        se_std = se_var / (2 * std) if std > 0 else 0.0
+        col.std, col.std_ci = std, _interval(std, se_std, z, 0.0)
+
+    return summary
+
+
+def describe_sample(summary: DatasetSummary, stratify: Optional[str] = None) -> List[str]:
+    """Строки Markdown-предупреждения о том, что статистики – оценки."""
+    if not summary.is_sample:
+        return []
+    level = f"{summary.confidence:.0%}" if summary.confidence is not None else ""
+    lines = [
+        f"**Внимание: статистики оценены по случайной выборке из {summary.sample_rows} "
+        f"из {summary.n_rows} строк"
+        + (f" (стратификация по `{stratify}`)" if stratify else "")
+        + ".**",
+        "",
+        f"- mean, std и доля пропусков – оценки для всего файла с {level}-доверительными интервалами "
+        "(колонки `mean_ci`, `std_ci`, `missing_share_ci` в `summary.csv`);",
+        "- min, max, перцентили, unique, top-k категорий, корреляция и графики посчитаны по выборке.",
+    ]
+    return lines
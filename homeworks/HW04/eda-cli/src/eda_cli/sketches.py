@@ -0,0 +1,452 @@
+"""
+Вероятностные сливаемые (mergeable) скетчи для профилирования больших данных.
+
+Все скетчи обновляются векторно (массивами значений) и сливаются через
+``merge`` – поэтому работают одинаково для чанков файла и шардов колонок.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+ArrayLike = Union[np.ndarray, pd.Series, pd.Index]
+
+
+def hash_values(values: ArrayLike) -> np.ndarray:
+    """
+    64-битные хэши значений (пропуски должны быть отброшены заранее).
+
+    Числа хэшируются как float64 (1 и 1.0 дают один хэш, как и в nunique),
+    остальные значения – по строковому представлению.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "biuf":
+        # + 0.0 приводит -0.0 к 0.0
+        return pd.util.hash_array(arr.astype(np.float64) + 0.0)
+    return pd.util.hash_array(arr.astype(object), categorize=False)
+
+
+def _leading_zeros(w: np.ndarray) -> np.ndarray:
+    """Число ведущих нулевых бит в ненулевых uint64."""
+    w = w.copy()
+    n = np.zeros(w.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        empty = (w >> np.uint64(64 - shift)) == 0
+        n[empty] += shift
+        w[empty] <<= np.uint64(shift)
+    return n
+
+
+class HyperLogLog:
+    """
+    Скетч HyperLogLog для оценки числа уникальных значений.
+
+    Память – ``2**precision`` байт независимо от числа строк; относительная
+    ошибка оценки около ``1.04 / sqrt(2**precision)``. Точность можно задать
+    напрямую или через целевую ошибку ``error``.
+    """
+
+    def __init__(self, error: float = 0.01, precision: Optional[int] = None) -> None:
+        if precision is None:
+            precision = math.ceil(math.log2((1.04 / error) ** 2))
+        self.precision = int(min(18, max(4, precision)))
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update(self, values: ArrayLike) -> None:
+        """Добавить значения (без пропусков)."""
+        self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        p = np.uint64(self.precision)
+        idx = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        # Сторожевой бит ограничивает ранг значением 64 - p + 1
+        w = (hashes << p) | (np.uint64(1) << (p - np.uint64(1)))
+        rank = _leading_zeros(w) + 1
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Нельзя слить HyperLogLog с разной точностью")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Linear counting для малых кардинальностей
+            return m * math.log(m / zeros)
+        return float(raw)
+
+    def __len__(self) -> int:
+        return int(round(self.estimate()))
+
+
+class SpaceSaving:
+    """
+    Скетч Space-Saving для поиска самых частых значений (heavy hitters).
+
+    Хранит не больше ``capacity`` счётчиков. Счётчик значения никогда не
+    занижен и завышен не более чем на ``total / capacity`` (``error_bound``);
+    пока различных значений не больше ``capacity``, счётчики точные.
+    Слияние двух скетчей (чанки, шарды) сохраняет ту же гарантию.
+    """
+
+    def __init__(self, capacity: int = 10_000) -> None:
+        self.capacity = int(capacity)
+        self.total = 0
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+
+    @property
+    def error_bound(self) -> float:
+        """Максимальное завышение любого счётчика."""
+        return self.total / self.capacity
+
+    def _floor(self) -> int:
+        """Минимальный счётчик заполненного скетча (0, пока есть место)."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return int(self.counts.min())
+
+    def update(self, values: ArrayLike) -> None:
+        """Добавить значения (без пропусков)."""
+        vc = pd.Series(values).value_counts(sort=False)
+        if vc.empty:
+            return
+        other = SpaceSaving(self.capacity)
+        other.total = int(vc.sum())
+        other.counts = vc.astype(np.int64)
+        other.errors = pd.Series(0, index=vc.index, dtype=np.int64)
+        self.merge(other)
+
+    def merge(self, other: "SpaceSaving") -> None:
+        """
+        Слить со скетчем другой части данных: значению, которого нет в одном
+        из скетчей, приписывается минимальный счётчик этого скетча.
+        """
+        if other.counts.empty:
+            self.total += other.total
+            return
+        floor_self, floor_other = self._floor(), other._floor()
+        new_keys = other.counts.index[~other.counts.index.isin(self.counts.index)]
+        keys = self.counts.index.append(new_keys)
+
+        counts = self.counts.reindex(keys, fill_value=floor_self) + other.counts.reindex(
+            keys, fill_value=floor_other
+        )
+        errors = self.errors.reindex(keys, fill_value=floor_self) + other.errors.reindex(
+            keys, fill_value=floor_other
+        )
+        if len(counts) > self.capacity:
+            counts = counts.nlargest(self.capacity, keep="first")
+        self.counts = counts.astype(np.int64)
+        self.errors = errors.reindex(counts.index).astype(np.int64)
+        self.total += other.total
+
+    def top(self, k: int) -> pd.Series:
+        """Top-k значений: Series значение -> счётчик, по убыванию."""
+        return self.counts.sort_values(ascending=False, kind="stable").head(k)
+
+
+class KLLSketch:
+    """
+    Скетч квантилей KLL (Karnin–Lang–Liberty).
+
+    Значения хранятся на уровнях-компакторах: уровень h содержит элементы
+    с весом ``2**h``; переполненный уровень сортируется, и каждый второй
+    элемент (со случайным сдвигом) поднимается на уровень выше. Память –
+    O(k) чисел независимо от числа строк, ошибка ранга около 1.7 / k.
+    Пока компакций не было, квантили точные (линейная интерполяция, как
+    в ``np.quantile``).
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = 0) -> None:
+        self.k = int(k)
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # при нечётном размере один элемент остаётся на уровне
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[: len(items) - len(keep)]
+                promoted = pairs[int(self._rng.integers(2)) :: 2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                # после появления нового уровня ёмкости нижних уменьшились
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values: ArrayLike) -> None:
+        """Добавить числовые значения (без пропусков)."""
+        arr = np.asarray(values, dtype=np.float64)
+        if len(arr) == 0:
+            return
+        self.n += len(arr)
+        self.levels[0] = np.concatenate([self.levels[0], arr])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Оценки квантилей уровней ``qs`` (NaN для пустого скетча)."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], qs)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(level), 2.0**h) for h, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        items, weights = items[order], weights[order]
+        # ранг элемента – середина его веса, между рангами интерполируем
+        ranks = (np.cumsum(weights) - weights / 2.0) / weights.sum()
+        return np.interp(qs, ranks, items)
+
+
+class AdaptiveHistogram:
+    """
+    Сливаемая гистограмма с адаптивными бинами для потокового режима.
+
+    Бины – отрезки [i·w, (i+1)·w) с шириной w = 2**exponent. Если значения
+    не помещаются в ``max_bins`` бинов, ширина удваивается (соседние бины
+    складываются попарно). Границы всех гистограмм лежат на одной сетке
+    степеней двойки, поэтому слияние точное: гистограмма с узкими бинами
+    огрубляется до ширины другой, и счётчики складываются. Память –
+    O(max_bins), бинов в итоге от max_bins / 2 до max_bins.
+    """
+
+    def __init__(self, max_bins: int = 40) -> None:
+        self.max_bins = int(max_bins)
+        self.exponent: Optional[int] = None
+        self.start = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @staticmethod
+    def _coarsen(start: int, counts: np.ndarray, shift: int) -> Tuple[int, np.ndarray]:
+        """Те же счётчики на сетке с шириной в ``2**shift`` раз больше."""
+        if shift <= 0 or len(counts) == 0:
+            return start, counts
+        # сдвиг int64 вправо – деление с округлением вниз и для отрицательных
+        index = (start + np.arange(len(counts), dtype=np.int64)) >> shift
+        return int(index[0]), np.bincount(index - index[0], weights=counts).astype(np.int64)
+
+    def _fit(self, exponent: int, lo: float, hi: float) -> int:
+        """Наименьшая ширина (не уже текущей), при которой всё влезает в max_bins."""
+        if self.exponent is not None:
+            exponent = max(exponent, self.exponent)
+        while True:
+            width = math.ldexp(1.0, exponent)
+            first, last = math.floor(lo / width), math.floor(hi / width)
+            if len(self.counts):
+                shift = exponent - self.exponent
+                first = min(first, self.start >> shift)
+                last = max(last, (self.start + len(self.counts) - 1) >> shift)
+            if last - first + 1 <= self.max_bins:
+                return exponent
+            exponent += 1
+
+    def _add(self, exponent: int, start: int, counts: np.ndarray) -> None:
+        """Прибавить счётчики с сетки ``exponent`` (не уже итоговой)."""
+        start, counts = self._coarsen(start, counts, self.exponent - exponent)
+        first = min(self.start, start) if len(self.counts) else start
+        last = max(self.start + len(self.counts), start + len(counts))
+        merged = np.zeros(last - first, dtype=np.int64)
+        merged[self.start - first : self.start - first + len(self.counts)] += self.counts
+        merged[start - first : start - first + len(counts)] += counts
+        self.start, self.counts = first, merged
+
+    def _set_exponent(self, exponent: int) -> None:
+        if self.exponent is not None:
+            self.start, self.counts = self._coarsen(self.start, self.counts, exponent - self.exponent)
+        self.exponent = exponent
+
+    def update(self, values: ArrayLike) -> None:
+        """Добавить числовые значения (пропуски и бесконечности отбрасываются)."""
+        arr = np.asarray(values, dtype=np.float64)
+        arr = arr[np.isfinite(arr)]
+        if len(arr) == 0:
+            return
+        lo, hi = float(arr.min()), float(arr.max())
+        span = hi - lo if hi > lo else max(abs(lo), 1.0)
+        self._set_exponent(self._fit(math.ceil(math.log2(span / self.max_bins)), lo, hi))
+        index = np.floor(arr / math.ldexp(1.0, self.exponent)).astype(np.int64)
+        first = int(index.min())
+        self._add(self.exponent, first, np.bincount(index - first))
+
+    def merge(self, other: "AdaptiveHistogram") -> None:
+        if other.exponent is None or len(other.counts) == 0:
+            return
+        width = math.ldexp(1.0, other.exponent)
+        lo, hi = other.start * width, (other.start + len(other.counts) - 1) * width
+        self._set_exponent(self._fit(other.exponent, lo, hi))
+        self._add(other.exponent, other.start, other.counts)
+
+    def histogram(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Счётчики и границы бинов (без пустых бинов по краям)."""
+        if self.exponent is None or not self.counts.any():
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        filled = np.flatnonzero(self.counts)
+        counts = self.counts[filled[0] : filled[-1] + 1]
+        first = self.start + int(filled[0])
+        edges = np.arange(first, first + len(counts) + 1, dtype=np.float64) * math.ldexp(1.0, self.exponent)
+        return counts, edges
+
+
+# Число единичных бит в каждом байте
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+class MissingDensity:
+    """
+    Доля пропусков по корзинам подряд идущих строк × колонкам за один проход.
+
+    Корзина – ``rows_per_bucket`` строк (степень двойки); если корзин
+    становится больше ``max_buckets``, соседние складываются попарно, а
+    размер корзины удваивается. Маска пропусков чанка упаковывается по
+    8 строк в байт (np.packbits), и при корзинах от 8 строк пропуски
+    считаются по таблице popcount байтов. Память – O(max_buckets × колонок)
+    при любом числе строк.
+
+    Слияние с аккумулятором следующего куска файла точное, если куски
+    стыкуются по границе корзины; иначе счётчики корзины куска делятся
+    между двумя пересекаемыми корзинами пропорционально числу строк.
+    """
+
+    def __init__(self, max_buckets: int = 256) -> None:
+        self.max_buckets = int(max_buckets)
+        self.names: List[str] = []
+        self.rows_per_bucket = 1
+        self.n_rows = 0
+        self.missing = np.zeros((0, 0))
+
+    def _positions(self, names: Sequence[str]) -> np.ndarray:
+        """Индексы колонок ``names``; новые колонки добавляются с нулями."""
+        index = {name: i for i, name in enumerate(self.names)}
+        new = [name for name in names if name not in index]
+        if new:
+            for name in new:
+                index[name] = len(self.names)
+                self.names.append(name)
+            grown = np.zeros((self.missing.shape[0], len(self.names)))
+            grown[:, : self.missing.shape[1]] = self.missing
+            self.missing = grown
+        return np.array([index[name] for name in names], dtype=np.intp)
+
+    def _double(self) -> None:
+        """Удвоить размер корзины: соседние корзины складываются попарно."""
+        if len(self.missing) % 2:
+            self.missing = np.vstack([self.missing, np.zeros((1, self.missing.shape[1]))])
+        self.missing = self.missing[0::2] + self.missing[1::2]
+        self.rows_per_bucket *= 2
+
+    def _fit(self, n_rows: int) -> None:
+        """Увеличить корзины так, чтобы ``n_rows`` строк уместились в max_buckets."""
+        while -(-n_rows // self.rows_per_bucket) > self.max_buckets:
+            self._double()
+
+    def _add(self, buckets: np.ndarray, counts: np.ndarray, pos: np.ndarray) -> None:
+        """Прибавить ``counts`` (len(buckets), len(pos)) к корзинам ``buckets``."""
+        need = int(buckets.max()) + 1 if len(buckets) else 0
+        if need > len(self.missing):
+            grown = np.zeros((need, self.missing.shape[1]))
+            grown[: len(self.missing)] = self.missing
+            self.missing = grown
+        np.add.at(self.missing, (buckets[:, None], pos[None, :]), counts)
+
+    def update(self, mask: np.ndarray, names: Sequence[str]) -> None:
+        """
+        Учесть следующий чанк: ``mask`` – bool (n_rows, n_cols), True на месте
+        пропуска, ``names`` – имена его колонок.
+        """
+        n = mask.shape[0]
+        pos = self._positions(names)
+        if n == 0:
+            return
+        self._fit(self.n_rows + n)
+        size, start = self.rows_per_bucket, self.n_rows
+        if size >= 8:
+            # выравниваем чанк по байтам глобальной нумерации строк: байт целиком
+            # лежит в одной корзине, и пропуски в нём – popcount
+            lead = start % 8
+            if lead:
+                mask = np.vstack([np.zeros((lead, mask.shape[1]), dtype=bool), mask])
+            units = _POPCOUNT[np.packbits(mask, axis=0)]
+            unit_rows = (start - lead) + 8 * np.arange(len(units))
+        else:
+            units = mask.astype(np.int64)
+            unit_rows = start + np.arange(n)
+        buckets = unit_rows // size
+        bounds = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        self._add(buckets[bounds], np.add.reduceat(units, bounds, axis=0), pos)
+        self.n_rows += n
+
+    def merge(self, other: "MissingDensity") -> None:
+        """Слить аккумулятор следующего куска файла (его строки идут после наших)."""
+        pos = self._positions(other.names)
+        if other.n_rows == 0:
+            return
+        offset = self.n_rows
+        self._fit(offset + other.n_rows)
+        while self.rows_per_bucket < other.rows_per_bucket:
+            self._double()
+        size, step = self.rows_per_bucket, other.rows_per_bucket
+        counts = other.missing[: -(-other.n_rows // step)]
+        if step < size:
+            # огрубить корзины другого аккумулятора до нашего размера (его строки – с нуля)
+            groups = np.arange(len(counts)) * step // size
+            bounds = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+            counts = np.add.reduceat(counts, bounds, axis=0)
+        # строки его корзин в нашей нумерации; корзина, попавшая на стык двух
+        # наших, делится между ними пропорционально числу строк
+        first = offset + np.arange(len(counts)) * size
+        last = np.minimum(first + size, offset + other.n_rows)
+        lo, hi = first // size, (last - 1) // size
+        share = (np.minimum(last, (lo + 1) * size) - first) / (last - first)
+        self._add(lo, counts * share[:, None], pos)
+        self._add(hi, counts * (1 - share)[:, None], pos)
+        self.n_rows += other.n_rows
+
+    def density(self) -> pd.DataFrame:
+        """Доля пропусков: строки – корзины (индекс – номер первой строки), колонки – колонки."""
+        size = self.rows_per_bucket
+        n_buckets = -(-self.n_rows // size)
+        starts = np.arange(n_buckets) * size
+        rows = np.minimum(size, self.n_rows - starts)
+        missing = np.zeros((n_buckets, len(self.names)))
+        filled = min(n_buckets, len(self.missing))
+        missing[:filled] = self.missing[:filled]
+        return pd.DataFrame(missing / rows[:, None], index=starts, columns=list(self.names))
@@ -0,0 +1,658 @@
+"""
+Потоковое (out-of-core) профилирование: CSV читается чанками, каждый чанк
+обновляет сливаемые (mergeable) аккумуляторы по колонкам. В конце из них
+собираются те же DatasetSummary / missing_table / top_categories и матрица
+корреляции, что и при чтении файла целиком.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from .core import (
+    APPROX_UNIQUE_ROWS,
+    HIST_BINS,
+    MISSING_BUCKETS,
+    PERCENTILES,
+    TOP_CATEGORIES_CAPACITY,
+    UNIQUE_ERROR,
+    ColumnSummary,
+    DatasetSummary,
+    _histogram_fields,
+    _is_block_numeric,
+    _numeric_block_stats,
+    _percentile_fields,
+    _top_table,
+    missing_table_from_summary,
+)
+from .correlation import CovarianceAccumulator
+from .readers import (
+    _ByteRange,
+    csv_byte_ranges,
+    csv_header,
+    detect_format,
+    is_byte_splittable,
+    iter_table_chunks,
+    last_record_end,
+)
+from .sketches import AdaptiveHistogram, HyperLogLog, KLLSketch, MissingDensity, SpaceSaving
+
+PathLike = Union[str, Path]
+
+# Диапазонов CSV на воркер: несколько, чтобы выровнять нагрузку
+RANGES_PER_WORKER = 4
+
+
+def _resolve_dtype(dtypes: List[str], has_missing: bool) -> str:
+    """
+    Итоговый dtype колонки по dtype-ам чанков – так, как его вывел бы
+    ``pd.read_csv`` по всему файлу сразу.
+    """
+    if not dtypes:
+        return "float64"
+    if len(set(dtypes)) == 1:
+        dtype = dtypes[0]
+    else:
+        try:
+            parsed = [np.dtype(d) for d in dtypes]
+        except TypeError:
+            return "object"
+        kinds = {d.kind for d in parsed}
+        if not kinds <= set("iuf") and kinds != {"b"}:
+            return "object"
+        dtype = str(np.result_type(*parsed))
+    kind = np.dtype(dtype).kind if dtype != "object" else "O"
+    if has_missing and kind in "iu":
+        return "float64"
+    if has_missing and kind == "b":
+        return "object"
+    return dtype
+
+
+def _format_example(value: Any, dtype: str) -> str:
+    """Строковое представление значения так, как его дал бы ``astype(str)``."""
+    if dtype == "object":
+        return str(value)
+    kind = np.dtype(dtype).kind
+    if kind == "f":
+        return str(float(value))
+    if kind in "iu":
+        return str(int(value))
+    if kind == "b":
+        return str(bool(value))
+    return str(value)
+
+
+@dataclass
+class ColumnAccumulator:
+    """
+    Сливаемые частичные агрегаты по одной колонке.
+
+    Числовые моменты хранятся в форме Уэлфорда (count/mean/m2) и сливаются
+    по формуле Чана, min/max/нули/пропуски – простыми суммами и экстремумами.
+    Уникальные значения считаются точно (множество), пока колонка не
+    превысит ``approx_unique_rows`` строк, после чего множество переливается
+    в скетч HyperLogLog фиксированного размера. Частоты строковых значений
+    (для top-k категорий) ведёт скетч Space-Saving на ``top_capacity`` счётчиков,
+    перцентили числовых значений – скетч KLL с параметром ``quantile_k``,
+    гистограмму – AdaptiveHistogram (до 2 * HIST_BINS бинов).
+    """
+
+    name: str
+    example_values_per_column: int = 3
+    approx_unique_rows: Optional[int] = APPROX_UNIQUE_ROWS
+    unique_error: float = UNIQUE_ERROR
+    top_capacity: int = TOP_CATEGORIES_CAPACITY
+    quantile_k: int = 200
+    # dtype-ы чанков, в которых были непустые значения
+    dtypes: List[str] = field(default_factory=list)
+    first_dtype: Optional[str] = None
+    non_null: int = 0
+    missing: int = 0
+    # Числовые агрегаты (по значениям из числовых чанков)
+    numeric_count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: Optional[float] = None
+    max: Optional[float] = None
+    zeros: int = 0
+    quantiles: Optional[KLLSketch] = None
+    histogram: Optional[AdaptiveHistogram] = None
+    distinct: set = field(default_factory=set)
+    hll: Optional[HyperLogLog] = None
+    examples: List[Any] = field(default_factory=list)
+    # Частоты значений для строковых колонок (top-k категорий)
+    top_values: Optional[SpaceSaving] = None
+
+    def _add_moments(self, count: int, mean: float, m2: float) -> None:
+        if count == 0:
+            return
+        if self.numeric_count == 0:
+            self.numeric_count, self.mean, self.m2 = count, mean, m2
+            return
+        total = self.numeric_count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.numeric_count * count / total
+        self.numeric_count = total
+
+    def _add_extremes(self, min_val: Optional[float], max_val: Optional[float]) -> None:
+        if min_val is not None:
+            self.min = min_val if self.min is None else min(self.min, min_val)
+        if max_val is not None:
+            self.max = max_val if self.max is None else max(self.max, max_val)
+
+    def _spill_distinct(self) -> None:
+        """Перейти от точного множества уникальных к HyperLogLog."""
+        if self.hll is None:
+            self.hll = HyperLogLog(error=self.unique_error)
+        if self.distinct:
+            self.hll.update(pd.Series(list(self.distinct)).to_numpy())
+            self.distinct = set()
+
+    def _maybe_spill(self) -> None:
+        if (
+            self.hll is None
+            and self.approx_unique_rows is not None
+            and self.non_null + self.missing >= self.approx_unique_rows
+        ):
+            self._spill_distinct()
+
+    def _add_examples(self, values: Iterable[Any]) -> None:
+        k = self.example_values_per_column
+        for value in values:
+            if len(self.examples) >= k:
+                break
+            if value not in self.examples:
+                self.examples.append(value)
+
+    def update(self, s: pd.Series, numeric_stats: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Обновить агрегаты по очередному чанку колонки.
+
+        ``numeric_stats`` – готовые статистики этой колонки из блочного
+        прохода (core._numeric_block_stats), если колонка в чанке числовая.
+        """
+        if self.first_dtype is None:
+            self.first_dtype = str(s.dtype)
+        values = s.dropna()
+        non_null = len(values)
+        self.non_null += non_null
+        self.missing += len(s) - non_null
+        if non_null == 0:
+            return
+        self.dtypes.append(str(s.dtype))
+
+        self._maybe_spill()
+        if self.hll is not None:
+            self.hll.update(values.to_numpy())
+            if len(self.examples) < self.example_values_per_column:
+                self._add_examples(pd.unique(values.iloc[: 16 * self.example_values_per_column]).tolist())
+        else:
+            uniques = pd.unique(values)
+            self.distinct.update(uniques.tolist())
+            if len(self.examples) < self.example_values_per_column:
+                self._add_examples(uniques.tolist())
+
+        if numeric_stats is not None:
+            self._add_moments(
+                int(numeric_stats["count"]),
+                float(numeric_stats["mean"]),
+                float(numeric_stats["m2"]),
+            )
+            self._add_extremes(float(numeric_stats["min"]), float(numeric_stats["max"]))
+            self.zeros += int(numeric_stats["zeros"])
+            if self.quantiles is None:
+                self.quantiles = KLLSketch(self.quantile_k)
+            numbers = values.to_numpy(dtype=np.float64)
+            self.quantiles.update(numbers)
+            if self.histogram is None:
+                self.histogram = AdaptiveHistogram(2 * HIST_BINS)
+            self.histogram.update(numbers)
+        elif ptypes.is_object_dtype(s):
+            if self.top_values is None:
+                self.top_values = SpaceSaving(self.top_capacity)
+            self.top_values.update(values)
+
+    def merge(self, other: "ColumnAccumulator") -> None:
+        """Слить агрегаты другого шарда/куска файла (идущего после текущего)."""
+        if self.first_dtype is None:
+            self.first_dtype = other.first_dtype
+        self.dtypes.extend(other.dtypes)
+        self.non_null += other.non_null
+        self.missing += other.missing
+        self._add_moments(other.numeric_count, other.mean, other.m2)
+        self._add_extremes(other.min, other.max)
+        self.zeros += other.zeros
+        if other.quantiles is not None:
+            if self.quantiles is None:
+                self.quantiles = KLLSketch(self.quantile_k)
+            self.quantiles.merge(other.quantiles)
+        if other.histogram is not None:
+            if self.histogram is None:
+                self.histogram = AdaptiveHistogram(2 * HIST_BINS)
+            self.histogram.merge(other.histogram)
+        if self.hll is not None or other.hll is not None:
+            self._spill_distinct()
+            if other.hll is not None:
+                self.hll.merge(other.hll)
+            if other.distinct:
+                self.hll.update(pd.Series(list(other.distinct)).to_numpy())
+        else:
+            self.distinct.update(other.distinct)
+            self._maybe_spill()
+        self._add_examples(other.examples)
+        if other.top_values is not None:
+            if self.top_values is None:
+                self.top_values = SpaceSaving(self.top_capacity)
+            self.top_values.merge(other.top_values)
+
+    @property
+    def dtype(self) -> str:
+        if not self.dtypes:
+            return self.first_dtype or "float64"
+        return _resolve_dtype(self.dtypes, self.missing > 0)
+
+    def to_summary(self, n_rows: int) -> ColumnSummary:
+        dtype = self.dtype
+        is_numeric = dtype != "object" and bool(ptypes.is_numeric_dtype(np.dtype(dtype)))
+        has_values = is_numeric and self.non_null > 0
+        std: Optional[float] = None
+        percentiles: Dict[str, Optional[float]] = {}
+        histogram: Dict[str, Optional[List[Any]]] = {}
+        if has_values:
+            std = float(np.sqrt(self.m2 / (self.numeric_count - 1))) if self.numeric_count > 1 else float("nan")
+            if self.quantiles is not None and np.dtype(dtype).kind != "b":
+                percentiles = _percentile_fields(self.quantiles.quantiles(list(PERCENTILES.values())))
+            if self.histogram is not None and np.dtype(dtype).kind != "b":
+                histogram = _histogram_fields(*self.histogram.histogram())
+        return ColumnSummary(
+            name=self.name,
+            dtype=dtype,
+            non_null=self.non_null,
+            missing=self.missing,
+            missing_share=float(self.missing / n_rows) if n_rows > 0 else 0.0,
+            unique=self.unique,
+            example_values=[_format_example(v, dtype) for v in self.examples],
+            is_numeric=is_numeric,
+            min=self.min if has_values else None,
+            max=self.max if has_values else None,
+            mean=self.mean if has_values else None,
+            std=std,
+            zero_count=self.zeros if has_values else None,
+            unique_is_estimate=self.hll is not None,
+            **percentiles,
+            **histogram,
+        )
+
+    @property
+    def unique(self) -> int:
+        if self.hll is None:
+            return len(self.distinct)
+        return int(min(self.non_null, max(1 if self.non_null else 0, len(self.hll))))
+
+
+@dataclass
+class DatasetAccumulator:
+    """
+    Сливаемые агрегаты по всему датасету: число строк + ColumnAccumulator
+    на каждую колонку (в порядке колонок файла). Для колонок из
+    ``exact_unique_columns`` (например, идентификаторов) уникальные значения
+    всегда считаются точно – память на них растёт с числом различных значений.
+    """
+
+    example_values_per_column: int = 3
+    approx_unique_rows: Optional[int] = APPROX_UNIQUE_ROWS
+    unique_error: float = UNIQUE_ERROR
+    top_capacity: int = TOP_CATEGORIES_CAPACITY
+    quantile_k: int = 200
+    exact_unique_columns: Tuple[str, ...] = ()
+    n_rows: int = 0
+    columns: Dict[str, ColumnAccumulator] = field(default_factory=dict)
+    # Попарные со-моменты числовых колонок для корреляции Пирсона
+    covariance: CovarianceAccumulator = field(default_factory=CovarianceAccumulator)
+    # Доли пропусков по корзинам строк (не больше missing_buckets корзин)
+    missing_buckets: int = MISSING_BUCKETS
+    missing_rows: Optional[MissingDensity] = None
+
+    def __post_init__(self) -> None:
+        if self.missing_rows is None:
+            self.missing_rows = MissingDensity(self.missing_buckets)
+
+    def empty_like(self) -> "DatasetAccumulator":
+        """Пустой аккумулятор с теми же настройками (шаблон для воркеров)."""
+        return replace(self, n_rows=0, columns={}, covariance=CovarianceAccumulator(), missing_rows=None)
+
+    def _column(self, name: str) -> ColumnAccumulator:
+        acc = self.columns.get(name)
+        if acc is None:
+            acc = ColumnAccumulator(
+                name=name,
+                example_values_per_column=self.example_values_per_column,
+                approx_unique_rows=None if name in self.exact_unique_columns else self.approx_unique_rows,
+                unique_error=self.unique_error,
+                top_capacity=self.top_capacity,
+                quantile_k=self.quantile_k,
+            )
+            self.columns[name] = acc
+        return acc
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Учесть очередной чанк данных."""
+        self.n_rows += len(chunk)
+
+        numeric_positions = [
+            pos for pos in range(chunk.shape[1]) if _is_block_numeric(chunk.iloc[:, pos])
+        ]
+        numeric_stats: Dict[int, Dict[str, Any]] = {}
+        if numeric_positions:
+            block = np.empty((len(numeric_positions), len(chunk)), dtype=np.float64)
+            for j, pos in enumerate(numeric_positions):
+                block[j] = chunk.iloc[:, pos].to_numpy(dtype=np.float64, na_value=np.nan)
+            # unique, перцентили и гистограммы копят скетчи – сортировка чанка не нужна
+            stats = _numeric_block_stats(block, moments_only=True)
+            for j, pos in enumerate(numeric_positions):
+                numeric_stats[pos] = {key: values[j] for key, values in stats.items()}
+
+        for pos, name in enumerate(chunk.columns):
+            self._column(name).update(chunk.iloc[:, pos], numeric_stats.get(pos))
+        self.covariance.update_frame(chunk)
+        self.missing_rows.update(chunk.isna().to_numpy(), [str(c) for c in chunk.columns])
+
+    def merge(self, other: "DatasetAccumulator") -> None:
+        """Слить агрегаты следующей части данных."""
+        self.n_rows += other.n_rows
+        for name, acc in other.columns.items():
+            self._column(name).merge(acc)
+        self.covariance.merge(other.covariance)
+        self.missing_rows.merge(other.missing_rows)
+
+    def to_summary(self) -> DatasetSummary:
+        columns = [acc.to_summary(self.n_rows) for acc in self.columns.values()]
+        return DatasetSummary(n_rows=self.n_rows, n_cols=len(columns), columns=columns)
+
+    def missing_table(self) -> pd.DataFrame:
+        return missing_table_from_summary(self.to_summary())
+
+    def missing_density(self) -> pd.DataFrame:
+        """Аналог core.missing_density по всем прочитанным строкам."""
+        return self.missing_rows.density()
+
+    def correlation(self) -> pd.DataFrame:
+        """
+        Аналог core.correlation_matrix: Пирсон по колонкам, которые во всём
+        файле получились числовыми (bool, как и в ``select_dtypes``, не входит).
+        """
+        names = [
+            name
+            for name, acc in self.columns.items()
+            if ptypes.is_numeric_dtype(acc.dtype) and not ptypes.is_bool_dtype(acc.dtype)
+        ]
+        return self.covariance.correlation(names)
+
+    def top_categories(
+        self,
+        max_columns: int = 5,
+        top_k: int = 5,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Аналог core.top_categories по скетчам Space-Saving строковых колонок.
+        """
+        result: Dict[str, pd.DataFrame] = {}
+        candidates = [acc for acc in self.columns.values() if acc.dtype == "object"]
+        for acc in candidates[:max_columns]:
+            if acc.top_values is None:
+                continue
+            vc = acc.top_values.top(top_k)
+            if vc.empty:
+                continue
+            result[acc.name] = _top_table(vc)
+        return result
+
+
+def _profile_chunk(chunk: pd.DataFrame, template: DatasetAccumulator) -> DatasetAccumulator:
+    """Воркер: агрегаты одного чанка (``template`` – пустой аккумулятор с настройками)."""
+    template.update(chunk)
+    return template
+
+
+def profile_csv(
+    path: PathLike,
+    chunksize: int,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    example_values_per_column: int = 3,
+    workers: int = 1,
+    approx_unique_rows: Optional[int] = APPROX_UNIQUE_ROWS,
+    unique_error: float = UNIQUE_ERROR,
+    top_capacity: int = TOP_CATEGORIES_CAPACITY,
+    columns: Optional[Sequence[str]] = None,
+    missing_buckets: int = MISSING_BUCKETS,
+    exact_unique_columns: Sequence[str] = (),
+) -> DatasetAccumulator:
+    """
+    Профилирует CSV по чанкам из ``chunksize`` строк. Пиковая память
+    ограничена размером чанка (плюс агрегаты), а не размером файла.
+    Parquet/Feather/Arrow IPC (по расширению) читаются чанками через pyarrow;
+    ``columns`` – профилировать только эти колонки.
+
+    При ``workers > 1`` CSV делится на диапазоны байт по границам записей
+    (readers.csv_byte_ranges), и каждый воркер сам разбирает свой диапазон
+    чанками – разбор, а не только профилирование, идёт параллельно. Для
+    остальных форматов (и кодировок вроде utf-16) чанки читает родитель, а
+    профилирует пул; одновременно в работе не больше ``2 * workers`` чанков.
+    Частичные агрегаты сливаются в порядке следования данных в файле.
+
+    Начиная с ``approx_unique_rows`` строк число уникальных значений
+    оценивается HyperLogLog, а top-k категорий – скетчем Space-Saving, так что
+    память на колонку не растёт с размером файла (кроме колонок из
+    ``exact_unique_columns`` – для них счёт точный). Доли пропусков копятся по
+    корзинам строк (не больше ``missing_buckets``) для матрицы пропусков.
+    """
+    acc = DatasetAccumulator(
+        example_values_per_column=example_values_per_column,
+        approx_unique_rows=approx_unique_rows,
+        unique_error=unique_error,
+        top_capacity=top_capacity,
+        exact_unique_columns=tuple(exact_unique_columns),
+        missing_buckets=missing_buckets,
+    )
+    if detect_format(path) != "csv":
+        _consume_chunks(iter_table_chunks(path, chunksize, columns=columns), acc, workers)
+        return acc
+    usecols = list(columns) if columns else None
+    if workers > 1 and is_byte_splittable(encoding):
+        _, ranges = csv_byte_ranges(path, RANGES_PER_WORKER * workers)
+        if len(ranges) > 1:
+            names = csv_header(path, sep=sep, encoding=encoding)
+            template = acc.empty_like()
+            tasks = [
+                (str(path), start, end, names, sep, encoding, usecols, chunksize, template)
+                for start, end in ranges
+            ]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for part in pool.map(_profile_csv_range, tasks):
+                    acc.merge(part)
+            return acc
+    with pd.read_csv(path, sep=sep, encoding=encoding, chunksize=chunksize, usecols=usecols) as reader:
+        _consume_chunks(reader, acc, workers)
+    return acc
+
+
+def _profile_csv_range(args: Tuple[Any, ...]) -> DatasetAccumulator:
+    """Воркер: разобрать диапазон байт CSV чанками и вернуть его агрегаты."""
+    path, start, end, names, sep, encoding, usecols, chunksize, acc = args
+    with open(path, "rb") as f, pd.read_csv(
+        io.BufferedReader(_ByteRange(f, start, end)),
+        sep=sep,
+        encoding=encoding,
+        header=None,
+        names=names,
+        usecols=usecols,
+        chunksize=chunksize,
+    ) as reader:
+        for chunk in reader:
+            acc.update(chunk)
+    return acc
+
+
+def _consume_chunks(reader: Iterable[pd.DataFrame], acc: DatasetAccumulator, workers: int) -> None:
+    """Учесть все чанки ``reader`` в ``acc`` (при ``workers > 1`` – в пуле процессов)."""
+    if workers <= 1:
+        for chunk in reader:
+            acc.update(chunk)
+        return
+
+    # пустой аккумулятор с теми же настройками – его pickle дешёвый
+    template = acc.empty_like()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for chunk in reader:
+            pending.append(pool.submit(_profile_chunk, chunk, template))
+            if len(pending) >= 2 * workers:
+                acc.merge(pending.popleft().result())
+        while pending:
+            acc.merge(pending.popleft().result())
+
+
+# ---------- Инкрементальное профилирование дописываемых файлов ----------
+
+
+@dataclass
+class IncrementalState:
+    """
+    Состояние после прошлого прогона: сколько байт файла уже учтено
+    (всегда граница записи), полный хэш этого префикса, имена колонок из
+    заголовка и агрегаты по учтённым строкам.
+    """
+
+    offset: int
+    prefix_hash: str
+    names: List[str]
+    accumulator: DatasetAccumulator
+
+
+# Размер блока при хэшировании префикса
+_HASH_BLOCK_BYTES = 1 << 20
+
+
+def _hash_range(digest: Any, f: Any, start: int, end: int) -> Any:
+    """Дописать в ``digest`` байты файла ``[start, end)`` и вернуть его."""
+    f.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        data = f.read(min(_HASH_BLOCK_BYTES, remaining))
+        if not data:
+            break
+        digest.update(data)
+        remaining -= len(data)
+    return digest
+
+
+def profile_csv_incremental(
+    path: PathLike,
+    state: Optional[IncrementalState] = None,
+    chunksize: int = 100_000,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    workers: int = 1,
+    **settings: Any,
+) -> Tuple[DatasetAccumulator, Optional[IncrementalState]]:
+    """
+    Профилирует файл, который только дописывается в конец.
+
+    Если есть ``state`` прошлого прогона и префикс файла до ``state.offset``
+    не изменился (совпадает полный хэш), разбираются только новые строки, а
+    их агрегаты сливаются с сохранёнными. Иначе файл профилируется заново.
+    Префикс при этом читается целиком, но только хэшируется (не разбирается),
+    а хэш нового префикса – тот же хэш, продолженный дописанными байтами.
+
+    Возвращает агрегаты по всему файлу и новое состояние. В состояние
+    попадают только завершённые записи (перевод строки внутри кавычек
+    запись не завершает, см. readers.last_record_end): недописанная
+    последняя строка без перевода строки учитывается в результате, но будет
+    разобрана заново в следующем прогоне, а запись, оборванная внутри
+    кавычек, в результат не попадает вовсе. ``settings`` – настройки
+    DatasetAccumulator.
+    """
+    size = os.path.getsize(path)
+
+    with open(path, "rb") as f:
+        # выборочный cache.content_hash пропустил бы правку в середине префикса
+        digest = hashlib.blake2b(digest_size=16)
+        resume = False
+        if state is not None and state.offset <= size:
+            resume = _hash_range(digest, f, 0, state.offset).hexdigest() == state.prefix_hash
+        if not resume:
+            digest = hashlib.blake2b(digest_size=16)
+        start = state.offset if resume and state is not None else 0
+        end = last_record_end(path, size, start=start)
+        if end == 0:
+            # нет ни одной завершённой строки (даже заголовка) – сохранять нечего
+            acc = DatasetAccumulator(**settings)
+            if size:
+                f.seek(0)
+                acc.update(pd.read_csv(f, sep=sep, encoding=encoding))
+            return acc, None
+
+        if resume:
+            assert state is not None
+            acc = copy.deepcopy(state.accumulator)
+            names = list(state.names)
+            if end > state.offset:
+                with pd.read_csv(
+                    io.BufferedReader(_ByteRange(f, state.offset, end)),
+                    sep=sep,
+                    encoding=encoding,
+                    header=None,
+                    names=names,
+                    chunksize=chunksize,
+                ) as reader:
+                    _consume_chunks(reader, acc, workers)
+        else:
+            acc = DatasetAccumulator(**settings)
+            names = pd.read_csv(
+                io.BufferedReader(_ByteRange(f, 0, end)), sep=sep, encoding=encoding, nrows=0
+            ).columns.tolist()
+            with pd.read_csv(
+                io.BufferedReader(_ByteRange(f, 0, end)),
+                sep=sep,
+                encoding=encoding,
+                chunksize=chunksize,
+            ) as reader:
+                _consume_chunks(reader, acc, workers)
+
+        new_state = IncrementalState(
+            offset=end,
+            prefix_hash=_hash_range(digest, f, start, end).hexdigest(),
+            names=names,
+            accumulator=acc,
+        )
+
+        f.seek(end)
+        tail_bytes = f.read(size - end)
+        # хвост внутри кавычек – запись ещё дописывается, её разберёт следующий прогон
+        if tail_bytes and tail_bytes.count(b'"') % 2 == 0:
+            tail = pd.read_csv(
+                io.BytesIO(tail_bytes),
+                sep=sep,
+                encoding=encoding,
+                header=None,
+                names=names,
+            )
+            acc = copy.deepcopy(acc)
+            acc.update(tail)
+
+    return acc, new_state
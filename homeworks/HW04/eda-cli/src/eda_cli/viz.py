@@ -1,14 +1,54 @@
+"""
+Графики отчёта.
+
+Каждый график – задание PlotJob: функция отрисовки и уже подготовленные
+компактные данные (счётчики гистограммы, доли пропусков по корзинам строк,
+матрица корреляции), без исходного DataFrame. Гистограммы можно строить и
+вовсе без данных – по счётчикам из профиля (summary_histogram_jobs). Отрисовка идёт через
+объектный API (``matplotlib.figure.Figure`` и бэкенд Agg) без глобального
+состояния pyplot, поэтому задания можно рендерить параллельно в пуле
+процессов (render_plots).
+
+matplotlib импортируется лениво – при первой отрисовке. Матрицу пропусков и
+тепловую карту можно рисовать и без него (``renderer="fast"``, см. fastplot).
+"""
+
 from __future__ import annotations
 
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Union
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+from . import fastplot
+from .core import MISSING_BUCKETS, DatasetSummary, missing_density
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
 PathLike = Union[str, Path]
 
+# Рендеры матрицы пропусков и тепловой карты
+RENDERERS = ("matplotlib", "fast")
+
+
+@dataclass
+class PlotJob:
+    """Один PNG: ``render(out_path, **data)`` рисует его в отдельном Figure."""
+
+    render: Callable[..., None]
+    out_path: Path
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def run(self) -> Path:
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        self.render(self.out_path, **self.data)
+        return self.out_path
+
 
 def _ensure_dir(path: PathLike) -> Path:
     p = Path(path)
@@ -16,97 +56,270 @@ def _ensure_dir(path: PathLike) -> Path:
     return p
 
 
-def plot_histograms_per_column(
+def _new_figure(figsize: Optional[tuple] = None) -> Figure:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _save(fig: Figure, out_path: Path) -> None:
+    fig.tight_layout()
+    fig.savefig(out_path)
+
+
+def _message_figure(text: str) -> Figure:
+    fig = _new_figure()
+    ax = fig.subplots()
+    ax.text(0.5, 0.5, text, ha="center", va="center")
+    ax.axis("off")
+    return fig
+
+
+# ---------- Отрисовка (выполняется в воркерах) ----------
+
+
+def _render_histogram(out_path: Path, name: str, counts: np.ndarray, edges: np.ndarray) -> None:
+    fig = _new_figure()
+    ax = fig.subplots()
+    # столбцы по готовым счётчикам – тот же вид, что ax.hist(values, bins)
+    ax.hist(edges[:-1], bins=edges, weights=counts)
+    ax.set_title(f"Histogram of {name}")
+    ax.set_xlabel(name)
+    ax.set_ylabel("Count")
+    _save(fig, out_path)
+
+
+def _render_missing_matrix(out_path: Path, values: Optional[np.ndarray], row_starts: List[int], columns: List[str]) -> None:
+    if values is None:
+        fig = _message_figure("Empty dataset")
+    else:
+        # + место под шкалу доли пропусков
+        fig = _new_figure(figsize=(min(12, max(3, len(columns) * 0.4 + 1.5)), 4))
+        ax = fig.subplots()
+        # строка изображения – корзина строк, цвет – доля пропусков в ней
+        im = ax.imshow(values, aspect="auto", interpolation="none", vmin=0.0, vmax=1.0)
+        ax.set_xlabel("Columns")
+        ax.set_ylabel("Rows")
+        ax.set_title("Missing values matrix")
+        ax.set_xticks(range(len(columns)))
+        ax.set_xticklabels(columns, rotation=90, fontsize=8)
+        ticks = np.unique(np.linspace(0, len(row_starts) - 1, min(5, len(row_starts))).astype(int))
+        ax.set_yticks(ticks)
+        ax.set_yticklabels([str(row_starts[t]) for t in ticks], fontsize=8)
+        fig.colorbar(im, ax=ax, label="Missing share")
+    _save(fig, out_path)
+
+
+def _render_heatmap(
+    out_path: Path,
+    values: Optional[np.ndarray],
+    columns: List[str],
+    index: List[str],
+    label: str = "Pearson r",
+) -> None:
+    if values is None:
+        fig = _message_figure("Not enough numeric columns for correlation")
+    else:
+        fig = _new_figure(figsize=(min(10, len(columns)), min(8, len(index))))
+        ax = fig.subplots()
+        im = ax.imshow(values, vmin=-1, vmax=1, cmap="coolwarm", aspect="auto")
+        ax.set_xticks(range(len(columns)))
+        ax.set_xticklabels(columns, rotation=90, fontsize=8)
+        ax.set_yticks(range(len(index)))
+        ax.set_yticklabels(index, fontsize=8)
+        ax.set_title("Correlation heatmap")
+        fig.colorbar(im, ax=ax, label=label)
+    _save(fig, out_path)
+
+
+# ---------- Подготовка заданий (в основном процессе) ----------
+
+
+def histogram_jobs(
     df: pd.DataFrame,
     out_dir: PathLike,
     max_columns: int = 6,
     bins: int = 20,
-) -> List[Path]:
+) -> List[PlotJob]:
     """
-    Для числовых колонок строит по отдельной гистограмме.
-    Возвращает список путей к PNG.
+    Задания гистограмм первых ``max_columns`` числовых колонок: счётчики
+    считаются здесь (np.histogram), воркеру уходят только они.
     """
-    out_dir = _ensure_dir(out_dir)
+    out_dir = Path(out_dir)
     numeric_df = df.select_dtypes(include="number")
 
-    paths: List[Path] = []
+    jobs: List[PlotJob] = []
     for i, name in enumerate(numeric_df.columns[:max_columns]):
         s = numeric_df[name].dropna()
         if s.empty:
             continue
+        counts, edges = np.histogram(s.to_numpy(dtype=np.float64), bins=bins)
+        jobs.append(
+            PlotJob(
+                _render_histogram,
+                out_dir / f"hist_{i+1}_{name}.png",
+                {"name": str(name), "counts": counts, "edges": edges},
+            )
+        )
+    return jobs
 
-        fig, ax = plt.subplots()
-        ax.hist(s.values, bins=bins)
-        ax.set_title(f"Histogram of {name}")
-        ax.set_xlabel(name)
-        ax.set_ylabel("Count")
-        fig.tight_layout()
 
-        out_path = out_dir / f"hist_{i+1}_{name}.png"
-        fig.savefig(out_path)
-        plt.close(fig)
+def summary_histogram_jobs(summary: DatasetSummary, out_dir: PathLike, max_columns: int = 6) -> List[PlotJob]:
+    """
+    Те же задания гистограмм, но по счётчикам, посчитанным при
+    профилировании (ColumnSummary.hist_counts/hist_edges): данные не нужны,
+    поэтому работает в потоковом режиме и для профиля из кэша. Нумерация
+    файлов та же, что у histogram_jobs (по числовым колонкам, кроме bool).
+    """
+    out_dir = Path(out_dir)
+    numeric = [c for c in summary.columns if c.is_numeric and c.dtype not in ("bool", "boolean")]
 
-        paths.append(out_path)
+    jobs: List[PlotJob] = []
+    for i, col in enumerate(numeric[:max_columns]):
+        if not col.hist_counts or col.hist_edges is None:
+            continue
+        jobs.append(
+            PlotJob(
+                _render_histogram,
+                out_dir / f"hist_{i+1}_{col.name}.png",
+                {
+                    "name": str(col.name),
+                    "counts": np.asarray(col.hist_counts, dtype=np.int64),
+                    "edges": np.asarray(col.hist_edges, dtype=np.float64),
+                },
+            )
+        )
+    return jobs
 
-    return paths
+
+def _check_renderer(renderer: str) -> None:
+    if renderer not in RENDERERS:
+        raise ValueError(f"Неизвестный рендер: {renderer!r}; допустимы: {', '.join(RENDERERS)}")
 
 
-def plot_missing_matrix(df: pd.DataFrame, out_path: PathLike) -> Path:
+def missing_density_job(density: pd.DataFrame, out_path: PathLike, renderer: str = "matplotlib") -> PlotJob:
     """
-    Простая визуализация пропусков: где True=пропуск, False=значение.
+    Задание матрицы пропусков по доле пропусков в корзинах строк
+    (core.missing_density, DatasetAccumulator.missing_density или профиль
+    из кэша): O(корзин × колонок) вместо маски rows×cols.
     """
-    out_path = Path(out_path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
+    _check_renderer(renderer)
+    data: Dict[str, Any] = {"values": None, "row_starts": [], "columns": []}
+    if not density.empty:
+        data = {
+            "values": density.to_numpy(dtype=np.float64),
+            "row_starts": [int(i) for i in density.index],
+            "columns": [str(c) for c in density.columns],
+        }
+    render = fastplot.render_missing_matrix if renderer == "fast" else _render_missing_matrix
+    return PlotJob(render, Path(out_path), data)
 
-    if df.empty:
-        # Рисуем пустой график
-        fig, ax = plt.subplots()
-        ax.text(0.5, 0.5, "Empty dataset", ha="center", va="center")
-        ax.axis("off")
-    else:
-        mask = df.isna().values
-        fig, ax = plt.subplots(figsize=(min(12, df.shape[1] * 0.4), 4))
-        ax.imshow(mask, aspect="auto", interpolation="none")
-        ax.set_xlabel("Columns")
-        ax.set_ylabel("Rows")
-        ax.set_title("Missing values matrix")
-        ax.set_xticks(range(df.shape[1]))
-        ax.set_xticklabels(df.columns, rotation=90, fontsize=8)
-        ax.set_yticks([])
 
-    fig.tight_layout()
-    fig.savefig(out_path)
-    plt.close(fig)
-    return out_path
+def missing_matrix_job(
+    df: pd.DataFrame,
+    out_path: PathLike,
+    buckets: int = MISSING_BUCKETS,
+    renderer: str = "matplotlib",
+) -> PlotJob:
+    """Задание матрицы пропусков по DataFrame: не больше ``buckets`` корзин строк."""
+    density = missing_density(df, buckets) if not df.empty else pd.DataFrame()
+    return missing_density_job(density, out_path, renderer=renderer)
 
 
-def plot_correlation_heatmap(df: pd.DataFrame, out_path: PathLike) -> Path:
+def correlation_heatmap_job(
+    df: Optional[pd.DataFrame],
+    out_path: PathLike,
+    corr: Optional[pd.DataFrame] = None,
+    label: str = "Pearson r",
+    renderer: str = "matplotlib",
+) -> PlotJob:
     """
-    Тепловая карта корреляции числовых признаков.
+    Задание тепловой карты; без ``corr`` матрица считается по ``df``.
+    ``label`` – подпись шкалы (метод корреляции).
     """
-    out_path = Path(out_path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
+    _check_renderer(renderer)
+    if corr is None:
+        corr = df.select_dtypes(include="number").corr(numeric_only=True) if df is not None else pd.DataFrame()
+    data: Dict[str, Any] = {"values": None, "columns": [], "index": []}
+    if corr.shape[1] >= 2:
+        data = {
+            "values": corr.to_numpy(dtype=np.float64),
+            "columns": [str(c) for c in corr.columns],
+            "index": [str(c) for c in corr.index],
+            "label": label,
+        }
+    render = fastplot.render_heatmap if renderer == "fast" else _render_heatmap
+    return PlotJob(render, Path(out_path), data)
 
-    numeric_df = df.select_dtypes(include="number")
-    if numeric_df.shape[1] < 2:
-        fig, ax = plt.subplots()
-        ax.text(0.5, 0.5, "Not enough numeric columns for correlation", ha="center", va="center")
-        ax.axis("off")
-    else:
-        corr = numeric_df.corr(numeric_only=True)
-        fig, ax = plt.subplots(figsize=(min(10, corr.shape[1]), min(8, corr.shape[0])))
-        im = ax.imshow(corr.values, vmin=-1, vmax=1, cmap="coolwarm", aspect="auto")
-        ax.set_xticks(range(corr.shape[1]))
-        ax.set_xticklabels(corr.columns, rotation=90, fontsize=8)
-        ax.set_yticks(range(corr.shape[0]))
-        ax.set_yticklabels(corr.index, fontsize=8)
-        ax.set_title("Correlation heatmap")
-        fig.colorbar(im, ax=ax, label="Pearson r")
 
-    fig.tight_layout()
-    fig.savefig(out_path)
-    plt.close(fig)
-    return out_path
+def _run_job(job: PlotJob) -> Path:
+    return job.run()
+
+
+def render_plots(jobs: Sequence[PlotJob], workers: int = 1) -> List[Path]:
+    """
+    Нарисовать задания; при ``workers > 1`` – параллельно в пуле процессов
+    (воркеры при fork наследуют уже импортированный matplotlib).
+    Возвращает пути в порядке заданий.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        return [job.run() for job in jobs]
+    if any(job.render.__module__ != fastplot.__name__ for job in jobs):
+        # импорт один раз в родителе, а не в каждом воркере
+        _new_figure()
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        context = None
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+        return list(pool.map(_run_job, jobs))
+
+
+# ---------- Прежний API: одно задание и сразу отрисовка ----------
+
+
+def plot_histograms_per_column(
+    df: pd.DataFrame,
+    out_dir: PathLike,
+    max_columns: int = 6,
+    bins: int = 20,
+    workers: int = 1,
+) -> List[Path]:
+    """
+    Для числовых колонок строит по отдельной гистограмме.
+    Возвращает список путей к PNG.
+    """
+    _ensure_dir(out_dir)
+    return render_plots(histogram_jobs(df, out_dir, max_columns=max_columns, bins=bins), workers=workers)
+
+
+def plot_missing_matrix(
+    df: pd.DataFrame,
+    out_path: PathLike,
+    buckets: int = MISSING_BUCKETS,
+    renderer: str = "matplotlib",
+) -> Path:
+    """
+    Визуализация пропусков: доля пропусков по корзинам строк (до ``buckets``)
+    и колонкам; пока строк не больше ``buckets`` – по одной строке на корзину.
+    """
+    return missing_matrix_job(df, out_path, buckets=buckets, renderer=renderer).run()
+
+
+def plot_correlation_heatmap(
+    df: Optional[pd.DataFrame],
+    out_path: PathLike,
+    corr: Optional[pd.DataFrame] = None,
+    renderer: str = "matplotlib",
+) -> Path:
+    """
+    Тепловая карта корреляции числовых признаков.
+    Если уже посчитанная матрица передана в ``corr``, ``df`` не нужен.
+    """
+    return correlation_heatmap_job(df, out_path, corr=corr, renderer=renderer).run()
 
 
 def save_top_categories_tables(
@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    # кэш профилей по умолчанию пишется в ~/.cache/eda-cli – в тестах он свой
+    monkeypatch.setenv("EDA_CLI_CACHE_DIR", str(tmp_path / "eda-cli-cache"))
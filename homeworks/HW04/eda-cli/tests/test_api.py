@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from functools import partial
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException, Response, UploadFile
+
+from eda_cli import api
+from eda_cli.cache import TTLCache
+
+
+def _upload(text: str, name: str = "data.csv") -> UploadFile:
+    return UploadFile(file=BytesIO(text.encode("utf-8")), filename=name)
+
+
+def _quality(file, response=None, if_none_match=None, **params):
+    response = response if response is not None else Response()
+    return asyncio.run(
+        api.quality_from_csv(response, file=file, if_none_match=if_none_match, **params)
+    )
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    monkeypatch.setattr(api, "API_EXECUTOR", "thread")
+    monkeypatch.setattr(api, "_executor", None)
+    monkeypatch.setattr(api, "_pending", None)
+    monkeypatch.setattr(api, "_results", TTLCache())
+    yield
+    if api._executor is not None:
+        api._executor.shutdown()
+
+
+def test_quality_from_csv_runs_in_pool(thread_pool):
+    csv = pd.DataFrame({"id": range(120), "x": [0, 1] * 60}).to_csv(index=False)
+    result = _quality(_upload(csv))
+
+    assert result["dataset_info"] == {"n_rows": 120, "n_cols": 2}
+    assert result["ok_for_model"]
+    assert set(result["percentiles"]) == {"id", "x"}
+
+    with pytest.raises(HTTPException) as exc:
+        _quality(_upload("a,b\n"))
+    assert exc.value.status_code == 400
+
+
+def test_health_is_not_blocked_by_profiling(thread_pool, monkeypatch):
+    def slow_job(*args, **kwargs):
+        time.sleep(0.5)
+        return {key: None for key in ("ok_for_model", "quality_score", "dataset_info", "flags", "percentiles")}
+
+    monkeypatch.setattr(api, "_quality_job", slow_job)
+    finished = []
+
+    async def scenario():
+        async def quality():
+            await api.quality_from_csv(Response(), file=_upload("a\n1\n"), if_none_match=None)
+            finished.append("quality")
+
+        async def health():
+            await asyncio.sleep(0.05)
+            await api.health_check()
+            finished.append("health")
+
+        await asyncio.gather(quality(), health())
+
+    asyncio.run(scenario())
+    assert finished == ["health", "quality"]
+
+
+def test_upload_is_profiled_in_chunks(thread_pool, monkeypatch, tmp_path):
+    monkeypatch.setattr(api, "API_CHUNKSIZE", 7)
+    monkeypatch.setattr(api, "UPLOAD_BLOCK_BYTES", 16)
+    monkeypatch.setattr(api.tempfile, "tempdir", str(tmp_path))
+    df = pd.DataFrame({"user_id": list(range(49)) + [3], "x": [0] * 20 + [1] * 30})
+
+    result = asyncio.run(
+        api.quality_flags_from_csv(
+            Response(), file=_upload(df.to_csv(index=False)), zero_values_threshold=0.3, if_none_match=None
+        )
+    )
+
+    assert result["dataset_info"]["n_rows"] == 50
+    assert result["additional_flags"]["has_suspicious_id_duplicates"]
+    assert result["additional_flags"]["has_many_zero_values"]  # 40% нулей
+    assert list(tmp_path.iterdir()) == []  # временный файл удалён
+
+
+
+def test_id_duplicates_are_exact_above_approx_threshold(monkeypatch, tmp_path):
+    # на всех колонках, кроме ID_COLUMNS, уникальные уже оцениваются HyperLogLog
+    monkeypatch.setattr(api, "profile_csv", partial(api.profile_csv, approx_unique_rows=100))
+    path = tmp_path / "ids.csv"
+    pd.DataFrame({"user_id": range(20_000), "code": range(20_000)}).to_csv(path, index=False)
+
+    result = api._quality_flags_job(str(path), high_cardinality_threshold=100, zero_values_threshold=0.5)
+    assert not result["additional_flags"]["has_suspicious_id_duplicates"]
+
+    pd.DataFrame({"user_id": [*range(19_999), 7]}).to_csv(path, index=False)
+    result = api._quality_flags_job(str(path), high_cardinality_threshold=100, zero_values_threshold=0.5)
+    assert result["additional_flags"]["has_suspicious_id_duplicates"]
+
+
+def test_quality_results_are_cached_with_etag(thread_pool, monkeypatch):
+    calls = []
+    job = api._quality_job
+
+    def counting_job(*args, **kwargs):
+        calls.append(args)
+        return job(*args, **kwargs)
+
+    monkeypatch.setattr(api, "_quality_job", counting_job)
+    csv = pd.DataFrame({"x": range(60)}).to_csv(index=False)
+
+    first_response = Response()
+    first = _quality(_upload(csv), first_response)
+    etag = first_response.headers["ETag"]
+    second_response = Response()
+    second = _quality(_upload(csv), second_response)
+    assert len(calls) == 1
+    assert second_response.headers["ETag"] == etag
+    assert second["flags"] == first["flags"]
+
+    # другие параметры – другой ключ
+    _quality(_upload(csv), min_rows=10)
+    assert len(calls) == 2
+
+    # с If-None-Match – 304 и с файлом, и без него
+    assert _quality(_upload(csv), if_none_match=etag).status_code == 304
+    assert _quality(None, if_none_match=f"W/{etag}").status_code == 304
+    with pytest.raises(HTTPException) as exc:
+        _quality(None, if_none_match=etag, min_rows=10)
+    assert exc.value.status_code == 412
+    assert len(calls) == 2
+
+
+def test_ttl_cache_expiry_and_lru():
+    now = [0.0]
+    cache = TTLCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # вытесняет давно не использованный "b"
+    assert cache.get("b") is None and cache.get("c") == 3
+
+    now[0] = 11.0
+    assert cache.get("a") is None and len(cache) == 1
+
+
+def test_quality_batch_streams_per_file_results(thread_pool, tmp_path):
+    import io
+    import json
+    import zipfile
+
+    good = pd.DataFrame({"x": range(120), "y": ["a", "b"] * 60}).to_csv(index=False)
+    small = pd.DataFrame({"x": range(10)}).to_csv(index=False)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("part-0.csv", good)
+        zf.writestr("nested/part-1.csv", small)
+        zf.writestr("README.txt", "не CSV")
+    files = [
+        _upload(good, "a.csv"),
+        _upload("", "empty.csv"),
+        _upload("x", "notes.txt"),
+        UploadFile(file=io.BytesIO(archive.getvalue()), filename="parts.zip"),
+    ]
+
+    async def collect():
+        response = await api.quality_batch(files=files, min_rows=50, max_missing_threshold=0.5)
+        return [json.loads(line) async for line in response.body_iterator]
+
+    lines = asyncio.run(collect())
+    *per_file, last = lines
+    by_name = {line["file"]: line for line in per_file}
+
+    assert set(by_name) == {"a.csv", "empty.csv", "notes.txt", "parts.zip/part-0.csv", "parts.zip/nested/part-1.csv"}
+    assert by_name["a.csv"]["ok_for_model"] and by_name["parts.zip/part-0.csv"]["ok_for_model"]
+    assert by_name["a.csv"]["etag"] == by_name["parts.zip/part-0.csv"]["etag"]
+    assert not by_name["parts.zip/nested/part-1.csv"]["ok_for_model"]
+    assert "error" in by_name["empty.csv"] and "error" in by_name["notes.txt"]
+    assert last["summary"] == {
+        **last["summary"],
+        "files": 5,
+        "ok_for_model_files": 2,
+        "failed_files": 1,
+        "error_files": 2,
+        "ok_for_model": False,
+    }
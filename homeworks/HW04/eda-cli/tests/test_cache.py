@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+from typer.testing import CliRunner
+
+from eda_cli import cli
+from eda_cli.cache import Profile, ProfileCache, profile_key
+from eda_cli.core import correlation_matrix, missing_table, summarize_dataset, top_categories
+
+
+def _sample_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "age": [10, 20, 30, None],
+            "height": [140.5, 150.25, 160.0, 170.1],
+            "city": ["A", "B", "A", None],
+        }
+    )
+
+
+def _profile(df: pd.DataFrame) -> Profile:
+    return Profile(
+        summary=summarize_dataset(df),
+        missing=missing_table(df),
+        correlation=correlation_matrix(df),
+        top_categories=top_categories(df),
+    )
+
+
+def test_profile_roundtrip_is_exact():
+    df = _sample_df()
+    profile = _profile(df)
+    restored = Profile.from_bytes(profile.to_bytes())
+
+    assert restored.summary.to_dict() == profile.summary.to_dict()
+    pd.testing.assert_frame_equal(restored.missing, profile.missing)
+    pd.testing.assert_frame_equal(restored.correlation, profile.correlation)
+    assert list(restored.top_categories) == list(profile.top_categories)
+    for name, table in profile.top_categories.items():
+        pd.testing.assert_frame_equal(restored.top_categories[name], table)
+
+
+def test_cache_lru_eviction(tmp_path):
+    profile = _profile(_sample_df())
+    size = len(profile.to_bytes())
+    cache = ProfileCache(tmp_path, max_bytes=int(size * 2.5))
+
+    cache.put("a", profile)
+    cache.put("b", profile)
+    assert cache.get("a") is not None  # "a" теперь использовался позже "b"
+    cache.put("c", profile)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.total_bytes() <= cache.max_bytes
+
+
+
+def test_default_cache_dir_is_resolved_at_call_time(tmp_path, monkeypatch):
+    monkeypatch.setenv("EDA_CLI_CACHE_DIR", str(tmp_path / "later"))
+    assert ProfileCache().cache_dir == tmp_path / "later"
+    assert (tmp_path / "later" / "profiles.sqlite").exists()
+
+def test_profile_key_changes_with_file(tmp_path):
+    path = tmp_path / "data.csv"
+    _sample_df().to_csv(path, index=False)
+    key = profile_key(path, {"kind": "report"})
+
+    assert profile_key(path, {"kind": "report"}) == key
+    assert profile_key(path, {"kind": "overview"}) != key
+
+    # та же длина и mtime, другое содержимое
+    stat = path.stat()
+    data = path.read_bytes().replace(b"140.5", b"141.5")
+    path.write_bytes(data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert profile_key(path, {"kind": "report"}) != key
+
+
+def test_overview_uses_cache(tmp_path, monkeypatch):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"x": np.arange(10), "y": list("ab" * 5)}).to_csv(path, index=False)
+    args = ["overview", str(path), "--cache-dir", str(tmp_path / "cache")]
+    runner = CliRunner()
+
+    first = runner.invoke(cli.app, args)
+    assert first.exit_code == 0, first.output
+
+    def fail(*args, **kwargs):
+        raise AssertionError("CSV не должен читаться повторно")
+
+    monkeypatch.setattr(cli, "_load_data", fail)
+    second = runner.invoke(cli.app, args)
+    assert second.exit_code == 0, second.output
+    assert second.output == first.output
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 from eda_cli.core import (
+    _numeric_block_stats,
+    _summarize_column_reference,
     compute_quality_flags,
     correlation_matrix,
     flatten_summary_for_print,
@@ -138,4 +141,62 @@ def test_quality_flags_without_issues():
     assert flags["has_high_cardinality_categoricals"] == False
     assert flags["has_suspicious_id_duplicates"] == False
     assert flags["has_many_zero_values"] == False
-    assert flags["quality_score"] > 0.7  # Высокий скор качества
\ No newline at end of file
+    assert flags["quality_score"] > 0.7  # Высокий скор качества
+
+def test_summarize_dataset_matches_columnwise_reference():
+    """Блочный движок даёт тот же DatasetSummary, что и поколоночный расчёт pandas."""
+    rng = np.random.default_rng(0)
+    n = 1000
+    values = rng.normal(size=n)
+    values[::9] = np.nan
+    df = pd.DataFrame(
+        {
+            "float_col": values,
+            "int_col": rng.integers(0, 50, n),
+            "bool_col": rng.random(n) < 0.3,
+            "str_col": rng.choice(["x", "y", "z", None], n),
+            "nullable_col": pd.array(rng.integers(0, 5, n), dtype="Int64"),
+            "all_nan": np.full(n, np.nan),
+        }
+    )
+
+    summary = summarize_dataset(df)
+    reference = [_summarize_column_reference(df[name], n) for name in df.columns]
+
+    # str(): NaN != NaN, а строковое представление совпадает
+    assert [str(c) for c in summary.columns] == [str(c) for c in reference]
+
+    # гистограмма считается в том же проходе и совпадает с np.histogram
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=20)
+    assert summary.columns[0].hist_counts == counts.tolist()
+    assert summary.columns[0].hist_edges == edges.tolist()
+    assert summary.columns[2].hist_counts is None and summary.columns[5].hist_counts is None
+
+
+def test_summarize_dataset_counts_wide_integers_exactly():
+    # соседние целые больше 2^53 в float64 совпадают – unique по исходным значениям
+    df = pd.DataFrame(
+        {
+            "user_id": [2**53, 2**53 + 1, 2**53 + 2, 2**53 + 3],
+            "big_unsigned": pd.Series([2**64 - 1, 2**64 - 2, 2**64 - 3, 1], dtype="uint64"),
+        }
+    )
+    summary = summarize_dataset(df)
+    reference = [_summarize_column_reference(df[name], len(df)) for name in df.columns]
+
+    assert [c.unique for c in summary.columns] == [c.unique for c in reference] == [4, 4]
+    assert not compute_quality_flags(summary, missing_table(df))["has_suspicious_id_duplicates"]
+
+
+def test_numeric_block_moments_only_match_full_pass():
+    rng = np.random.default_rng(2)
+    block = rng.normal(size=(3, 500))
+    block[0, ::4] = np.nan
+    block[1] = np.nan
+    block[2, :50] = 0.0
+
+    full = _numeric_block_stats(block)
+    moments = _numeric_block_stats(block, moments_only=True)
+    assert set(moments) == {"count", "min", "max", "mean", "m2", "std", "zeros"}
+    for key, values in moments.items():
+        np.testing.assert_array_equal(values, full[key])
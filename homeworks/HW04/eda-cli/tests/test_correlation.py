@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from typer.testing import CliRunner
+
+from eda_cli import cli, correlation
+from eda_cli.correlation import correlation_edges, edges_from_matrix, heatmap_from_edges, pairwise_correlation
+from eda_cli.core import correlation_matrix
+
+
+def _wide_frame(n: int = 300, groups: int = 6, per_group: int = 10) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    base = np.repeat(rng.normal(size=(n, groups)), per_group, axis=1)
+    values = base + 0.8 * rng.normal(size=base.shape)
+    df = pd.DataFrame(values, columns=[f"f{i}" for i in range(values.shape[1])])
+    return df.mask(rng.random(df.shape) < 0.05)
+
+
+def test_pairwise_complete_correlation_matches_pandas():
+    df = _wide_frame(groups=2, per_group=5)
+    df["f0"] = df["f0"].round().astype("Int64")  # nullable-тип
+    df.loc[:200, "f9"] = np.nan  # пара с малым числом строк
+    df["const"] = 1.0
+    df["text"] = "x"
+
+    r, n = pairwise_correlation(df, block_columns=4)
+    pd.testing.assert_frame_equal(r, df.corr(numeric_only=True), check_exact=False, rtol=1e-12)
+    present = df.select_dtypes(include="number").notna().astype(np.int64)
+    pd.testing.assert_frame_equal(n, present.T @ present)
+
+
+def test_blocks_are_prepared_per_column_block(monkeypatch):
+    df = _wide_frame(groups=3, per_group=4)
+    df.insert(5, "text", "x")
+    widths = []
+    prepare = correlation._prepare
+
+    def spy(frame, positions, ranks=False):
+        widths.append(len(positions))
+        return prepare(frame, positions, ranks)
+
+    monkeypatch.setattr(correlation, "_prepare", spy)
+    r, _ = pairwise_correlation(df, block_columns=5)
+    pd.testing.assert_frame_equal(r, df.corr(numeric_only=True), check_exact=False, rtol=1e-12)
+    full = df.dropna()
+    pd.testing.assert_frame_equal(
+        pairwise_correlation(full, method="spearman", block_columns=5)[0],
+        full.corr("spearman", numeric_only=True),
+        check_exact=False,
+        rtol=1e-12,
+    )
+    correlation_edges(df, block_columns=5, top_k=2)
+    # в памяти только блоки колонок, а не float64-копия всей таблицы
+    assert widths and max(widths) <= 5
+
+
+def _kendall_tau_b(x: np.ndarray, y: np.ndarray) -> float:
+    keep = ~(np.isnan(x) | np.isnan(y))
+    upper = np.triu_indices(int(keep.sum()), 1)
+    sx = np.sign(x[keep][:, None] - x[keep][None, :])[upper]
+    sy = np.sign(y[keep][:, None] - y[keep][None, :])[upper]
+    return float((sx * sy).sum() / np.sqrt((sx != 0).sum() * (sy != 0).sum()))
+
+
+def test_rank_correlations():
+    df = _wide_frame(n=200, groups=2, per_group=2)
+    df["f0"] = df["f0"].round()  # ничьи
+    full = df.dropna()
+
+    pd.testing.assert_frame_equal(
+        correlation_matrix(full, method="spearman"), full.corr("spearman"), check_exact=False, rtol=1e-12
+    )
+    tau = correlation_matrix(df, method="kendall")
+    for a in df.columns:
+        for b in df.columns:
+            if a != b:
+                assert abs(tau.loc[a, b] - _kendall_tau_b(df[a].to_numpy(), df[b].to_numpy())) < 1e-12
+
+    # подвыборка строк: оценка близка к точному значению
+    big = _wide_frame(n=5_000, groups=1, per_group=2)
+    approx, n = pairwise_correlation(big, method="kendall", max_rows=1_000)
+    assert n.to_numpy().max() <= 1_000
+    exact = _kendall_tau_b(big["f0"].to_numpy()[:3_000], big["f1"].to_numpy()[:3_000])
+    assert abs(approx.loc["f0", "f1"] - exact) < 0.08
+
+
+def test_blocked_edges_match_dense_selection():
+    df = _wide_frame()
+    dense = df.corr()
+    counts = df.notna().astype(int).T @ df.notna().astype(int)
+
+    for params in ({"top_k": 3}, {"threshold": 0.5}, {"threshold": 0.6, "top_k": 2}):
+        edges = correlation_edges(df, block_columns=16, **params)
+        expected = edges_from_matrix(dense, counts=counts, **params)
+        pd.testing.assert_frame_equal(edges[["left", "right", "n"]], expected[["left", "right", "n"]])
+        np.testing.assert_allclose(edges["r"], expected["r"], rtol=1e-10)
+
+
+def test_reduced_heatmap_groups_correlated_columns():
+    edges = correlation_edges(_wide_frame(), top_k=3)
+    heat = heatmap_from_edges(edges, max_columns=20)
+
+    assert heat.shape == (20, 20)
+    assert np.allclose(np.diag(heat.to_numpy()), 1.0)
+    # каждая группа коррелированных признаков (по 10) – сплошной блок
+    group = [int(name[1:]) // 10 for name in heat.columns]
+    assert sum(a != b for a, b in zip(group, group[1:])) == len(set(group)) - 1
+
+
+def test_report_writes_edge_list_for_wide_tables(tmp_path):
+    path = tmp_path / "wide.csv"
+    _wide_frame().to_csv(path, index=False)
+    out_dir = tmp_path / "report"
+
+    result = CliRunner().invoke(
+        cli.app, ["report", str(path), "--out-dir", str(out_dir), "--corr-top-k", "2", "--no-cache"]
+    )
+    assert result.exit_code == 0, result.output
+    assert not (out_dir / "correlation.csv").exists()
+    edges = pd.read_csv(out_dir / "correlation_edges.csv")
+    assert list(edges.columns) == ["left", "right", "r", "n"]
+    assert (out_dir / "correlation_heatmap.png").exists()
+
+    dense_dir = tmp_path / "dense"
+    result = CliRunner().invoke(cli.app, ["report", str(path), "--out-dir", str(dense_dir), "--no-cache"])
+    assert result.exit_code == 0, result.output
+    counts = pd.read_csv(dense_dir / "correlation_n.csv", index_col=0)
+    assert counts.shape == (60, 60) and counts.to_numpy().max() <= 300
+
+    result = CliRunner().invoke(
+        cli.app, ["report", str(path), "--out-dir", str(dense_dir), "--corr-method", "spearman", "--no-cache"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Метод: **Спирмен" in (dense_dir / "report.md").read_text(encoding="utf-8")
+    streaming = CliRunner().invoke(
+        cli.app,
+        ["report", str(path), "--out-dir", str(dense_dir), "--corr-method", "kendall", "--chunksize", "100", "--no-cache"],
+    )
+    assert streaming.exit_code != 0
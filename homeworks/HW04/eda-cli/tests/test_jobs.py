@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from eda_cli.cli import REPORT_STAGES
+from eda_cli.jobs import JobManager
+
+
+def _wait(manager: JobManager, job_id: str, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.1)
+    raise AssertionError("задача не завершилась")
+
+
+def test_report_job_runs_full_pipeline(tmp_path):
+    source = tmp_path / "source.csv"
+    rng = np.random.default_rng(0)
+    pd.DataFrame(
+        {"a": rng.normal(size=50), "b": rng.integers(0, 5, 50), "c": rng.choice(["x", "y"], 50)}
+    ).to_csv(source, index=False)
+
+    manager = JobManager(tmp_path / "jobs", max_workers=1)
+    try:
+        job = manager.create(source_name="source.csv")
+        assert job.status == "queued"
+        shutil.copy(source, manager.input_path(job))
+        manager.submit(job, top_k_categories=3)
+        job = _wait(manager, job.id)
+    finally:
+        manager.shutdown()
+
+    assert job.status == "done", job.error
+    assert job.stages == {name: "done" for name in REPORT_STAGES}
+    artifacts = manager.artifacts(job)
+    assert {"report.md", "summary.csv", "correlation_heatmap.png"} <= set(artifacts)
+    assert "source.csv" in manager.artifact_path(job, "report.md").read_text(encoding="utf-8")
+    assert manager.artifact_path(job, "../status.json") is None
+    assert not manager.input_path(job).exists()
+
+
+def test_report_job_failure_is_reported(tmp_path):
+    manager = JobManager(tmp_path / "jobs", max_workers=1)
+    try:
+        job = manager.create(source_name="broken.csv")
+        manager.input_path(job).write_bytes(b"")
+        manager.submit(job)
+        job = _wait(manager, job.id)
+    finally:
+        manager.shutdown()
+
+    assert job.status == "failed"
+    assert job.stages["profile"] == "failed"
+    assert job.error
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from eda_cli.core import missing_table, summarize_dataset, top_categories
+from eda_cli.parallel import split_shards
+
+
+def _wide_df() -> pd.DataFrame:
+    rng = np.random.default_rng(2)
+    n = 300
+    data = {f"num_{i}": rng.normal(size=n) for i in range(6)}
+    data["num_0"][::10] = np.nan
+    data["ints"] = rng.integers(0, 3, n)
+    for i in range(3):
+        data[f"cat_{i}"] = rng.choice(["a", "b", "c", None], n, p=[0.5, 0.3, 0.1, 0.1])
+    return pd.DataFrame(data)
+
+
+def test_split_shards_covers_all_items_in_order():
+    shards = split_shards(list(range(10)), 3)
+    assert len(shards) == 3
+    assert [x for shard in shards for x in shard] == list(range(10))
+    assert split_shards([1, 2], 8) == [[1], [2]]
+
+
+def test_parallel_profiling_matches_single_process():
+    df = _wide_df()
+
+    expected = summarize_dataset(df)
+    actual = summarize_dataset(df, workers=2)
+    assert [str(c) for c in actual.columns] == [str(c) for c in expected.columns]
+
+    pd.testing.assert_frame_equal(missing_table(df, workers=2), missing_table(df))
+
+    top = top_categories(df, top_k=2, workers=2)
+    expected_top = top_categories(df, top_k=2)
+    assert list(top) == list(expected_top)
+    for name in top:
+        pd.testing.assert_frame_equal(top[name], expected_top[name])
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from eda_cli import cli
+from eda_cli.core import summarize_dataset
+from eda_cli import readers
+from eda_cli.readers import (
+    METADATA_FILL_FIELDS,
+    csv_byte_ranges,
+    detect_format,
+    parquet_metadata_summary,
+    read_csv_parallel,
+    read_frame,
+)
+from eda_cli.streaming import profile_csv
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    n = 300
+    return pd.DataFrame(
+        {
+            "a": rng.normal(size=n),
+            "b": rng.integers(0, 10, n),
+            "c": rng.choice(["x", "y", "z"], n),
+            "d": np.where(np.arange(n) % 7 == 0, np.nan, 1.5),
+        }
+    )
+
+
+def test_detect_format_and_csv_projection(tmp_path):
+    assert detect_format("data.PARQUET") == "parquet"
+    assert detect_format("data.feather") == detect_format("x.arrow") == "ipc"
+    assert detect_format("data.tsv") == "csv"
+
+    path = tmp_path / "data.csv"
+    _frame().to_csv(path, index=False)
+    df = read_frame(path, columns=["c", "a"])
+    assert list(df.columns) == ["a", "c"]  # порядок колонок файла
+    acc = profile_csv(path, chunksize=50, columns=["b"])
+    assert [col.name for col in acc.to_summary().columns] == ["b"]
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather", ".arrow"])
+def test_columnar_formats_match_csv(tmp_path, suffix):
+    pytest.importorskip("pyarrow")
+    df = _frame()
+    path = tmp_path / f"data{suffix}"
+    if suffix == ".parquet":
+        df.to_parquet(path, index=False, row_group_size=64)
+    else:
+        df.to_feather(path)
+
+    projected = read_frame(path, columns=["a", "c"])
+    pd.testing.assert_frame_equal(projected, df[["a", "c"]], check_dtype=False)
+
+    expected = summarize_dataset(df)
+    streamed = profile_csv(path, chunksize=50).to_summary()
+    for got, exp in zip(streamed.columns, expected.columns):
+        assert (got.name, got.non_null, got.missing, got.unique) == (
+            exp.name,
+            exp.non_null,
+            exp.missing,
+            exp.unique,
+        )
+
+    result = CliRunner().invoke(cli.app, ["overview", str(path), "--columns", "a,d", "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "Столбцов: 2" in result.output
+
+
+def test_parquet_metadata_summary_matches_data(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    df = _frame()
+    path = tmp_path / "data.parquet"
+    df.to_parquet(path, index=False, row_group_size=64)
+
+    meta = parquet_metadata_summary(path)
+    expected = summarize_dataset(df)
+    assert meta.n_rows == expected.n_rows
+    for got, exp in zip(meta.columns, expected.columns):
+        assert (got.name, got.dtype, got.non_null, got.missing, got.min, got.max) == (
+            exp.name,
+            exp.dtype,
+            exp.non_null,
+            exp.missing,
+            exp.min,
+            exp.max,
+        )
+        assert got.unique is None and got.mean is None
+
+    # mean/std/unique/примеры – по данным, только нужные колонки
+    filled = parquet_metadata_summary(path, fill=METADATA_FILL_FIELDS)
+    for got, exp in zip(filled.columns, expected.columns):
+        assert got.unique == exp.unique and got.example_values == exp.example_values
+        if exp.is_numeric:
+            assert got.mean == pytest.approx(exp.mean) and got.std == pytest.approx(exp.std)
+    # только запрошенные поля
+    moments = parquet_metadata_summary(path, fill=["mean"])
+    for got, exp in zip(moments.columns, expected.columns):
+        assert got.unique is None and got.std is None and got.example_values == []
+        if exp.is_numeric:
+            assert got.mean == pytest.approx(exp.mean)
+    monkeypatch.setattr(cli, "_load_data", lambda *a, **k: pytest.fail("данные не должны читаться"))
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["overview", str(path), "--metadata-only", "--metadata-fill", "unique", "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "Строк: 300" in result.output
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(pq.ParquetFile, "read_row_group", lambda *a, **k: pytest.fail("только футер"))
+    result = runner.invoke(cli.app, ["overview", str(path), "--metadata-only", "--no-cache"])
+    assert result.exit_code == 0, result.output
+
+    csv_path = tmp_path / "data.csv"
+    df.to_csv(csv_path, index=False)
+    result = runner.invoke(cli.app, ["overview", str(csv_path), "--metadata-only", "--no-cache"])
+    assert result.exit_code != 0
+
+
+def test_parallel_csv_respects_quotes_sep_and_encoding(tmp_path, monkeypatch):
+    rng = np.random.default_rng(5)
+    n = 400
+    df = pd.DataFrame(
+        {
+            "id": np.arange(n),
+            "text": [f"строка {i};\n\"цитата\"" if i % 3 == 0 else f"т{i}" for i in range(n)],
+            "x": np.where(rng.random(n) < 0.1, np.nan, rng.normal(size=n)),
+            # в начале файла числа, дальше строки – разные типы в разных диапазонах
+            "mixed": [str(i) if i < 300 else f"v{i}" for i in range(n)],
+        }
+    )
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False, sep=";", encoding="cp1251")
+
+    header_end, ranges = csv_byte_ranges(path, 4, min_range_bytes=64)
+    assert len(ranges) == 4 and ranges[0][0] == header_end
+    data = path.read_bytes()
+    for start, end in ranges:
+        assert data[start - 1 : start] == b"\n"
+        assert data[:start].count(b'"') % 2 == 0  # не внутри кавычек
+
+    expected = pd.read_csv(path, sep=";", encoding="cp1251")
+    got = read_csv_parallel(path, sep=";", encoding="cp1251", workers=3, min_range_bytes=64)
+    pd.testing.assert_frame_equal(got, expected)
+
+    monkeypatch.setattr(readers, "MIN_RANGE_BYTES", 64)
+    acc = profile_csv(path, chunksize=40, sep=";", encoding="cp1251", workers=2)
+    for got_col, exp_col in zip(acc.to_summary().columns, summarize_dataset(expected).columns):
+        assert (got_col.name, got_col.dtype, got_col.missing, got_col.unique) == (
+            exp_col.name,
+            exp_col.dtype,
+            exp_col.missing,
+            exp_col.unique,
+        )
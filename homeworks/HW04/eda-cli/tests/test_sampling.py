@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from eda_cli import cli
+from eda_cli.core import summarize_dataset
+from eda_cli.sampling import sample_chunks, summarize_sample
+
+
+def _frame(n: int = 50_000) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    group = rng.choice(["a", "b", "c"], n, p=[0.7, 0.2, 0.1])
+    x = np.where(group == "a", rng.normal(0, 1, n), rng.normal(10, 3, n))
+    x[rng.random(n) < 0.2] = np.nan
+    return pd.DataFrame({"group": group, "x": x, "flag": rng.integers(0, 2, n)})
+
+
+def _chunks(df: pd.DataFrame, size: int = 4_000):
+    return [df.iloc[i : i + size] for i in range(0, len(df), size)]
+
+
+def test_reservoir_sample_estimates_cover_truth():
+    df = _frame()
+    truth = summarize_dataset(df).columns[1]
+
+    for kwargs in ({"n": 3_000}, {"n": 3_000, "stratify": "group"}, {"frac": 0.05}):
+        sample = sample_chunks(_chunks(df), **kwargs)
+        summary = summarize_sample(sample, confidence=0.999)
+        x = summary.columns[1]
+
+        assert summary.n_rows == len(df) and summary.sample_rows == len(sample.df)
+        assert x.mean_ci[0] <= truth.mean <= x.mean_ci[1]
+        assert x.std_ci[0] <= truth.std <= x.std_ci[1]
+        assert x.missing_share_ci[0] <= truth.missing_share <= x.missing_share_ci[1]
+        assert x.missing + x.non_null == len(df)
+
+
+def test_stratified_sample_is_proportional():
+    df = _frame()
+    sample = sample_chunks(_chunks(df), n=1_000, stratify="group")
+
+    assert len(sample.df) == sum(sample.strata_sampled.values())
+    assert sample.strata_rows == df["group"].value_counts().to_dict()
+    for label, rows in sample.strata_rows.items():
+        assert abs(sample.strata_sampled[label] - 1_000 * rows / len(df)) <= 1
+    # строки выборки – в порядке файла
+    assert (sample.df.index == np.arange(len(sample.df))).all()
+
+    # резервуар n × число страт ограничен
+    with pytest.raises(ValueError, match="Резервуар"):
+        sample_chunks(_chunks(df), n=1_000, stratify="group", max_reservoir_rows=2_000)
+    assert len(sample_chunks(_chunks(df, size=100), n=500, max_reservoir_rows=500).df) == 500
+
+
+def test_report_marks_statistics_as_estimates(tmp_path):
+    path = tmp_path / "data.csv"
+    _frame(5_000).to_csv(path, index=False)
+    out_dir = tmp_path / "report"
+
+    result = CliRunner().invoke(
+        cli.app,
+        ["report", str(path), "--out-dir", str(out_dir), "--sample", "500", "--stratify", "group", "--no-cache"],
+    )
+    assert result.exit_code == 0, result.output
+
+    text = (out_dir / "report.md").read_text(encoding="utf-8")
+    assert "Строк: **5000**" in text
+    assert "по случайной выборке из" in text
+    summary = pd.read_csv(out_dir / "summary.csv")
+    assert {"mean_ci", "std_ci", "missing_share_ci"} <= set(summary.columns)
+
+    bad = CliRunner().invoke(cli.app, ["overview", str(path), "--stratify", "group"])
+    assert bad.exit_code != 0
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from eda_cli.core import compute_quality_flags, missing_table, summarize_dataset, top_categories
+from eda_cli.sketches import HyperLogLog, SpaceSaving
+from eda_cli.streaming import DatasetAccumulator
+
+
+def test_hyperloglog_estimate_and_merge():
+    left, right = HyperLogLog(error=0.01), HyperLogLog(error=0.01)
+    left.update(np.array([f"user_{i}" for i in range(60_000)], dtype=object))
+    right.update(np.array([f"user_{i}" for i in range(40_000, 100_000)], dtype=object))
+    left.merge(right)
+
+    assert abs(left.estimate() - 100_000) / 100_000 < 3 * left.relative_error
+    # малые кардинальности – практически точно
+    small = HyperLogLog()
+    small.update(np.array([1, 1.0, 2, 3]))
+    assert len(small) == 3
+
+
+def test_summarize_dataset_approximate_unique():
+    n = 5_000
+    df = pd.DataFrame(
+        {
+            "user_id": [f"u{i}" for i in range(n)],
+            "plan": np.where(np.arange(n) % 2 == 0, "free", "pro"),
+        }
+    )
+    summary = summarize_dataset(df, approx_unique_rows=1_000)
+    user_id, plan = summary.columns
+
+    assert user_id.unique_is_estimate and plan.unique_is_estimate
+    assert abs(user_id.unique - n) / n < 0.05
+    assert plan.unique == 2
+
+    flags = compute_quality_flags(summary, missing_table(df), df)
+    assert flags["has_high_cardinality_categoricals"]
+    assert not flags["has_suspicious_id_duplicates"]
+    assert not flags["has_constant_columns"]
+
+
+def test_streaming_switches_to_hyperloglog_above_threshold():
+    df = pd.DataFrame({"url": [f"/page/{i % 3000}" for i in range(6000)]})
+    acc = DatasetAccumulator(approx_unique_rows=2_000)
+    for start in range(0, len(df), 1000):
+        acc.update(df.iloc[start : start + 1000])
+
+    column = acc.to_summary().columns[0]
+    assert column.unique_is_estimate
+    assert not acc.columns["url"].distinct
+    assert abs(column.unique - 3000) / 3000 < 0.05
+
+
+def test_space_saving_exact_below_capacity_and_bounded_above():
+    rng = np.random.default_rng(3)
+    values = pd.Series(rng.zipf(1.5, 20_000) % 500).astype(str)
+    exact = values.value_counts()
+
+    sketch = SpaceSaving(capacity=1_000)
+    for start in range(0, len(values), 2_500):
+        sketch.update(values.iloc[start : start + 2_500])
+    pd.testing.assert_series_equal(sketch.top(5), exact.head(5), check_names=False)
+
+    small = SpaceSaving(capacity=50)
+    left, right = SpaceSaving(capacity=50), SpaceSaving(capacity=50)
+    left.update(values.iloc[:10_000])
+    right.update(values.iloc[10_000:])
+    left.merge(right)
+    small.update(values)
+    for sketch in (small, left):
+        top = sketch.top(5)
+        assert list(top.index[:3]) == list(exact.index[:3])
+        overestimate = top - exact.reindex(top.index)
+        assert (overestimate >= 0).all()
+        assert (overestimate <= sketch.error_bound).all()
+
+
+def test_top_categories_with_sketch_matches_exact():
+    df = pd.DataFrame({"city": ["A"] * 50 + ["B"] * 30 + ["C"] * 15 + [None] * 5})
+    exact = top_categories(df, top_k=2)["city"]
+    sketched = top_categories(df, top_k=2, sketch_capacity=10)["city"]
+    pd.testing.assert_frame_equal(sketched, exact)
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from eda_cli import cli
+from eda_cli.core import (
+    HIST_BINS,
+    PERCENTILES,
+    compute_quality_flags,
+    correlation_matrix,
+    missing_density,
+    missing_table,
+    summarize_dataset,
+    top_categories,
+)
+from eda_cli.streaming import DatasetAccumulator, profile_csv, profile_csv_incremental
+
+
+def _write_csv(tmp_path) -> tuple:
+    rng = np.random.default_rng(1)
+    n = 500
+    df = pd.DataFrame(
+        {
+            "user_id": np.arange(n),
+            "sessions": rng.integers(0, 20, n),
+            "revenue": np.round(rng.exponential(100.0, n), 2),
+            "country": rng.choice(["RU", "KZ", "BY"], n, p=[0.6, 0.3, 0.1]),
+            "zeros": np.zeros(n, dtype=int),
+        }
+    )
+    # пропуски только во второй половине файла: в первых чанках колонка int64
+    df["sessions"] = df["sessions"].astype(float)
+    df.loc[400:420, "sessions"] = np.nan
+    df.loc[::50, "country"] = None
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    return path, pd.read_csv(path)
+
+
+def test_chunked_summary_matches_in_memory(tmp_path):
+    path, df = _write_csv(tmp_path)
+
+    expected = summarize_dataset(df)
+    actual = profile_csv(path, chunksize=64).to_summary()
+
+    assert actual.n_rows == expected.n_rows
+    assert actual.n_cols == expected.n_cols
+    for got, exp in zip(actual.columns, expected.columns):
+        assert got.name == exp.name
+        assert got.dtype == exp.dtype
+        assert (got.non_null, got.missing, got.unique) == (exp.non_null, exp.missing, exp.unique)
+        assert got.example_values == exp.example_values
+        assert got.min == exp.min and got.max == exp.max
+        if exp.mean is not None:
+            assert got.mean == pytest.approx(exp.mean)
+            assert got.std == pytest.approx(exp.std)
+
+
+def test_chunked_missing_flags_and_top_categories(tmp_path):
+    path, df = _write_csv(tmp_path)
+    acc = profile_csv(path, chunksize=64)
+
+    pd.testing.assert_frame_equal(acc.missing_table(), missing_table(df))
+
+    summary = acc.to_summary()
+    flags = compute_quality_flags(summary, acc.missing_table(), extended=True)
+    expected = compute_quality_flags(summarize_dataset(df), missing_table(df), df)
+    assert flags == pytest.approx(expected)
+
+    top = acc.top_categories(top_k=2)["country"]
+    expected_top = top_categories(df, top_k=2)["country"]
+    pd.testing.assert_frame_equal(top, expected_top)
+
+
+def test_dataset_accumulator_merge_equals_single_pass(tmp_path):
+    _, df = _write_csv(tmp_path)
+
+    whole = DatasetAccumulator()
+    whole.update(df)
+
+    left, right = DatasetAccumulator(), DatasetAccumulator()
+    left.update(df.iloc[:200])
+    right.update(df.iloc[200:])
+    left.merge(right)
+
+    for got, exp in zip(left.to_summary().columns, whole.to_summary().columns):
+        assert got.non_null == exp.non_null
+        assert got.unique == exp.unique
+        if exp.mean is not None:
+            assert got.mean == pytest.approx(exp.mean)
+            assert got.std == pytest.approx(exp.std)
+
+
+def test_chunked_profiling_with_workers(tmp_path):
+    path, _ = _write_csv(tmp_path)
+
+    serial = profile_csv(path, chunksize=64).to_summary()
+    parallel = profile_csv(path, chunksize=64, workers=2).to_summary()
+
+    assert [str(c) for c in parallel.columns] == [str(c) for c in serial.columns]
+
+
+def test_streaming_correlation_matches_in_memory(tmp_path):
+    path, df = _write_csv(tmp_path)
+    expected = correlation_matrix(df)
+
+    # чанки и шарды со своими сдвигами, сливаемые в произвольном порядке
+    pd.testing.assert_frame_equal(profile_csv(path, chunksize=64).correlation(), expected)
+    right, left = DatasetAccumulator(), DatasetAccumulator()
+    right.update(df.iloc[250:])
+    left.update(df.iloc[:250])
+    right.merge(left)
+    pd.testing.assert_frame_equal(right.correlation(), expected)
+
+
+def test_streaming_histograms_are_mergeable(tmp_path):
+    path, df = _write_csv(tmp_path)
+    revenue = df["revenue"].to_numpy()
+
+    for acc in (profile_csv(path, chunksize=64), profile_csv(path, chunksize=64, workers=2)):
+        col = acc.to_summary().columns[2]
+        counts, edges = np.asarray(col.hist_counts), np.asarray(col.hist_edges)
+        # бины адаптивные, но счётчики точные для своих границ
+        assert HIST_BINS <= len(counts) <= 2 * HIST_BINS
+        assert counts.tolist() == np.histogram(revenue, bins=edges)[0].tolist()
+
+    out_dir = tmp_path / "report"
+    result = CliRunner().invoke(
+        cli.app, ["report", str(path), "--out-dir", str(out_dir), "--chunksize", "64", "--no-cache"]
+    )
+    assert result.exit_code == 0, result.output
+    assert {p.name for p in out_dir.glob("hist_*.png")} == {
+        "hist_1_user_id.png", "hist_2_sessions.png", "hist_3_revenue.png", "hist_4_zeros.png"
+    }
+
+
+def test_streaming_missing_density_matches_in_memory(tmp_path):
+    path, df = _write_csv(tmp_path)
+    expected = missing_density(df, buckets=32)
+
+    # 500 строк в не более чем 32 корзинах: по 16 строк; чанки по 64 стыкуются с корзинами
+    for workers in (1, 2):
+        acc = profile_csv(path, chunksize=64, workers=workers, missing_buckets=32)
+        pd.testing.assert_frame_equal(acc.missing_density(), expected)
+    assert expected.shape == (32, 5) and expected.index[1] == 16
+    assert expected["sessions"].iloc[400 // 16] > 0 and expected["sessions"].iloc[0] == 0
+
+    out_dir = tmp_path / "report"
+    result = CliRunner().invoke(
+        cli.app,
+        [
+            "report",
+            str(path),
+            "--out-dir",
+            str(out_dir),
+            "--chunksize",
+            "64",
+            "--missing-buckets",
+            "8",
+            "--no-cache",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert (out_dir / "missing_matrix.png").exists()
+
+
+def test_chunked_percentiles_within_rank_error(tmp_path):
+    rng = np.random.default_rng(4)
+    values = rng.lognormal(3.0, 1.0, 50_000)
+    path = tmp_path / "revenue.csv"
+    pd.DataFrame({"revenue": values}).to_csv(path, index=False)
+
+    column = profile_csv(path, chunksize=5_000).to_summary().columns[0]
+    ordered = np.sort(pd.read_csv(path)["revenue"].to_numpy())
+    for name, q in PERCENTILES.items():
+        rank = np.searchsorted(ordered, getattr(column, name)) / len(ordered)
+        assert abs(rank - q) < 0.02, name
+
+
+def test_percentiles_are_exact_before_sketch_compaction(tmp_path):
+    _, df = _write_csv(tmp_path)
+    acc = DatasetAccumulator(quantile_k=len(df))
+    for start in range(0, len(df), 64):
+        acc.update(df.iloc[start : start + 64])
+
+    expected = summarize_dataset(df).columns[2]
+    actual = acc.to_summary().columns[2]
+    for name in PERCENTILES:
+        assert getattr(actual, name) == pytest.approx(getattr(expected, name))
+
+
+def _assert_same_summary(actual, expected):
+    assert actual.n_rows == expected.n_rows
+    for got, exp in zip(actual.columns, expected.columns):
+        assert (got.name, got.dtype) == (exp.name, exp.dtype)
+        assert (got.non_null, got.missing, got.unique) == (exp.non_null, exp.missing, exp.unique)
+        assert got.example_values == exp.example_values
+        assert got.min == exp.min and got.max == exp.max
+        if exp.mean is not None:
+            assert got.mean == pytest.approx(exp.mean)
+            assert got.std == pytest.approx(exp.std)
+
+
+def test_incremental_profiling_of_appended_rows(tmp_path):
+    path, df = _write_csv(tmp_path)
+    text = path.read_text()
+    lines = text.splitlines(keepends=True)
+    # первый прогон: 300 строк и недописанная 301-я (без перевода строки)
+    path.write_text("".join(lines[:301]) + lines[301].rstrip("\n"))
+
+    acc, state = profile_csv_incremental(path, chunksize=64)
+    assert state.offset == len("".join(lines[:301]).encode())
+    assert acc.n_rows == 301 and state.accumulator.n_rows == 300
+
+    path.write_text(text)
+    acc, state = profile_csv_incremental(path, state, chunksize=64)
+    _assert_same_summary(acc.to_summary(), profile_csv(path, chunksize=64).to_summary())
+    assert state.offset == path.stat().st_size
+
+    # изменённый префикс – полный пересчёт, а не слияние со старым состоянием
+    path.write_text(text.replace("RU", "UA", 1))
+    acc, _ = profile_csv_incremental(path, state, chunksize=64)
+    _assert_same_summary(acc.to_summary(), profile_csv(path, chunksize=64).to_summary())
+
+
+def test_incremental_profiling_detects_edit_inside_large_prefix(tmp_path):
+    rng = np.random.default_rng(8)
+    path = tmp_path / "big.csv"
+    pd.DataFrame({"a": rng.integers(100_000, 999_999, 400_000), "b": rng.integers(0, 9, 400_000)}).to_csv(
+        path, index=False
+    )
+    _, state = profile_csv_incremental(path, chunksize=50_000)
+    assert state.offset > 3 * 1024 * 1024
+
+    # правка той же длины чуть дальше первого мегабайта – мимо блоков выборочного хэша
+    data = bytearray(path.read_bytes())
+    pos = data.index(b"\n", 1024 * 1024 + 100) + 1
+    data[pos] = ord("1") if data[pos] != ord("1") else ord("2")
+    path.write_bytes(bytes(data))
+
+    acc, _ = profile_csv_incremental(path, state, chunksize=50_000)
+    _assert_same_summary(acc.to_summary(), profile_csv(path, chunksize=50_000).to_summary())
+
+
+def test_incremental_profiling_stops_before_open_quoted_field(tmp_path):
+    path = tmp_path / "notes.csv"
+    path.write_bytes(b'id,txt\n1,"a\nb"\n2,c\n')
+    acc, state = profile_csv_incremental(path)
+    assert state.offset == path.stat().st_size and acc.n_rows == 2
+
+    # запись 3 обрывается внутри кавычек: в результат и в состояние она не попадает
+    with open(path, "ab") as f:
+        f.write(b'3,"multi\nline')
+    acc, state = profile_csv_incremental(path, state)
+    assert acc.n_rows == 2 and state.offset == len(b'id,txt\n1,"a\nb"\n2,c\n')
+
+    with open(path, "ab") as f:
+        f.write(b'"\n4,d\n')
+    acc, state = profile_csv_incremental(path, state)
+    assert state.offset == path.stat().st_size
+    _assert_same_summary(acc.to_summary(), profile_csv(path, chunksize=64).to_summary())
+    assert acc.to_summary().columns[1].unique == 4
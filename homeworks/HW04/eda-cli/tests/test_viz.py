@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from eda_cli.core import summarize_dataset
+from eda_cli.viz import (
+    histogram_jobs,
+    missing_matrix_job,
+    plot_histograms_per_column,
+    render_plots,
+    summary_histogram_jobs,
+)
+
+
+def test_parallel_rendering_matches_sequential(tmp_path):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(rng.normal(size=(2_000, 4)), columns=["a", "b", "c", "d"])
+    df = df.mask(rng.random(df.shape) < 0.1)
+    df["text"] = "x"
+
+    jobs = histogram_jobs(df, tmp_path / "seq", max_columns=3)
+    # воркерам уходят только счётчики, а не колонки
+    assert set(jobs[0].data) == {"name", "counts", "edges"}
+    assert jobs[0].data["counts"].sum() == df["a"].notna().sum()
+
+    sequential = render_plots([*jobs, missing_matrix_job(df, tmp_path / "seq" / "missing_matrix.png")])
+    parallel = plot_histograms_per_column(df, tmp_path / "par", max_columns=3, workers=2)
+
+    assert [p.name for p in parallel] == ["hist_1_a.png", "hist_2_b.png", "hist_3_c.png"]
+    for seq_path, par_path in zip(sequential, parallel):
+        assert seq_path.read_bytes() == par_path.read_bytes()
+    assert sequential[-1].exists()
+
+    # по счётчикам из профиля – те же картинки без исходного DataFrame
+    from_summary = render_plots(summary_histogram_jobs(summarize_dataset(df), tmp_path / "summary", max_columns=3))
+    assert [p.read_bytes() for p in from_summary] == [p.read_bytes() for p in parallel]
+
+
+def test_fast_renderer_writes_png_and_svg(tmp_path):
+    import struct
+    import subprocess
+    import sys
+
+    from eda_cli.core import correlation_matrix
+    from eda_cli.viz import correlation_heatmap_job
+
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame(rng.normal(size=(500, 3)), columns=["alpha", "beta", "x<y"]).mask(rng.random((500, 3)) < 0.2)
+
+    paths = render_plots(
+        [
+            missing_matrix_job(df, tmp_path / "missing.png", buckets=64, renderer="fast"),
+            correlation_heatmap_job(None, tmp_path / "heat.png", corr=correlation_matrix(df), renderer="fast"),
+            correlation_heatmap_job(None, tmp_path / "heat.svg", corr=correlation_matrix(df), renderer="fast"),
+            correlation_heatmap_job(None, tmp_path / "empty.png", corr=pd.DataFrame(), renderer="fast"),
+        ]
+    )
+    for path in paths[:2] + paths[3:]:
+        data = path.read_bytes()
+        assert data[:8] == b"\x89PNG\r\n\x1a\n" and data.endswith(b"IEND\xaeB`\x82")
+        width, height = struct.unpack(">II", data[16:24])
+        assert width > 50 and height > 20
+    svg = paths[2].read_text(encoding="utf-8")
+    assert "alpha" in svg and "x&lt;y" in svg and "Pearson r" in svg
+
+    # подписи вне пиксельного шрифта – PNG через matplotlib, SVG остаётся быстрым
+    cyrillic = correlation_matrix(df).rename(columns={"alpha": "доход"}, index={"alpha": "доход"})
+    fast, slow, vector = render_plots(
+        [
+            correlation_heatmap_job(None, tmp_path / "ru_fast.png", corr=cyrillic, renderer="fast"),
+            correlation_heatmap_job(None, tmp_path / "ru_slow.png", corr=cyrillic),
+            correlation_heatmap_job(None, tmp_path / "ru.svg", corr=cyrillic, renderer="fast"),
+        ]
+    )
+    assert fast.read_bytes() == slow.read_bytes()
+    assert "доход" in vector.read_text(encoding="utf-8")
+
+    # overview и fast-рендер обходятся без matplotlib
+    code = "import sys, eda_cli.cli; print('matplotlib' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"